@@ -0,0 +1,268 @@
+"""
+Benchmark suite.
+
+Measures the engine, formatting, batch pricing, schedule generation,
+statement export and GUI render paths, writes the results as JSON and
+compares them against a stored baseline so regressions are caught before
+release.
+
+Usage:
+    python benchmarks.py                          # compare against benchmark_baseline.json
+    python benchmarks.py --output results.json
+    python benchmarks.py --save-baseline --machine "build box"   # record a new baseline
+    python benchmarks.py --sizes 1000 1000000     # skip the 10M row batch
+    xvfb-run python benchmarks.py --gui           # include the GUI render path
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import loan_engine
+import loan_money
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "benchmark_baseline.json")
+DEFAULT_SIZES = (1_000, 1_000_000, 10_000_000)
+DEFAULT_TOLERANCE = 0.25
+
+
+def best_time(func, number, repeat=5):
+    """
+    Best wall time of `repeat` runs of `number` calls, per call
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def higher(value, unit):
+    return {"value": value, "unit": unit, "higher_is_better": True}
+
+
+def lower(value, unit):
+    return {"value": value, "unit": unit, "higher_is_better": False}
+
+
+def bench_engine(results):
+    seconds = best_time(lambda: loan_engine.calculate_loan_repayment(5000.0, 6), 20_000)
+    results["engine.single_quote_latency"] = lower(seconds * 1e6, "us")
+
+    seconds = best_time(lambda: loan_money.calculate_loan_repayment_sen(5000.0, 6), 20_000)
+    results["engine.single_quote_sen_latency"] = lower(seconds * 1e6, "us")
+
+
+def bench_formatting(results):
+    rates = [1.8, 0.3, 0.3125, 2.25, 1.7999999999999998]
+    amounts = [5115.0, 852.5, 158.57142857142858, 1234567.891, 25.0]
+
+    def format_rates():
+        for value in rates:
+            loan_engine.format_interest_rate(value)
+
+    def format_amounts():
+        for value in amounts:
+            loan_engine.format_money(value)
+
+    seconds = best_time(format_rates, 10_000)
+    results["format.interest_rate_throughput"] = higher(len(rates) / seconds, "ops/s")
+
+    seconds = best_time(format_amounts, 10_000)
+    results["format.money_throughput"] = higher(len(amounts) / seconds, "ops/s")
+
+
+def bench_batch(results, sizes):
+    import numpy as np
+
+    rng = np.random.default_rng(42)
+    for size in sizes:
+        amounts = rng.uniform(100, 50_000, size).round(2)
+        months = rng.integers(1, 13, size)
+        repeat = 5 if size <= 1_000_000 else 2
+        number = max(1, 100_000 // size)
+
+        seconds = best_time(
+            lambda: loan_engine.calculate_loan_repayment_batch(amounts, months), number, repeat
+        )
+        results[f"batch.float_{size}_rows"] = higher(size / seconds, "rows/s")
+
+        seconds = best_time(
+            lambda: loan_money.calculate_loan_repayment_batch_sen(amounts, months), number, repeat
+        )
+        results[f"batch.sen_{size}_rows"] = higher(size / seconds, "rows/s")
+
+
+def bench_schedules(results):
+    for num_months in (12, 360):
+        # Schedules are split from the total, so any tenor can be generated
+        result = {
+            "loan_amount": 5000.0,
+            "management_cost": num_months * 15.0,
+            "stamp_duty": 25.0,
+            "total_repayment": 5025.0 + num_months * 15,
+            "repayment_months": num_months
+        }
+        seconds = best_time(lambda: list(loan_money.iter_repayment_schedule(result)), 200)
+        results[f"schedule.{num_months}_months_latency"] = lower(seconds * 1e6, "us")
+
+
+def bench_export(results):
+    import tempfile
+
+    import loan_export
+
+    result = loan_engine.calculate_loan_repayment(5000.0, 12)
+    with tempfile.TemporaryDirectory() as output_dir:
+        for extension in loan_export.FORMATS:
+            path = os.path.join(output_dir, f"statement.{extension}")
+            seconds = best_time(lambda: loan_export.export_statement(result, path), 200)
+            results[f"export.{extension}_throughput"] = higher(1 / seconds, "documents/s")
+
+
+def bench_gui(results):
+    """
+    Time calculate -> breakdown -> schedule rendering; needs an X display
+    """
+    import loan_calculator_v1
+
+    app = loan_calculator_v1.LoanCalculator()
+    try:
+        app.update()
+        widgets_before = loan_calculator_v1.count_widgets(app)
+
+        start = time.perf_counter()
+        app.calculate()
+        app.update_idletasks()
+        results["gui.first_calculate_latency"] = lower((time.perf_counter() - start) * 1000, "ms")
+
+        stats = loan_calculator_v1.measure_recalculation(app, runs=20)
+        results["gui.recalculate_latency"] = lower(stats["median_seconds"] * 1000, "ms")
+        results["gui.widgets_before"] = lower(widgets_before, "widgets")
+        results["gui.widgets_after"] = lower(stats["widgets_after"], "widgets")
+    finally:
+        app.destroy()
+
+
+def run(sizes=DEFAULT_SIZES, gui=False, machine=None):
+    results = {}
+    bench_engine(results)
+    bench_formatting(results)
+    bench_batch(results, sizes)
+    bench_schedules(results)
+    bench_export(results)
+    if gui:
+        bench_gui(results)
+
+    import numpy
+
+    return {
+        "metadata": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "machine": machine or platform.node(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine()
+        },
+        "results": results
+    }
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return (regressions, missing): a list of (name, baseline value, current
+    value, change) for benchmarks that got worse by more than tolerance, and
+    the names of benchmarks that have no baseline value to compare against
+    """
+    regressions = []
+    missing = []
+    for name, entry in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or not reference["value"]:
+            missing.append(name)
+            continue
+        change = entry["value"] / reference["value"] - 1
+        worse = -change if entry["higher_is_better"] else change
+        if worse > tolerance:
+            regressions.append((name, reference["value"], entry["value"], change))
+    return regressions, missing
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the loan calculator benchmarks")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="baseline JSON to compare against (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to the baseline file instead of comparing")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="batch sizes in rows (default: %(default)s)")
+    parser.add_argument("--gui", action="store_true",
+                        help="include the GUI render benchmarks (needs a display, e.g. xvfb-run)")
+    parser.add_argument("--machine",
+                        help="description of this machine, stored in the results (default: the host name)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown as a fraction before failing (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    current = run(args.sizes, args.gui, args.machine)
+    for name, entry in current["results"].items():
+        print(f"{name:40} {entry['value']:>16,.2f} {entry['unit']}")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(current, output_file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(current, baseline_file, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    recorded = baseline["metadata"]
+    print(
+        f"\nBaseline recorded {recorded.get('timestamp')} on {recorded.get('machine', 'an unknown machine')} "
+        f"({recorded.get('cpu_count', '?')} CPUs, {recorded.get('platform')})"
+    )
+    machine_keys = ("cpu_count", "processor", "platform")
+    if any(recorded.get(key) != current["metadata"][key] for key in machine_keys):
+        print("Warning: this run is on a different machine than the baseline; timings may not be comparable")
+
+    not_run = [name for name in baseline["results"] if name not in current["results"]]
+    if not_run:
+        print(f"In the baseline but not run: {', '.join(not_run)}")
+
+    regressions, missing = compare(current, baseline, args.tolerance)
+    if missing:
+        print(f"No baseline for, so not compared: {', '.join(missing)}")
+    if regressions:
+        print(f"\nRegressions beyond {args.tolerance:.0%}:")
+        for name, before, after, change in regressions:
+            print(f"  {name}: {before:,.2f} -> {after:,.2f} ({change:+.1%})")
+        return 1
+
+    print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""
+Append-only quote archive.
+
+Every issued quote is kept as one fixed-width little-endian record in a
+single file, so the archive can be memory-mapped and read as a NumPy
+structured array without parsing or copying. Quote IDs are assigned in
+sequence and issue times never go backwards, so both are sorted: lookup
+by ID is an array index and a date range is two binary searches, touching
+only the pages that hold the matching quotes.
+
+Each record keeps the engine result, the fees it was priced with and the
+installments in sen. The repayment schedule is fully determined by those
+(see loan_money), so schedule() rebuilds the issued schedule exactly
+without storing one row per month.
+
+Usage:
+    python loan_archive.py quotes.qarc info
+    python loan_archive.py quotes.qarc quote 42
+    python loan_archive.py quotes.qarc range 2026-01-01 2027-01-01 --output 2026.csv
+"""
+
+import argparse
+import datetime
+import os
+import sys
+
+import loan_engine
+import loan_money
+
+MAGIC = b"LOANQARC"
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+
+# Record layout; every field is 8 bytes so records stay aligned
+RECORD_FIELDS = (
+    ('quote_id', '<u8'),
+    ('issued_at', '<M8[us]'),
+    ('loan_amount', '<f8'),
+    ('repayment_months', '<i8'),
+    ('management_fee', '<f8'),
+    ('stamp_duty_rate', '<f8'),
+) + tuple((name, '<f8') for name in loan_engine.BATCH_COLUMNS) + (
+    ('total_repayment_sen', '<i8'),
+    ('monthly_installment_sen', '<i8'),
+    ('final_installment_sen', '<i8'),
+)
+
+
+def record_dtype():
+    import numpy as np
+
+    return np.dtype(list(RECORD_FIELDS))
+
+
+def to_datetime64(value):
+    """
+    Convert a datetime, date, ISO string or datetime64 to a UTC datetime64[us]
+    """
+    import numpy as np
+
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, 'us')
+
+
+def _header(itemsize):
+    header = MAGIC + FORMAT_VERSION.to_bytes(4, "little") + itemsize.to_bytes(4, "little")
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+class QuoteArchive:
+    """
+    Fixed-width quote archive file, appended to by one writer and
+    memory-mapped for reads.
+
+    records() returns a read-only structured memmap; column views, date
+    range slices and to_frame() share its memory.
+    """
+
+    def __init__(self, path, sync=False):
+        self.path = path
+        self.sync = sync
+        self.dtype = record_dtype()
+        self._records = None
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as archive_file:
+                archive_file.write(_header(self.dtype.itemsize))
+
+        with open(path, "rb") as archive_file:
+            header = archive_file.read(HEADER_SIZE)
+        if header[:8] != MAGIC:
+            raise ValueError(f"{path} is not a quote archive")
+        version = int.from_bytes(header[8:12], "little")
+        itemsize = int.from_bytes(header[12:16], "little")
+        if version != FORMAT_VERSION or itemsize != self.dtype.itemsize:
+            raise ValueError(f"{path} has unsupported archive format version {version}")
+
+        # A crash mid-append can leave a partial record; it is ignored here
+        # and cut off before the next append
+        self._count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+
+    def __len__(self):
+        return self._count
+
+    def refresh(self):
+        """
+        Pick up records appended by another process since the archive was opened
+        """
+        count = (os.path.getsize(self.path) - HEADER_SIZE) // self.dtype.itemsize
+        if count != self._count:
+            self._count = count
+            self._records = None
+
+    def records(self):
+        """
+        All records as a read-only structured array mapped from the file
+        """
+        import numpy as np
+
+        if self._records is None:
+            if self._count:
+                self._records = np.memmap(
+                    self.path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(self._count,)
+                )
+            else:
+                self._records = np.empty(0, dtype=self.dtype)
+        return self._records
+
+    def column(self, name):
+        """
+        One field of every record as a strided view of the mapped file
+        """
+        return self.records()[name]
+
+    def append(self, result, fees=loan_engine.DEFAULT_FEES, issued_at=None):
+        """
+        Archive one calculate_loan_repayment result or the valid rows of a
+        calculate_loan_repayment_batch result.
+
+        issued_at defaults to now; issue times must not go backwards.
+        Returns the assigned quote IDs as an array.
+        """
+        import numpy as np
+
+        valid = np.atleast_1d(result.get('valid', True))
+        amounts = np.atleast_1d(np.asarray(result['loan_amount'], dtype=np.float64))
+        amounts, valid = np.broadcast_arrays(amounts, valid)
+        rows = np.flatnonzero(valid)
+
+        def valid_rows(name):
+            values = np.broadcast_to(np.atleast_1d(result[name]), amounts.shape)
+            return values[rows]
+
+        records = self.records()
+        last_id = int(records['quote_id'][-1]) if len(records) else 0
+        last_issued = records['issued_at'][-1] if len(records) else None
+        # Windows cannot resize a file that is still mapped, so the mapping is
+        # released before the file is written
+        del records
+        self._records = None
+        if issued_at is None:
+            issued_at = np.datetime64(datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None), 'us')
+            if last_issued is not None and issued_at < last_issued:
+                # The clock stepped back; keep the archive sorted by issue time
+                issued_at = last_issued
+        else:
+            issued_at = to_datetime64(issued_at)
+            if last_issued is not None and issued_at < last_issued:
+                raise ValueError(f"Quotes issued at {issued_at} are older than the last archived quote")
+
+        first_id = last_id + 1
+        batch = np.zeros(len(rows), dtype=self.dtype)
+        batch['quote_id'] = np.arange(first_id, first_id + len(rows))
+        batch['issued_at'] = issued_at
+        batch['loan_amount'] = amounts[rows]
+        batch['repayment_months'] = valid_rows('repayment_months')
+        batch['management_fee'] = loan_engine.batch_management_fees(batch['loan_amount'], fees)
+        batch['stamp_duty_rate'] = fees.stamp_duty_rate
+        for name in loan_engine.BATCH_COLUMNS:
+            batch[name] = valid_rows(name)
+
+        # Same sen rounding as loan_money.quote_sen, so the archived
+        # schedule is the one that was displayed
+        def to_sen(amounts):
+            return np.floor(np.round(amounts * loan_money.SEN_PER_RINGGIT, 6) + 0.5).astype(np.int64)
+
+        batch['total_repayment_sen'] = (
+            to_sen(batch['loan_amount']) + to_sen(batch['management_cost']) + to_sen(batch['stamp_duty'])
+        )
+        installment, final_installment = loan_money.split_installments(
+            batch['total_repayment_sen'], batch['repayment_months']
+        )
+        batch['monthly_installment_sen'] = installment
+        batch['final_installment_sen'] = final_installment
+
+        with open(self.path, "r+b") as archive_file:
+            size = HEADER_SIZE + self._count * self.dtype.itemsize
+            if os.fstat(archive_file.fileno()).st_size != size:
+                # Cut off a partial record left by a crash mid-append
+                archive_file.truncate(size)
+            archive_file.seek(size)
+            archive_file.write(batch.tobytes())
+            archive_file.flush()
+            if self.sync:
+                os.fsync(archive_file.fileno())
+
+        self._count += len(batch)
+        return batch['quote_id']
+
+    def _index(self, quote_id):
+        records = self.records()
+        if len(records):
+            index = int(quote_id) - int(records['quote_id'][0])
+            if 0 <= index < len(records):
+                return index
+        raise KeyError(f"No archived quote {quote_id}")
+
+    def get(self, quote_id):
+        """
+        One archived quote as a dict with the calculate_loan_repayment keys
+        plus quote_id, issued_at and the fees it was priced with
+        """
+        record = self.records()[self._index(quote_id)]
+        quote = {
+            'quote_id': int(record['quote_id']),
+            'issued_at': record['issued_at'].item(),
+            'loan_amount': float(record['loan_amount']),
+            'repayment_months': int(record['repayment_months']),
+            'management_fee': float(record['management_fee']),
+            'stamp_duty_rate': float(record['stamp_duty_rate'])
+        }
+        for name in loan_engine.BATCH_COLUMNS:
+            quote[name] = float(record[name])
+        return quote
+
+    def schedule(self, quote_id):
+        """
+        Yield the issued repayment schedule of a quote, as loan_money.iter_repayment_schedule
+        """
+        record = self.records()[self._index(quote_id)]
+        schedule = loan_money.iter_schedule_sen(
+            int(record['total_repayment_sen']), int(record['repayment_months'])
+        )
+        for month, payment, remaining in schedule:
+            yield {
+                "month": month,
+                "payment": loan_money.from_sen(payment),
+                "remaining": loan_money.from_sen(remaining)
+            }
+
+    def between(self, start=None, end=None):
+        """
+        Records issued in [start, end) as a slice of the mapped file
+        """
+        import numpy as np
+
+        records = self.records()
+        issued_at = records['issued_at']
+        low = 0 if start is None else int(np.searchsorted(issued_at, to_datetime64(start)))
+        high = len(records) if end is None else int(np.searchsorted(issued_at, to_datetime64(end)))
+        return records[low:max(low, high)]
+
+    def to_frame(self, start=None, end=None, columns=None):
+        """
+        Records issued in [start, end) as a pandas DataFrame backed by the mapped file
+        """
+        import pandas as pd
+
+        records = self.between(start, end)
+        names = columns or self.dtype.names
+        return pd.DataFrame({name: records[name] for name in names}, copy=False)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Inspect or export an archive of issued quotes")
+    parser.add_argument("archive", help="quote archive file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("info", help="show the number and time span of archived quotes")
+
+    quote_parser = subparsers.add_parser("quote", help="show one quote and its repayment schedule")
+    quote_parser.add_argument("quote_id", type=int)
+
+    range_parser = subparsers.add_parser("range", help="summarize or export quotes issued in [START, END)")
+    range_parser.add_argument("start", help="ISO date or time, e.g. 2026-01-01")
+    range_parser.add_argument("end", help="ISO date or time, exclusive")
+    range_parser.add_argument("--output", help="CSV or Parquet file to export the quotes to")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not os.path.exists(args.archive):
+        print(f"No archive at {args.archive}")
+        return 1
+    archive = QuoteArchive(args.archive)
+
+    if args.command == "info":
+        records = archive.records()
+        print(f"{len(records):,} quotes")
+        if len(records):
+            print(f"Quote IDs {records['quote_id'][0]} to {records['quote_id'][-1]}")
+            print(f"Issued {records['issued_at'][0]} to {records['issued_at'][-1]} UTC")
+        return 0
+
+    if args.command == "quote":
+        try:
+            quote = archive.get(args.quote_id)
+        except KeyError as e:
+            print(e.args[0])
+            return 1
+        for name, value in quote.items():
+            print(f"{name:32} {value}")
+        for row in archive.schedule(args.quote_id):
+            print(f"Month {row['month']:3}  {row['payment']:>12,}  {row['remaining']:>14,}")
+        return 0
+
+    records = archive.between(args.start, args.end)
+    print(
+        f"{len(records):,} quotes, RM {records['loan_amount'].sum():,.2f} lent, "
+        f"RM {records['total_fees'].sum():,.2f} in fees"
+    )
+    if args.output:
+        frame = archive.to_frame(args.start, args.end)
+        if args.output.lower().endswith(".parquet"):
+            frame.to_parquet(args.output, index=False)
+        else:
+            frame.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Background execution for long-running engine work.
+
+Jobs run on a worker thread pool so Tk's mainloop keeps handling events.
+Progress, results and errors are put on a queue that the Tk thread
+drains with after(), so callbacks always run on the UI thread and never
+touch widgets from a worker.
+"""
+
+import concurrent.futures
+import queue
+
+
+class TaskCancelled(Exception):
+    """Raised inside a job when its task has been cancelled"""
+
+
+class BackgroundTask:
+    """
+    Handle passed to a background job and returned to the caller.
+
+    Jobs call report_progress() periodically; once the task is cancelled
+    that call raises TaskCancelled, which stops the job cooperatively.
+    """
+
+    def __init__(self, runner, on_result, on_error, on_progress, on_cancel):
+        self._runner = runner
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report_progress(self, *progress):
+        """
+        Called from the worker: queue a progress update for the UI thread
+        """
+        if self.cancelled:
+            raise TaskCancelled()
+        if self.on_progress is not None:
+            self._runner._events.put((self, "progress", progress))
+
+
+class BackgroundRunner:
+    """
+    Runs jobs off the Tk thread and delivers their outcome through after() polling
+    """
+
+    def __init__(self, root, max_workers=1, poll_interval_ms=50):
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="loan-background"
+        )
+        self._events = queue.Queue()
+        self._pending = 0
+        self._poll_id = None
+
+    def submit(self, job, *args, on_result=None, on_error=None, on_progress=None, on_cancel=None):
+        """
+        Run job(task, *args) on a worker thread.
+
+        on_result(value), on_error(exception), on_progress(*progress) and
+        on_cancel() are called on the Tk thread.
+        """
+        task = BackgroundTask(self, on_result, on_error, on_progress, on_cancel)
+        self._pending += 1
+        self._executor.submit(self._run, task, job, args)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_interval_ms, self._poll)
+        return task
+
+    def _run(self, task, job, args):
+        try:
+            value = job(task, *args)
+        except TaskCancelled:
+            self._events.put((task, "cancelled", None))
+        except Exception as e:
+            self._events.put((task, "error", e))
+        else:
+            self._events.put((task, "cancelled" if task.cancelled else "result", value))
+
+    def _poll(self):
+        self._poll_id = None
+        progress = {}
+
+        while True:
+            try:
+                task, kind, value = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                # Only the latest progress of each task is worth drawing
+                progress[task] = value
+                continue
+
+            progress.pop(task, None)
+            task.done = True
+            self._pending -= 1
+            if kind == "result" and task.on_result is not None:
+                task.on_result(value)
+            elif kind == "error" and task.on_error is not None:
+                task.on_error(value)
+            elif kind == "cancelled" and task.on_cancel is not None:
+                task.on_cancel()
+
+        for task, value in progress.items():
+            if not task.cancelled:
+                task.on_progress(*value)
+
+        if self._pending:
+            self._poll_id = self.root.after(self.poll_interval_ms, self._poll)
+
+    def shutdown(self):
+        """Cancel polling and stop accepting jobs; running jobs finish in the background"""
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,292 @@
+"""
+Bulk quote pipeline.
+
+Reads loan applications from CSV or Parquet in fixed-size chunks, prices
+each chunk with the batch engine and streams the results to an output
+file, so peak memory depends on the chunk size and not the input size.
+
+Usage:
+    python loan_calculator_v1.py bulk applications.csv quotes.csv
+    python loan_bulk.py applications.parquet quotes.parquet --chunk-size 500000
+    python loan_bulk.py applications.csv quotes.csv --workers 8 --management-fee 20
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import os
+import sys
+import time
+
+import loan_engine
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+def is_parquet(path):
+    return str(path).lower().endswith(PARQUET_EXTENSIONS)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet files require the 'pyarrow' package (pip install pyarrow)")
+    return pyarrow
+
+
+def iter_input_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the input file as pandas DataFrames of at most chunk_size rows
+    """
+    if is_parquet(path):
+        pa = _import_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def output_types(amount_column="loan_amount", months_column="repayment_months"):
+    """
+    Parquet types of the priced columns, keyed by column name
+    """
+    types = {amount_column: "float64", months_column: "int64", "valid": "bool"}
+    for name in loan_engine.BATCH_COLUMNS:
+        types[name] = "float64"
+    return types
+
+
+class ChunkWriter:
+    """
+    Append priced chunks to a CSV or Parquet file as they are produced.
+
+    The Parquet schema is pinned when the first chunk is written: columns
+    named in types (pyarrow type aliases such as "float64") get that type,
+    other columns the first chunk's, with integers stored as int64 and text
+    as strings. Later chunks are converted to it, so a chunk whose dtypes
+    pandas inferred differently (e.g. an amount column read as text) still
+    fits; values that do not convert are written as nulls.
+    """
+
+    def __init__(self, path, types=None):
+        self.path = path
+        self.types = types or {}
+        self.parquet = is_parquet(path)
+        self._file = None
+        self._writer = None
+
+    def _schema(self, frame, pa):
+        import pandas as pd
+
+        fields = []
+        for field in pa.Schema.from_pandas(frame, preserve_index=False):
+            dtype = frame[field.name].dtype
+            if field.name in self.types:
+                field_type = pa.type_for_alias(self.types[field.name])
+            elif pd.api.types.is_bool_dtype(dtype):
+                field_type = pa.bool_()
+            elif pd.api.types.is_integer_dtype(dtype):
+                field_type = pa.int64()
+            elif pd.api.types.is_float_dtype(dtype):
+                field_type = pa.float64()
+            elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+                field_type = pa.string()
+            else:
+                field_type = field.type
+            fields.append(pa.field(field.name, field_type))
+        return pa.schema(fields)
+
+    def _table(self, frame, schema, pa):
+        import pandas as pd
+
+        arrays = []
+        for field in schema:
+            values = frame[field.name]
+            if pa.types.is_string(field.type):
+                values = values.astype("string")
+            elif pa.types.is_integer(field.type):
+                values = pd.to_numeric(values, errors="coerce").astype("float64")
+                values = values.where(values == values.round())
+            elif pa.types.is_floating(field.type):
+                values = pd.to_numeric(values, errors="coerce")
+            arrays.append(pa.array(values, type=field.type, from_pandas=True))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def write(self, frame):
+        if self.parquet:
+            pa = _import_pyarrow()
+            if self._writer is None:
+                self._writer = pa.parquet.ParquetWriter(self.path, self._schema(frame, pa))
+            self._writer.write_table(self._table(frame, self._writer.schema, pa))
+        else:
+            header = self._file is None
+            if header:
+                self._file = open(self.path, "w", newline="", encoding="utf-8")
+            if isinstance(frame, str):
+                # Chunk already rendered to CSV text by a worker process
+                self._file.write(frame)
+            else:
+                frame.to_csv(self._file, header=header, index=False)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def price_chunks(chunks, amount_column="loan_amount", months_column="repayment_months",
+                 fees=loan_engine.DEFAULT_FEES):
+    """
+    Price an iterable of DataFrame chunks, yielding priced chunks in order
+    """
+    for chunk in chunks:
+        yield loan_engine.price_frame(chunk, amount_column, months_column, fees)
+
+
+def _price_shard(chunk, amount_column, months_column, fees, csv_header):
+    """
+    Price one shard in a worker process.
+
+    For CSV output the shard is rendered to text here as well, since
+    formatting the numbers costs more than pricing them. csv_header is
+    None for Parquet output.
+    """
+    priced = loan_engine.price_frame(chunk, amount_column, months_column, fees)
+    valid_rows = int(priced["valid"].sum())
+    if csv_header is not None:
+        return priced.to_csv(header=csv_header, index=False), len(priced), valid_rows
+    return priced, len(priced), valid_rows
+
+
+def price_file(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE,
+               amount_column="loan_amount", months_column="repayment_months",
+               fees=loan_engine.DEFAULT_FEES, workers=1, progress=None):
+    """
+    Stream-price input_path into output_path.
+
+    With workers > 1 the chunks are priced as shards on a process pool and
+    written back in input order, so the output is identical to the
+    single-process run. At most two shards per worker are in flight to
+    keep memory bounded.
+
+    If given, progress(rows, valid_rows) is called after each chunk is
+    written; an exception raised from it stops the run without waiting for
+    the shards still queued on the pool.
+
+    Returns a dict with the number of rows read, valid rows and elapsed seconds.
+    """
+    start = time.perf_counter()
+    rows = 0
+    valid_rows = 0
+
+    chunks = iter_input_chunks(input_path, chunk_size)
+    csv_output = not is_parquet(output_path)
+
+    with ChunkWriter(output_path, output_types(amount_column, months_column)) as writer:
+
+        def write_shard(shard, shard_rows, shard_valid):
+            nonlocal rows, valid_rows
+            writer.write(shard)
+            rows += shard_rows
+            valid_rows += shard_valid
+            if progress is not None:
+                progress(rows, valid_rows)
+
+        if workers <= 1:
+            for priced in price_chunks(chunks, amount_column, months_column, fees):
+                write_shard(priced, len(priced), int(priced["valid"].sum()))
+        else:
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+            try:
+                pending = collections.deque()
+                for index, chunk in enumerate(chunks):
+                    csv_header = (index == 0) if csv_output else None
+                    pending.append(pool.submit(
+                        _price_shard, chunk, amount_column, months_column, fees, csv_header
+                    ))
+                    if len(pending) >= workers * 2:
+                        write_shard(*pending.popleft().result())
+                while pending:
+                    write_shard(*pending.popleft().result())
+            except BaseException:
+                # Cancelled or failed: drop queued shards instead of waiting for them
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            pool.shutdown()
+
+    return {
+        "rows": rows,
+        "valid_rows": valid_rows,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Price loan applications from a CSV or Parquet file")
+    parser.add_argument("input", help="CSV or Parquet file with loan applications")
+    parser.add_argument("output", help="CSV or Parquet file to write quotes to")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows read and priced per chunk (default: %(default)s)")
+    parser.add_argument("--amount-column", default="loan_amount",
+                        help="column holding the loan amount (default: %(default)s)")
+    parser.add_argument("--months-column", default="repayment_months",
+                        help="column holding the repayment period (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes to price shards on; 0 uses every CPU (default: %(default)s)")
+    parser.add_argument("--rules", metavar="PATH",
+                        help="fee schedule file to price with (see fee_schedules.json)")
+    parser.add_argument("--product", help="product in --rules to price with (default: the first)")
+    parser.add_argument("--management-fee", type=float,
+                        help=f"management fee per month in RM, overriding the product's "
+                             f"(default: {loan_engine.DEFAULT_FEES.management_fee:g})")
+    parser.add_argument("--stamp-duty-rate", type=float,
+                        help=f"stamp duty as a fraction of the loan amount, overriding the product's "
+                             f"(default: {loan_engine.DEFAULT_FEES.stamp_duty_rate:g})")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    fees = loan_engine.DEFAULT_FEES
+    if args.rules:
+        import loan_rules
+        fees = loan_rules.RuleBook(args.rules).product(args.product).fees
+    if args.management_fee is not None:
+        fees = fees._replace(management_fee=args.management_fee)
+    if args.stamp_duty_rate is not None:
+        fees = fees._replace(stamp_duty_rate=args.stamp_duty_rate)
+    workers = args.workers or os.cpu_count() or 1
+
+    stats = price_file(
+        args.input, args.output,
+        chunk_size=args.chunk_size,
+        amount_column=args.amount_column,
+        months_column=args.months_column,
+        fees=fees,
+        workers=workers
+    )
+
+    rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(
+        f"Priced {stats['rows']:,} rows ({stats['valid_rows']:,} valid) "
+        f"in {stats['seconds']:.2f}s ({rate:,.0f} rows/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
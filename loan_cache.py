@@ -0,0 +1,85 @@
+"""
+Memoized quote cache.
+
+Bounded LRU cache of calculate_loan_repayment results and their display
+strings, for interactive recalculation of the same few amount/tenor pairs.
+"""
+
+from collections import OrderedDict
+
+import loan_engine
+import loan_instrumentation
+
+
+class QuoteCache:
+    """
+    LRU cache keyed on (loan amount, months, fee schedule).
+
+    Each entry holds the result dict and the pre-formatted display strings
+    from loan_engine.format_quote. When a quote is requested with a
+    different fee schedule than the previous one, all cached entries are
+    dropped, so results priced under old fees are never served.
+
+    If a loan_table.QuoteTable is given, misses on its grid are answered
+    from the table instead of the live formula.
+    """
+
+    def __init__(self, maxsize=256, table=None):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.table = table
+        self._entries = OrderedDict()
+        self._fees = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, loan_amount, num_months, fees=loan_engine.DEFAULT_FEES):
+        """
+        Return (result, display) for a quote, computing it on a miss.
+
+        Invalid inputs raise ValueError as calculate_loan_repayment does and
+        are not cached.
+        """
+        if fees != self._fees:
+            self.invalidate()
+            self._fees = fees
+
+        key = (loan_amount, num_months, fees)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        result = None
+        if self.table is not None and tuple(self.table.fees) == tuple(fees):
+            result = self.table.lookup(loan_amount, num_months)
+        if result is None:
+            with loan_instrumentation.phase("calculate_loan_repayment"):
+                result = loan_engine.calculate_loan_repayment(loan_amount, num_months, fees)
+        with loan_instrumentation.phase("formatting"):
+            entry = (result, loan_engine.format_quote(result))
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self):
+        """Drop every cached quote"""
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
+
+    def __len__(self):
+        return len(self._entries)
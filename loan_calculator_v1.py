@@ -1,512 +1,1138 @@
-import customtkinter as ctk
-import tkinter as tk
-from tkinter import ttk
-import pandas as pd
-
-# Set appearance mode and color theme
-ctk.set_appearance_mode("light")  # Default to light mode
-ctk.set_default_color_theme("blue")  # Can be "blue", "green", "dark-blue"
-
-class LoanCalculator(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        
-        # Configure window
-        self.title("💰 Loan Repayment Calculator")
-        self.geometry("1000x800")
-        self.minsize(900, 700)
-        
-        # Create main container with scrollbar
-        self.main_frame = ctk.CTkFrame(self, corner_radius=10)
-        self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Create canvas and scrollbar for scrollable content
-        self.canvas = tk.Canvas(self.main_frame, highlightthickness=0)
-        self.scrollbar = ctk.CTkScrollbar(self.main_frame, orientation="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ctk.CTkFrame(self.canvas, corner_radius=10)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        
-        self.canvas.pack(side="left", fill="both", expand=True, padx=(0, 5))
-        self.scrollbar.pack(side="right", fill="y", padx=(5, 0))
-        
-        # Bind mouse wheel to canvas
-        self.canvas.bind("<Enter>", self._bind_to_mousewheel)
-        self.canvas.bind("<Leave>", self._unbind_from_mousewheel)
-        
-        # Initialize variables
-        self.loan_amount = ctk.DoubleVar(value=5000.0)
-        self.repayment_months = ctk.IntVar(value=6)
-        
-        # Create UI elements
-        self.create_widgets()
-        
-    def _bind_to_mousewheel(self, event):
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-    
-    def _unbind_from_mousewheel(self, event):
-        self.canvas.unbind_all("<MouseWheel>")
-    
-    def _on_mousewheel(self, event):
-        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-    
-    def create_widgets(self):
-        # Title Section
-        title_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
-        title_frame.pack(fill="x", padx=20, pady=(10, 5))
-        
-        title_label = ctk.CTkLabel(
-            title_frame, 
-            text="💰 Loan Repayment Calculator",
-            font=ctk.CTkFont(size=24, weight="bold")
-        )
-        title_label.pack(pady=(15, 5))
-        
-        subtitle_label = ctk.CTkLabel(
-            title_frame,
-            text="Money Lending Services",
-            font=ctk.CTkFont(size=16, weight="bold")
-        )
-        subtitle_label.pack(pady=(0, 15))
-        
-        # Separator
-        separator1 = ctk.CTkFrame(title_frame, height=2, fg_color="gray")
-        separator1.pack(fill="x", padx=10, pady=5)
-        
-        # Main Content Frame
-        content_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
-        content_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        
-        # Create two columns
-        left_column = ctk.CTkFrame(content_frame, corner_radius=10)
-        left_column.pack(side="left", fill="both", expand=True, padx=(0, 10))
-        
-        right_column = ctk.CTkFrame(content_frame, corner_radius=10)
-        right_column.pack(side="right", fill="both", expand=True, padx=(10, 0))
-        
-        # Left Column - Input Section
-        self.create_input_section(left_column)
-        
-        # Right Column - How it Works
-        self.create_info_section(right_column)
-        
-        # Results Section
-        self.create_results_section()
-        
-        # Disclaimer
-        self.create_disclaimer()
-    
-    def create_input_section(self, parent):
-        input_frame = ctk.CTkFrame(parent, corner_radius=10)
-        input_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Title
-        input_title = ctk.CTkLabel(
-            input_frame,
-            text="Loan Details",
-            font=ctk.CTkFont(size=18, weight="bold")
-        )
-        input_title.pack(pady=(10, 15))
-        
-        # Loan Amount Input
-        loan_label = ctk.CTkLabel(
-            input_frame,
-            text="Loan Amount (RM):",
-            font=ctk.CTkFont(size=14)
-        )
-        loan_label.pack(anchor="w", padx=20, pady=(5, 0))
-        
-        loan_entry = ctk.CTkEntry(
-            input_frame,
-            textvariable=self.loan_amount,
-            width=200,
-            font=ctk.CTkFont(size=14),
-            corner_radius=8
-        )
-        loan_entry.pack(pady=(5, 15), padx=20)
-        
-        # Repayment Period Input
-        period_label = ctk.CTkLabel(
-            input_frame,
-            text="Repayment Period (Months):",
-            font=ctk.CTkFont(size=14)
-        )
-        period_label.pack(anchor="w", padx=20, pady=(5, 0))
-        
-        period_optionmenu = ctk.CTkOptionMenu(
-            input_frame,
-            variable=self.repayment_months,
-            values=[str(i) for i in range(1, 13)],
-            width=200,
-            font=ctk.CTkFont(size=14),
-            corner_radius=8
-        )
-        period_optionmenu.pack(pady=(5, 20), padx=20)
-        
-        # Calculate Button
-        calculate_btn = ctk.CTkButton(
-            input_frame,
-            text="Calculate Repayment",
-            command=self.calculate,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            corner_radius=8,
-            height=40
-        )
-        calculate_btn.pack(pady=20, padx=20)
-    
-    def create_info_section(self, parent):
-        info_frame = ctk.CTkFrame(parent, corner_radius=10)
-        info_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Title
-        info_title = ctk.CTkLabel(
-            info_frame,
-            text="How it Works",
-            font=ctk.CTkFont(size=18, weight="bold")
-        )
-        info_title.pack(pady=(10, 15))
-        
-        # Info Text
-        info_text = """
-Cost Structure:
-• Management Fee: RM15 per month
-• Stamp Duty: 0.5% of loan amount
-• Repayment: Salary deduction
-
-Interest Calculation:
-1. Repayment Period Interest Rate = (Total Management Cost / Loan Amount) × 100%
-2. Monthly Interest Rate = Repayment Period Interest Rate ÷ Number of Months
-
-Example (RM5,000 for 6 months):
-• Management: 6 × RM15 = RM90
-• Repayment Period Interest Rate = (90 / 5000) × 100% = 1.8%
-• Monthly Interest Rate = 1.8% ÷ 6 = 0.3%
-        """
-        
-        info_label = ctk.CTkLabel(
-            info_frame,
-            text=info_text,
-            font=ctk.CTkFont(size=13),
-            justify="left"
-        )
-        info_label.pack(pady=10, padx=20, anchor="w")
-    
-    def create_results_section(self):
-        # Results Frame
-        self.results_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
-        self.results_frame.pack(fill="x", padx=20, pady=10)
-        
-        # Results will be populated when calculate is called
-        
-    def create_disclaimer(self):
-        disclaimer_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
-        disclaimer_frame.pack(fill="x", padx=20, pady=(10, 20))
-        
-        disclaimer_text = (
-            "⚠️ Disclaimer: This loan repayment calculator is for informational purposes only. "
-            "It does not provide financial advice, offer loans, or represent a licensed money lending service."
-        )
-        
-        disclaimer_label = ctk.CTkLabel(
-            disclaimer_frame,
-            text=disclaimer_text,
-            font=ctk.CTkFont(size=11),
-            wraplength=900,
-            justify="center"
-        )
-        disclaimer_label.pack(pady=15, padx=20)
-    
-    def calculate_loan_repayment(self, loan_amount, num_months):
-        """
-        Core function to calculate loan repayment details
-        """
-        if loan_amount <= 0:
-            raise ValueError("Loan amount must be positive")
-        
-        if num_months < 1 or num_months > 12:
-            raise ValueError("Repayment period must be between 1 and 12 months")
-        
-        # Calculate costs
-        management_cost = 15 * num_months
-        stamp_duty = loan_amount * 0.005  # 0.5% stamp duty
-        
-        # Calculate repayment details
-        total_repayment = loan_amount + management_cost + stamp_duty
-        monthly_installment = total_repayment / num_months
-        
-        # Calculate interest rates according to the instructions
-        # 1. Interest rate for the repayment period (in percentage)
-        repayment_period_interest_rate = (management_cost / loan_amount) * 100
-        
-        # 2. Monthly interest rate (in percentage)
-        monthly_interest_rate_percent = repayment_period_interest_rate / num_months
-        
-        # 3. Monthly interest rate as decimal (optional)
-        monthly_interest_rate_decimal = management_cost / (loan_amount * num_months)
-        
-        return {
-            'loan_amount': loan_amount,
-            'repayment_months': num_months,
-            'management_cost': management_cost,
-            'stamp_duty': stamp_duty,
-            'total_repayment': total_repayment,
-            'monthly_installment': monthly_installment,
-            'repayment_period_interest_rate': repayment_period_interest_rate,
-            'monthly_interest_rate_percent': monthly_interest_rate_percent,
-            'monthly_interest_rate_decimal': monthly_interest_rate_decimal,
-            'total_fees': management_cost + stamp_duty
-        }
-    
-    def format_interest_rate(self, rate):
-        """
-        Format interest rate to 3 decimal places if there are non-zero digits after 2 decimal places
-        """
-        if round(rate, 2) != rate:
-            return f"{rate:.3f}%"
-        else:
-            return f"{rate:.2f}%"
-    
-    def clear_results(self):
-        """Clear previous results"""
-        for widget in self.results_frame.winfo_children():
-            widget.destroy()
-    
-    def calculate(self):
-        try:
-            self.clear_results()
-            
-            loan_amount = self.loan_amount.get()
-            num_months = self.repayment_months.get()
-            
-            # Calculate loan details
-            result = self.calculate_loan_repayment(loan_amount, num_months)
-            
-            # Format interest rates
-            period_interest_formatted = self.format_interest_rate(result['repayment_period_interest_rate'])
-            monthly_interest_formatted = self.format_interest_rate(result['monthly_interest_rate_percent'])
-            
-            # Results Title
-            results_title = ctk.CTkLabel(
-                self.results_frame,
-                text="Calculation Results",
-                font=ctk.CTkFont(size=20, weight="bold")
-            )
-            results_title.pack(pady=(15, 20))
-            
-            # Main Results Grid
-            results_grid = ctk.CTkFrame(self.results_frame, corner_radius=10)
-            results_grid.pack(fill="x", padx=20, pady=10)
-            
-            # Create 4 columns for results
-            for i in range(4):
-                results_grid.columnconfigure(i, weight=1)
-            
-            # Monthly Installment
-            monthly_frame = ctk.CTkFrame(results_grid, corner_radius=8)
-            monthly_frame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
-            
-            ctk.CTkLabel(monthly_frame, text="Monthly Installment", 
-                        font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(10, 5))
-            ctk.CTkLabel(monthly_frame, text=f"RM {result['monthly_installment']:,.2f}", 
-                        font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(0, 10))
-            
-            # Total Repayment
-            total_frame = ctk.CTkFrame(results_grid, corner_radius=8)
-            total_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
-            
-            ctk.CTkLabel(total_frame, text="Total Repayment", 
-                        font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(10, 5))
-            ctk.CTkLabel(total_frame, text=f"RM {result['total_repayment']:,.2f}", 
-                        font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(0, 10))
-            
-            # Repayment Period Interest Rate
-            period_interest_frame = ctk.CTkFrame(results_grid, corner_radius=8)
-            period_interest_frame.grid(row=0, column=2, padx=10, pady=10, sticky="nsew")
-            
-            ctk.CTkLabel(period_interest_frame, text="Repayment Period Interest Rate", 
-                        font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(10, 5))
-            ctk.CTkLabel(period_interest_frame, text=period_interest_formatted, 
-                        font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(0, 10))
-            
-            # Monthly Interest Rate
-            monthly_interest_frame = ctk.CTkFrame(results_grid, corner_radius=8)
-            monthly_interest_frame.grid(row=0, column=3, padx=10, pady=10, sticky="nsew")
-            
-            ctk.CTkLabel(monthly_interest_frame, text="Monthly Interest Rate", 
-                        font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(10, 5))
-            ctk.CTkLabel(monthly_interest_frame, text=monthly_interest_formatted, 
-                        font=ctk.CTkFont(size=16, weight="bold")).pack(pady=(0, 10))
-            
-            # Detailed Breakdown Section
-            self.create_detailed_breakdown(result)
-            
-            # Repayment Schedule
-            self.create_repayment_schedule(result)
-            
-            # Additional Info
-            additional_frame = ctk.CTkFrame(self.results_frame, corner_radius=10)
-            additional_frame.pack(fill="x", padx=20, pady=10)
-            
-            additional_label = ctk.CTkLabel(
-                additional_frame,
-                text=f"Additional Information: Monthly interest rate as decimal: {result['monthly_interest_rate_decimal']:.4f}",
-                font=ctk.CTkFont(size=12)
-            )
-            additional_label.pack(pady=10)
-            
-        except ValueError as e:
-            tk.messagebox.showerror("Error", f"Error: {e}")
-        except Exception as e:
-            tk.messagebox.showerror("Error", f"An unexpected error occurred: {e}")
-    
-    def create_detailed_breakdown(self, result):
-        # Detailed Breakdown Container
-        breakdown_container = ctk.CTkFrame(self.results_frame, corner_radius=10)
-        breakdown_container.pack(fill="x", padx=20, pady=10)
-        
-        breakdown_title = ctk.CTkLabel(
-            breakdown_container,
-            text="Detailed Cost Breakdown",
-            font=ctk.CTkFont(size=18, weight="bold")
-        )
-        breakdown_title.pack(pady=(10, 15))
-        
-        # Two columns for breakdown
-        breakdown_columns = ctk.CTkFrame(breakdown_container)
-        breakdown_columns.pack(fill="x", padx=10, pady=10)
-        breakdown_columns.columnconfigure(0, weight=1)
-        breakdown_columns.columnconfigure(1, weight=1)
-        
-        # Cost Components
-        cost_frame = ctk.CTkFrame(breakdown_columns, corner_radius=8)
-        cost_frame.grid(row=0, column=0, padx=10, pady=5, sticky="nsew")
-        
-        ctk.CTkLabel(cost_frame, text="Cost Components", 
-                    font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(10, 10))
-        
-        # Cost components data
-        cost_data = [
-            ("Loan Amount", f"RM {result['loan_amount']:,.2f}"),
-            (f"Management Cost ({result['repayment_months']} months × RM15)", f"RM {result['management_cost']:,.2f}"),
-            ("Stamp Duty (0.5%)", f"RM {result['stamp_duty']:,.2f}"),
-            ("Total Repayment", f"RM {result['total_repayment']:,.2f}")
-        ]
-        
-        for component, amount in cost_data:
-            row_frame = ctk.CTkFrame(cost_frame, fg_color="transparent")
-            row_frame.pack(fill="x", padx=10, pady=2)
-            
-            ctk.CTkLabel(row_frame, text=component, 
-                        font=ctk.CTkFont(size=12), anchor="w").pack(side="left")
-            ctk.CTkLabel(row_frame, text=amount, 
-                        font=ctk.CTkFont(size=12, weight="bold"), anchor="e").pack(side="right")
-        
-        # Interest Calculation
-        interest_frame = ctk.CTkFrame(breakdown_columns, corner_radius=8)
-        interest_frame.grid(row=0, column=1, padx=10, pady=5, sticky="nsew")
-        
-        ctk.CTkLabel(interest_frame, text="Interest Calculation", 
-                    font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(10, 10))
-        
-        # Interest calculation data
-        interest_data = [
-            ("Total Management Cost", f"{result['repayment_months']} × RM15 = RM {result['management_cost']:,.2f}"),
-            ("Loan Amount", f"RM {result['loan_amount']:,.2f}"),
-            ("Repayment Period Interest Rate", 
-             f"(RM {result['management_cost']:,.2f} ÷ RM {result['loan_amount']:,.2f}) × 100 = {result['repayment_period_interest_rate']:.3f}%"),
-            ("Monthly Interest Rate", 
-             f"{result['repayment_period_interest_rate']:.3f}% ÷ {result['repayment_months']} = {result['monthly_interest_rate_percent']:.3f}%")
-        ]
-        
-        for description, calculation in interest_data:
-            row_frame = ctk.CTkFrame(interest_frame, fg_color="transparent")
-            row_frame.pack(fill="x", padx=10, pady=2)
-            
-            ctk.CTkLabel(row_frame, text=description, 
-                        font=ctk.CTkFont(size=12), anchor="w").pack(side="left")
-            calc_label = ctk.CTkLabel(row_frame, text=calculation, 
-                                    font=ctk.CTkFont(size=11), anchor="e", wraplength=300)
-            calc_label.pack(side="right")
-    
-    def create_repayment_schedule(self, result):
-        schedule_frame = ctk.CTkFrame(self.results_frame, corner_radius=10)
-        schedule_frame.pack(fill="x", padx=20, pady=10)
-        
-        schedule_title = ctk.CTkLabel(
-            schedule_frame,
-            text="Repayment Schedule",
-            font=ctk.CTkFont(size=18, weight="bold")
-        )
-        schedule_title.pack(pady=(10, 15))
-        
-        # Create a frame for the table
-        table_frame = ctk.CTkFrame(schedule_frame, corner_radius=8)
-        table_frame.pack(fill="x", padx=10, pady=10)
-        
-        # Create table headers
-        headers = ["Month", "Payment (RM)", "Remaining Balance (RM)"]
-        for i, header in enumerate(headers):
-            header_label = ctk.CTkLabel(
-                table_frame,
-                text=header,
-                font=ctk.CTkFont(size=12, weight="bold"),
-                height=30
-            )
-            header_label.grid(row=0, column=i, padx=1, pady=1, sticky="nsew")
-            table_frame.columnconfigure(i, weight=1)
-        
-        # Generate schedule data
-        remaining_balance = result['total_repayment']
-        schedule_data = []
-        
-        for month in range(1, result['repayment_months'] + 1):
-            if month == result['repayment_months']:
-                monthly_payment = remaining_balance
-            else:
-                monthly_payment = result['monthly_installment']
-            
-            remaining_balance -= monthly_payment
-            schedule_data.append({
-                "month": month,
-                "payment": monthly_payment,
-                "remaining": max(0, round(remaining_balance, 2))
-            })
-        
-        # Populate table with data
-        for row, data in enumerate(schedule_data, 1):
-            month_label = ctk.CTkLabel(
-                table_frame,
-                text=str(data["month"]),
-                font=ctk.CTkFont(size=11),
-                height=25
-            )
-            month_label.grid(row=row, column=0, padx=1, pady=1, sticky="nsew")
-            
-            payment_label = ctk.CTkLabel(
-                table_frame,
-                text=f"{data['payment']:,.2f}",
-                font=ctk.CTkFont(size=11),
-                height=25
-            )
-            payment_label.grid(row=row, column=1, padx=1, pady=1, sticky="nsew")
-            
-            remaining_label = ctk.CTkLabel(
-                table_frame,
-                text=f"{data['remaining']:,.2f}",
-                font=ctk.CTkFont(size=11),
-                height=25
-            )
-            remaining_label.grid(row=row, column=2, padx=1, pady=1, sticky="nsew")
-
-def main():
-    app = LoanCalculator()
-    app.mainloop()
-
-if __name__ == "__main__":
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+
+import customtkinter as ctk
+import tkinter as tk
+from tkinter import filedialog, ttk
+
+import loan_background
+import loan_cache
+import loan_engine
+import loan_instrumentation
+import loan_money
+
+# Set appearance mode and color theme
+ctk.set_appearance_mode("light")  # Default to light mode
+ctk.set_default_color_theme("blue")  # Can be "blue", "green", "dark-blue"
+
+# Quiet period after the last keystroke before a live recalculation
+LIVE_RECALC_DELAY_MS = 250
+
+class LoanCalculator(ctk.CTk):
+    def __init__(self, quote_table=None, rules=None, product=None, archive=None):
+        super().__init__()
+        
+        # Configure window
+        self.title("💰 Loan Repayment Calculator")
+        self.geometry("1000x800")
+        self.minsize(900, 700)
+        
+        # Create main container with scrollbar
+        self.main_frame = ctk.CTkFrame(self, corner_radius=10)
+        self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Create canvas and scrollbar for scrollable content
+        self.canvas = tk.Canvas(self.main_frame, highlightthickness=0)
+        self.scrollbar = ctk.CTkScrollbar(self.main_frame, orientation="vertical", command=self.canvas.yview)
+        self.scrollable_frame = ctk.CTkFrame(self.canvas, corner_radius=10)
+        
+        self.scrollable_frame.bind(
+            "<Configure>",
+            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        )
+        
+        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        
+        self.canvas.pack(side="left", fill="both", expand=True, padx=(0, 5))
+        self.scrollbar.pack(side="right", fill="y", padx=(5, 0))
+        
+        # Bind mouse wheel to canvas
+        self.canvas.bind("<Enter>", self._bind_to_mousewheel)
+        self.canvas.bind("<Leave>", self._unbind_from_mousewheel)
+        
+        # Initialize variables
+        self.loan_amount = ctk.DoubleVar(value=5000.0)
+        self.repayment_months = ctk.IntVar(value=6)
+        
+        # Fee schedule: products from a loan_rules.RuleBook, or the built-in defaults
+        self.rules = rules
+        self.product_name = ctk.StringVar(value=product or (rules.names()[0] if rules else ""))
+        self.product_optionmenu = None
+        self._rules_version = rules.version if rules else None
+        self.active_fees = self.current_fees()
+        
+        # Quotes issued with the Calculate button go to a loan_archive.QuoteArchive
+        self.archive = archive
+        
+        # Recently calculated quotes and their display strings; quotes on
+        # the precomputed grid are answered from quote_table
+        self.quote_cache = loan_cache.QuoteCache(maxsize=256, table=quote_table)
+        
+        # Live recalculation: input changes are debounced with after()
+        self.live_mode = ctk.BooleanVar(value=True)
+        self._live_after_id = None
+        self.loan_amount.trace_add("write", self._on_input_changed)
+        self.repayment_months.trace_add("write", self._on_input_changed)
+        self.product_name.trace_add("write", self._on_input_changed)
+        
+        # Runs bulk jobs and tenor comparisons off the UI thread, side by side
+        self.background = loan_background.BackgroundRunner(self, max_workers=2)
+        self.background_task = None
+        self.comparison_task = None
+        
+        # Create UI elements
+        self.create_widgets()
+        
+    def _bind_to_mousewheel(self, event):
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+    
+    def _unbind_from_mousewheel(self, event):
+        self.canvas.unbind_all("<MouseWheel>")
+    
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+    
+    def create_widgets(self):
+        # Title Section
+        title_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
+        title_frame.pack(fill="x", padx=20, pady=(10, 5))
+        
+        title_label = ctk.CTkLabel(
+            title_frame, 
+            text="💰 Loan Repayment Calculator",
+            font=ctk.CTkFont(size=24, weight="bold")
+        )
+        title_label.pack(pady=(15, 5))
+        
+        subtitle_label = ctk.CTkLabel(
+            title_frame,
+            text="Money Lending Services",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        subtitle_label.pack(pady=(0, 15))
+        
+        # Separator
+        separator1 = ctk.CTkFrame(title_frame, height=2, fg_color="gray")
+        separator1.pack(fill="x", padx=10, pady=5)
+        
+        # Main Content Frame
+        content_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
+        content_frame.pack(fill="both", expand=True, padx=20, pady=10)
+        
+        # Create two columns
+        left_column = ctk.CTkFrame(content_frame, corner_radius=10)
+        left_column.pack(side="left", fill="both", expand=True, padx=(0, 10))
+        
+        right_column = ctk.CTkFrame(content_frame, corner_radius=10)
+        right_column.pack(side="right", fill="both", expand=True, padx=(10, 0))
+        
+        # Left Column - Input Section
+        self.create_input_section(left_column)
+        self.create_bulk_section(left_column)
+        
+        # Right Column - How it Works
+        self.create_info_section(right_column)
+        
+        # Results Section
+        self.create_results_section()
+        
+        # Tenor Comparison
+        self.create_comparison_section()
+        
+        # Disclaimer
+        self.create_disclaimer()
+    
+    def create_input_section(self, parent):
+        input_frame = ctk.CTkFrame(parent, corner_radius=10)
+        input_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Title
+        input_title = ctk.CTkLabel(
+            input_frame,
+            text="Loan Details",
+            font=ctk.CTkFont(size=18, weight="bold")
+        )
+        input_title.pack(pady=(10, 15))
+        
+        # Product Selection (only with a fee schedule file)
+        if self.rules is not None:
+            product_label = ctk.CTkLabel(
+                input_frame,
+                text="Product:",
+                font=ctk.CTkFont(size=14)
+            )
+            product_label.pack(anchor="w", padx=20, pady=(5, 0))
+            
+            self.product_optionmenu = ctk.CTkOptionMenu(
+                input_frame,
+                variable=self.product_name,
+                values=self.rules.names(),
+                command=lambda _: self.refresh_fee_rules(),
+                width=200,
+                font=ctk.CTkFont(size=14),
+                corner_radius=8
+            )
+            self.product_optionmenu.pack(pady=(5, 15), padx=20)
+        
+        # Loan Amount Input
+        loan_label = ctk.CTkLabel(
+            input_frame,
+            text="Loan Amount (RM):",
+            font=ctk.CTkFont(size=14)
+        )
+        loan_label.pack(anchor="w", padx=20, pady=(5, 0))
+        
+        loan_entry = ctk.CTkEntry(
+            input_frame,
+            textvariable=self.loan_amount,
+            width=200,
+            font=ctk.CTkFont(size=14),
+            corner_radius=8
+        )
+        loan_entry.pack(pady=(5, 15), padx=20)
+        
+        # Repayment Period Input
+        period_label = ctk.CTkLabel(
+            input_frame,
+            text="Repayment Period (Months):",
+            font=ctk.CTkFont(size=14)
+        )
+        period_label.pack(anchor="w", padx=20, pady=(5, 0))
+        
+        self.period_optionmenu = ctk.CTkOptionMenu(
+            input_frame,
+            variable=self.repayment_months,
+            values=tenor_values(self.active_fees),
+            width=200,
+            font=ctk.CTkFont(size=14),
+            corner_radius=8
+        )
+        self.period_optionmenu.pack(pady=(5, 20), padx=20)
+        
+        # Calculate Button
+        calculate_btn = ctk.CTkButton(
+            input_frame,
+            text="Calculate Repayment",
+            command=self.calculate,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            corner_radius=8,
+            height=40
+        )
+        calculate_btn.pack(pady=(20, 10), padx=20)
+        
+        # Live Update Switch
+        live_switch = ctk.CTkSwitch(
+            input_frame,
+            text="Update results as I type",
+            variable=self.live_mode,
+            command=self._on_live_mode_changed,
+            font=ctk.CTkFont(size=12)
+        )
+        live_switch.pack(pady=(0, 20), padx=20)
+    
+    def create_bulk_section(self, parent):
+        bulk_frame = ctk.CTkFrame(parent, corner_radius=10)
+        bulk_frame.pack(fill="x", padx=10, pady=(0, 10))
+        
+        # Title
+        bulk_title = ctk.CTkLabel(
+            bulk_frame,
+            text="Bulk Pricing",
+            font=ctk.CTkFont(size=18, weight="bold")
+        )
+        bulk_title.pack(pady=(10, 10))
+        
+        buttons_frame = ctk.CTkFrame(bulk_frame, fg_color="transparent")
+        buttons_frame.pack(pady=(0, 10), padx=20)
+        
+        self.bulk_button = ctk.CTkButton(
+            buttons_frame,
+            text="Price CSV File…",
+            command=self.price_csv_file,
+            font=ctk.CTkFont(size=13),
+            corner_radius=8,
+            width=140
+        )
+        self.bulk_button.pack(side="left", padx=(0, 5))
+        
+        self.bulk_cancel_button = ctk.CTkButton(
+            buttons_frame,
+            text="Cancel",
+            command=self.cancel_background_job,
+            font=ctk.CTkFont(size=13),
+            corner_radius=8,
+            width=80,
+            state="disabled"
+        )
+        self.bulk_cancel_button.pack(side="left", padx=(5, 0))
+        
+        self.bulk_progress = ctk.CTkProgressBar(bulk_frame, mode="indeterminate", width=220)
+        self.bulk_progress.set(0)
+        self.bulk_progress.pack(pady=(0, 5), padx=20)
+        
+        self.bulk_status = ctk.CTkLabel(bulk_frame, text="", font=ctk.CTkFont(size=12))
+        self.bulk_status.pack(pady=(0, 10), padx=20)
+    
+    def price_csv_file(self):
+        if self.background_task is not None and not self.background_task.done:
+            return
+        
+        input_path = filedialog.askopenfilename(
+            title="Select loan applications",
+            filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet"), ("All files", "*.*")]
+        )
+        if not input_path:
+            return
+        output_path = filedialog.asksaveasfilename(
+            title="Save quotes as",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet")]
+        )
+        if not output_path:
+            return
+        
+        self.background_task = self.background.submit(
+            price_file_job, input_path, output_path,
+            on_result=self._on_bulk_result,
+            on_error=self._on_bulk_error,
+            on_progress=self._on_bulk_progress,
+            on_cancel=self._on_bulk_cancelled
+        )
+        self._set_bulk_running(True, "Pricing…")
+    
+    def cancel_background_job(self):
+        if self.background_task is not None:
+            self.background_task.cancel()
+            self.bulk_status.configure(text="Cancelling…")
+    
+    def _set_bulk_running(self, running, status):
+        self.bulk_button.configure(state="disabled" if running else "normal")
+        self.bulk_cancel_button.configure(state="normal" if running else "disabled")
+        if running:
+            self.bulk_progress.start()
+        else:
+            self.bulk_progress.stop()
+            self.bulk_progress.set(0)
+        self.bulk_status.configure(text=status)
+    
+    def _on_bulk_progress(self, rows, valid_rows):
+        self.bulk_status.configure(text=f"Priced {rows:,} rows ({valid_rows:,} valid)…")
+    
+    def _on_bulk_result(self, stats):
+        self._set_bulk_running(
+            False,
+            f"Priced {stats['rows']:,} rows ({stats['valid_rows']:,} valid) in {stats['seconds']:.1f}s"
+        )
+    
+    def _on_bulk_error(self, error):
+        self._set_bulk_running(False, "Pricing failed")
+        tk.messagebox.showerror("Error", f"Bulk pricing failed: {error}")
+    
+    def _on_bulk_cancelled(self):
+        self._set_bulk_running(False, "Pricing cancelled")
+    
+    def destroy(self):
+        if self.background_task is not None:
+            self.background_task.cancel()
+        self.background.shutdown()
+        super().destroy()
+    
+    def create_info_section(self, parent):
+        info_frame = ctk.CTkFrame(parent, corner_radius=10)
+        info_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Title
+        info_title = ctk.CTkLabel(
+            info_frame,
+            text="How it Works",
+            font=ctk.CTkFont(size=18, weight="bold")
+        )
+        info_title.pack(pady=(10, 15))
+        
+        # Info Text
+        self.info_label = ctk.CTkLabel(
+            info_frame,
+            text=fee_info_text(self.active_fees),
+            font=ctk.CTkFont(size=13),
+            justify="left"
+        )
+        self.info_label.pack(pady=10, padx=20, anchor="w")
+    
+    def create_results_section(self):
+        # Results Frame
+        self.results_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
+        self.results_frame.pack(fill="x", padx=20, pady=10)
+        
+        # Fonts shared by all results widgets
+        self.results_fonts = {
+            "title": ctk.CTkFont(size=20, weight="bold"),
+            "section": ctk.CTkFont(size=18, weight="bold"),
+            "heading": ctk.CTkFont(size=14, weight="bold"),
+            "value": ctk.CTkFont(size=16, weight="bold"),
+            "row": ctk.CTkFont(size=12),
+            "row_bold": ctk.CTkFont(size=12, weight="bold"),
+            "header": ctk.CTkFont(size=12, weight="bold"),
+            "cell": ctk.CTkFont(size=11)
+        }
+        
+        # Results widgets are built once and only updated on recalculation.
+        # They stay hidden until the first successful calculation.
+        self.results_content = ctk.CTkFrame(self.results_frame, fg_color="transparent")
+        self.results_visible = False
+        
+        # Render time of the last calculation; widgets are only counted by
+        # measure_recalculation so the tree is not walked on every calculation
+        self.render_stats = {"seconds": 0.0}
+        
+        # Results Title
+        results_title = ctk.CTkLabel(
+            self.results_content,
+            text="Calculation Results",
+            font=self.results_fonts["title"]
+        )
+        results_title.pack(pady=(15, 20))
+        
+        # Main Results Grid
+        results_grid = ctk.CTkFrame(self.results_content, corner_radius=10)
+        results_grid.pack(fill="x", padx=20, pady=10)
+        
+        # Create 4 columns for results
+        for i in range(4):
+            results_grid.columnconfigure(i, weight=1)
+        
+        summary_items = [
+            ("monthly_installment", "Monthly Installment"),
+            ("total_repayment", "Total Repayment"),
+            ("repayment_period_interest_rate", "Repayment Period Interest Rate"),
+            ("monthly_interest_rate_percent", "Monthly Interest Rate")
+        ]
+        
+        self.summary_labels = {}
+        for column, (key, heading) in enumerate(summary_items):
+            card = ctk.CTkFrame(results_grid, corner_radius=8)
+            card.grid(row=0, column=column, padx=10, pady=10, sticky="nsew")
+            
+            ctk.CTkLabel(card, text=heading, font=self.results_fonts["heading"]).pack(pady=(10, 5))
+            value_label = ctk.CTkLabel(card, text="", font=self.results_fonts["value"])
+            value_label.pack(pady=(0, 10))
+            self.summary_labels[key] = value_label
+        
+        # Detailed Breakdown Section
+        self.create_detailed_breakdown()
+        
+        # Repayment Schedule
+        self.create_repayment_schedule()
+        
+        # Additional Info
+        additional_frame = ctk.CTkFrame(self.results_content, corner_radius=10)
+        additional_frame.pack(fill="x", padx=20, pady=10)
+        
+        self.additional_label = ctk.CTkLabel(
+            additional_frame,
+            text="",
+            font=self.results_fonts["row"]
+        )
+        self.additional_label.pack(pady=10)
+        
+        # Statement export of the last calculation
+        ctk.CTkButton(
+            self.results_content,
+            text="Export Statement…",
+            command=self.export_statement,
+            font=ctk.CTkFont(size=13),
+            corner_radius=8
+        ).pack(pady=(0, 15))
+        
+        self.last_quote = None
+        
+    def export_statement(self):
+        if self.last_quote is None:
+            return
+        
+        output_path = filedialog.asksaveasfilename(
+            title="Save statement as",
+            defaultextension=".pdf",
+            filetypes=[("PDF files", "*.pdf"), ("Excel workbooks", "*.xlsx"), ("CSV files", "*.csv")]
+        )
+        if not output_path:
+            return
+        
+        import loan_export
+        result, fees = self.last_quote
+        try:
+            loan_export.export_statement(result, output_path, fees)
+        except (OSError, ValueError) as e:
+            tk.messagebox.showerror("Export Error", f"Could not export the statement: {e}")
+        
+    def create_comparison_section(self):
+        comparison_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
+        comparison_frame.pack(fill="x", padx=20, pady=10)
+        
+        comparison_title = ctk.CTkLabel(
+            comparison_frame,
+            text="Compare All Tenors",
+            font=ctk.CTkFont(size=18, weight="bold")
+        )
+        comparison_title.pack(pady=(10, 10))
+        
+        controls_frame = ctk.CTkFrame(comparison_frame, fg_color="transparent")
+        controls_frame.pack(pady=(0, 10), padx=20)
+        
+        ctk.CTkLabel(
+            controls_frame,
+            text="Max Monthly Installment (RM, optional):",
+            font=ctk.CTkFont(size=13)
+        ).pack(side="left", padx=(0, 10))
+        
+        self.max_installment = ctk.StringVar(value="")
+        ctk.CTkEntry(
+            controls_frame,
+            textvariable=self.max_installment,
+            width=120,
+            font=ctk.CTkFont(size=13),
+            corner_radius=8
+        ).pack(side="left", padx=(0, 10))
+        
+        ctk.CTkButton(
+            controls_frame,
+            text="Compare Tenors",
+            command=self.compare_tenors,
+            font=ctk.CTkFont(size=13, weight="bold"),
+            corner_radius=8
+        ).pack(side="left")
+        
+        # One row per tenor, filled in by compare_tenors
+        months = range(self.active_fees.min_months, self.active_fees.max_months + 1)
+        columns = {
+            "months": "Months",
+            "installment": "Monthly Installment (RM)",
+            "total": "Total Repayment (RM)",
+            "fees": "Total Fees (RM)",
+            "rate": "Monthly Interest Rate",
+            "max_loan": "Max Loan at Cap (RM)"
+        }
+        self.comparison_table = ttk.Treeview(
+            comparison_frame,
+            columns=tuple(columns),
+            show="headings",
+            height=len(months),
+            selectmode="browse",
+            style="Schedule.Treeview"
+        )
+        for column, header in columns.items():
+            self.comparison_table.heading(column, text=header)
+            self.comparison_table.column(column, anchor="center", width=120, stretch=True)
+        self.comparison_rows = [
+            self.comparison_table.insert("", "end", values=(str(n),) + ("",) * 5) for n in months
+        ]
+        self.comparison_visible = False
+    
+    def compare_tenors(self):
+        if self.comparison_task is not None and not self.comparison_task.done:
+            return
+        
+        try:
+            loan_amount = self.loan_amount.get()
+            fees = self.refresh_fee_rules()
+            loan_engine.validate_quote(loan_amount, fees.min_months, fees)
+            
+            cap_text = self.max_installment.get().replace(",", "").strip()
+            max_installment = float(cap_text) if cap_text else None
+            if max_installment is not None and max_installment <= 0:
+                raise ValueError("Max monthly installment must be positive")
+        except ValueError as e:
+            tk.messagebox.showerror("Error", f"Error: {e}")
+            return
+        except Exception as e:
+            tk.messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+            return
+        
+        self.comparison_task = self.background.submit(
+            compare_tenors_job, loan_amount, fees, max_installment,
+            on_result=self._on_comparison_result,
+            on_error=self._on_comparison_error
+        )
+    
+    def _on_comparison_error(self, error):
+        tk.messagebox.showerror("Error", f"An unexpected error occurred: {error}")
+    
+    def _on_comparison_result(self, outcome):
+        loan_amount, comparison, max_loans = outcome
+        
+        # One row per tenor; the range can change with the product
+        num_tenors = len(comparison['repayment_months'])
+        if num_tenors != len(self.comparison_rows):
+            self.comparison_table.delete(*self.comparison_rows)
+            self.comparison_rows = [
+                self.comparison_table.insert("", "end", values=("",) * 6) for _ in range(num_tenors)
+            ]
+            self.comparison_table.configure(height=num_tenors)
+        
+        for index, row_id in enumerate(self.comparison_rows):
+            if max_loans is None:
+                max_loan = ""
+            elif math.isnan(max_loans[index]):  # cap does not cover the monthly fee
+                max_loan = "—"
+            else:
+                max_loan = f"{max_loans[index]:,.2f}"
+            
+            # Same sen rounding as the results cards and the schedule
+            sen = loan_money.quote_sen({
+                'loan_amount': loan_amount,
+                'repayment_months': int(comparison['repayment_months'][index]),
+                'management_cost': float(comparison['management_cost'][index]),
+                'stamp_duty': float(comparison['stamp_duty'][index])
+            })
+            self.comparison_table.item(row_id, values=(
+                str(sen['repayment_months']),
+                f"{loan_money.from_sen(sen['monthly_installment_sen']):,}",
+                f"{loan_money.from_sen(sen['total_repayment_sen']):,}",
+                f"{loan_money.from_sen(sen['total_fees_sen']):,}",
+                loan_engine.format_interest_rate(float(comparison['monthly_interest_rate_percent'][index])),
+                max_loan
+            ))
+        
+        if not self.comparison_visible:
+            self.comparison_table.pack(fill="x", padx=10, pady=(0, 10))
+            self.comparison_visible = True
+    
+    def create_disclaimer(self):
+        disclaimer_frame = ctk.CTkFrame(self.scrollable_frame, corner_radius=10)
+        disclaimer_frame.pack(fill="x", padx=20, pady=(10, 20))
+        
+        disclaimer_text = (
+            "⚠️ Disclaimer: This loan repayment calculator is for informational purposes only. "
+            "It does not provide financial advice, offer loans, or represent a licensed money lending service."
+        )
+        
+        disclaimer_label = ctk.CTkLabel(
+            disclaimer_frame,
+            text=disclaimer_text,
+            font=ctk.CTkFont(size=11),
+            wraplength=900,
+            justify="center"
+        )
+        disclaimer_label.pack(pady=15, padx=20)
+    
+    def calculate_loan_repayment(self, loan_amount, num_months):
+        """
+        Core function to calculate loan repayment details
+        """
+        return loan_engine.calculate_loan_repayment(loan_amount, num_months)
+    
+    def format_interest_rate(self, rate):
+        """
+        Format interest rate to 3 decimal places if there are non-zero digits after 2 decimal places
+        """
+        return loan_engine.format_interest_rate(rate)
+    
+    def clear_results(self):
+        """Hide previous results"""
+        if self.results_visible:
+            self.results_content.pack_forget()
+            self.results_visible = False
+    
+    def show_results(self):
+        if not self.results_visible:
+            self.results_content.pack(fill="x")
+            self.results_visible = True
+    
+    def current_fees(self):
+        """Fee schedule of the selected product, effective today"""
+        if self.rules is None:
+            return loan_engine.DEFAULT_FEES
+        return self.rules.product(self.product_name.get() or None).fees
+    
+    def refresh_fee_rules(self):
+        """
+        Pick up product changes and fee schedule file reloads, updating the
+        product list and, when the active fees change, the fee text and
+        tenor choices
+        """
+        if self.rules is not None:
+            names = self.rules.names()
+            if self.rules.version != self._rules_version:
+                self._rules_version = self.rules.version
+                self.product_optionmenu.configure(values=names)
+                # The selected product may have been removed from the file
+                if self.product_name.get() not in names:
+                    self.product_name.set(names[0])
+        
+        fees = self.current_fees()
+        if fees != self.active_fees:
+            self.active_fees = fees
+            self.info_label.configure(text=fee_info_text(fees))
+            self.period_optionmenu.configure(values=tenor_values(fees))
+        return fees
+    
+    def _on_input_changed(self, *args):
+        if not self.live_mode.get():
+            return
+        
+        # Restart the quiet period; intermediate values are never calculated
+        self._cancel_live_calculate()
+        self._live_after_id = self.after(LIVE_RECALC_DELAY_MS, self._live_calculate)
+    
+    def _on_live_mode_changed(self):
+        # Input typed just before switching off must not update the results
+        if not self.live_mode.get():
+            self._cancel_live_calculate()
+    
+    def _cancel_live_calculate(self):
+        if self._live_after_id is not None:
+            self.after_cancel(self._live_after_id)
+            self._live_after_id = None
+    
+    def _live_calculate(self):
+        self._live_after_id = None
+        self.calculate(show_errors=False)
+    
+    def calculate(self, show_errors=True):
+        # A click supersedes any pending live recalculation
+        self._cancel_live_calculate()
+        
+        start = time.perf_counter()
+        with loan_instrumentation.phase("calculate"):
+            self._calculate(show_errors)
+        
+        self.render_stats = {"seconds": time.perf_counter() - start}
+    
+    def _calculate(self, show_errors=True):
+        try:
+            with loan_instrumentation.phase("validation"):
+                loan_amount = self.loan_amount.get()
+                num_months = self.repayment_months.get()
+                fees = self.refresh_fee_rules()
+                loan_engine.validate_quote(loan_amount, num_months, fees)
+            
+            # Calculate loan details and display strings (cached)
+            result, display = self.quote_cache.get(loan_amount, num_months, fees)
+            
+            with loan_instrumentation.phase("breakdown_rendering"):
+                # Update the existing results widgets
+                for key, value_label in self.summary_labels.items():
+                    value_label.configure(text=display[key])
+                
+                # Detailed Breakdown Section
+                self.update_detailed_breakdown(result, display)
+            
+            # Repayment Schedule
+            with loan_instrumentation.phase("schedule_rendering"):
+                self.update_repayment_schedule(result)
+            
+            # Additional Info
+            self.additional_label.configure(
+                text=f"Additional Information: Monthly interest rate as decimal: {result['monthly_interest_rate_decimal']:.4f}"
+            )
+            
+            self.show_results()
+            self.last_quote = (result, fees)
+            
+            # Live previews are not issued; only archive explicit calculations.
+            # The quote stays on screen if it cannot be archived
+            if self.archive is not None and show_errors:
+                try:
+                    self.archive.append(result, fees)
+                except Exception as e:
+                    tk.messagebox.showwarning("Archive", f"The quote could not be archived: {e}")
+            
+            # Tk normally lays out on idle; force it so the cost can be measured
+            if loan_instrumentation.is_enabled():
+                with loan_instrumentation.phase("tk_layout"):
+                    self.update_idletasks()
+            
+        except ValueError as e:
+            self.clear_results()
+            if show_errors:
+                tk.messagebox.showerror("Error", f"Error: {e}")
+        except Exception as e:
+            # Live updates see half-typed input (e.g. an empty amount); just hide the results
+            self.clear_results()
+            if show_errors:
+                tk.messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+    
+    def create_detailed_breakdown(self):
+        # Detailed Breakdown Container
+        breakdown_container = ctk.CTkFrame(self.results_content, corner_radius=10)
+        breakdown_container.pack(fill="x", padx=20, pady=10)
+        
+        breakdown_title = ctk.CTkLabel(
+            breakdown_container,
+            text="Detailed Cost Breakdown",
+            font=self.results_fonts["section"]
+        )
+        breakdown_title.pack(pady=(10, 15))
+        
+        # Two columns for breakdown
+        breakdown_columns = ctk.CTkFrame(breakdown_container)
+        breakdown_columns.pack(fill="x", padx=10, pady=10)
+        breakdown_columns.columnconfigure(0, weight=1)
+        breakdown_columns.columnconfigure(1, weight=1)
+        
+        # Cost Components
+        cost_frame = ctk.CTkFrame(breakdown_columns, corner_radius=8)
+        cost_frame.grid(row=0, column=0, padx=10, pady=5, sticky="nsew")
+        
+        ctk.CTkLabel(cost_frame, text="Cost Components", 
+                    font=self.results_fonts["heading"]).pack(pady=(10, 10))
+        
+        self.cost_rows = []
+        for _ in range(4):
+            row_frame = ctk.CTkFrame(cost_frame, fg_color="transparent")
+            row_frame.pack(fill="x", padx=10, pady=2)
+            
+            component_label = ctk.CTkLabel(row_frame, text="", 
+                        font=self.results_fonts["row"], anchor="w")
+            component_label.pack(side="left")
+            amount_label = ctk.CTkLabel(row_frame, text="", 
+                        font=self.results_fonts["row_bold"], anchor="e")
+            amount_label.pack(side="right")
+            self.cost_rows.append((component_label, amount_label))
+        
+        # Interest Calculation
+        interest_frame = ctk.CTkFrame(breakdown_columns, corner_radius=8)
+        interest_frame.grid(row=0, column=1, padx=10, pady=5, sticky="nsew")
+        
+        ctk.CTkLabel(interest_frame, text="Interest Calculation", 
+                    font=self.results_fonts["heading"]).pack(pady=(10, 10))
+        
+        self.interest_rows = []
+        for _ in range(4):
+            row_frame = ctk.CTkFrame(interest_frame, fg_color="transparent")
+            row_frame.pack(fill="x", padx=10, pady=2)
+            
+            description_label = ctk.CTkLabel(row_frame, text="", 
+                        font=self.results_fonts["row"], anchor="w")
+            description_label.pack(side="left")
+            calc_label = ctk.CTkLabel(row_frame, text="", 
+                                    font=self.results_fonts["cell"], anchor="e", wraplength=300)
+            calc_label.pack(side="right")
+            self.interest_rows.append((description_label, calc_label))
+    
+    def update_detailed_breakdown(self, result, display=None):
+        cost_data, interest_data = loan_engine.breakdown_rows(result, self.active_fees, display)
+        
+        for (component_label, amount_label), (component, amount) in zip(self.cost_rows, cost_data):
+            component_label.configure(text=component)
+            amount_label.configure(text=amount)
+        
+        for (description_label, calc_label), (description, calculation) in zip(self.interest_rows, interest_data):
+            description_label.configure(text=description)
+            calc_label.configure(text=calculation)
+    
+    def create_repayment_schedule(self):
+        schedule_frame = ctk.CTkFrame(self.results_content, corner_radius=10)
+        schedule_frame.pack(fill="x", padx=20, pady=10)
+        
+        schedule_title = ctk.CTkLabel(
+            schedule_frame,
+            text="Repayment Schedule",
+            font=self.results_fonts["section"]
+        )
+        schedule_title.pack(pady=(10, 15))
+        
+        # Virtualized table: only the visible rows exist as Treeview items
+        self.schedule_table = ScheduleTable(schedule_frame)
+        self.schedule_table.pack(fill="x", padx=10, pady=10)
+    
+    def update_repayment_schedule(self, result):
+        self.schedule_table.show(result)
+
+
+class ScheduleTable(ctk.CTkFrame):
+    """
+    Repayment schedule table that only renders the visible rows.
+    
+    The Treeview holds a fixed number of items that are refilled from
+    loan_money.iter_repayment_schedule as the table is scrolled, so the
+    widget count and memory use do not depend on the number of months.
+    """
+    
+    def __init__(self, parent, visible_rows=12):
+        super().__init__(parent, corner_radius=8)
+        
+        self.visible_rows = visible_rows
+        self.result = None
+        self.total_rows = 0
+        self.first_row = 0
+        
+        self.cell_font = ctk.CTkFont(size=11)
+        self.header_font = ctk.CTkFont(size=12, weight="bold")
+        
+        style = ttk.Style(self)
+        style.configure("Schedule.Treeview", rowheight=25, font=self.cell_font)
+        style.configure("Schedule.Treeview.Heading", font=self.header_font)
+        
+        headers = ["Month", "Payment (RM)", "Remaining Balance (RM)"]
+        self.tree = ttk.Treeview(
+            self,
+            columns=("month", "payment", "remaining"),
+            show="headings",
+            height=visible_rows,
+            selectmode="none",
+            style="Schedule.Treeview"
+        )
+        for column, header in zip(self.tree["columns"], headers):
+            self.tree.heading(column, text=header)
+            self.tree.column(column, anchor="center", stretch=True)
+        
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self._on_scrollbar)
+        
+        self.tree.pack(side="left", fill="both", expand=True, padx=(1, 0), pady=1)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        # Fixed pool of row items, detached when fewer rows are needed
+        self.row_ids = [self.tree.insert("", "end", values=("", "", "")) for _ in range(visible_rows)]
+        self.rows_attached = visible_rows
+        
+        # Scroll the table itself, not the page, while the pointer is over it
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_mousewheel)
+    
+    def show(self, result):
+        self.result = result
+        self.total_rows = int(result['repayment_months'])
+        self.first_row = 0
+        
+        # Shrink the table for short schedules
+        shown_rows = min(self.visible_rows, self.total_rows)
+        self.tree.configure(height=shown_rows)
+        for index, row_id in enumerate(self.row_ids):
+            if index < shown_rows and index >= self.rows_attached:
+                self.tree.move(row_id, "", index)
+            elif index >= shown_rows and index < self.rows_attached:
+                self.tree.detach(row_id)
+        self.rows_attached = shown_rows
+        
+        self.refresh()
+    
+    def refresh(self):
+        rows = itertools.islice(
+            loan_money.iter_repayment_schedule(self.result),
+            self.first_row,
+            self.first_row + self.rows_attached
+        )
+        for row_id, data in zip(self.row_ids, rows):
+            self.tree.item(row_id, values=(
+                str(data["month"]),
+                f"{data['payment']:,.2f}",
+                f"{data['remaining']:,.2f}"
+            ))
+        
+        if self.total_rows:
+            self.scrollbar.set(
+                self.first_row / self.total_rows,
+                (self.first_row + self.rows_attached) / self.total_rows
+            )
+    
+    def scroll_to(self, first_row):
+        last_first_row = max(0, self.total_rows - self.rows_attached)
+        first_row = min(max(0, first_row), last_first_row)
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.refresh()
+    
+    def _on_scrollbar(self, action, value, units=None):
+        if action == "moveto":
+            self.scroll_to(round(float(value) * self.total_rows))
+        elif action == "scroll":
+            step = self.rows_attached if units == "pages" else 1
+            self.scroll_to(self.first_row + int(value) * step)
+    
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = int(-1 * (event.delta / 120)) or (-1 if event.delta > 0 else 1)
+        self.scroll_to(self.first_row + delta * 3)
+        return "break"
+
+
+def tenor_values(fees):
+    return [str(i) for i in range(fees.min_months, fees.max_months + 1)]
+
+
+def fee_info_text(fees):
+    """
+    "How it Works" text for a fee schedule, with a worked example
+    """
+    if fees.fee_tiers:
+        tier_lines = [
+            f"   {loan_engine.format_rm(fee)} up to {loan_engine.format_rm(up_to)}"
+            for up_to, fee in fees.fee_tiers
+        ]
+        tier_lines.append(
+            f"   {loan_engine.format_rm(fees.management_fee)} above {loan_engine.format_rm(fees.fee_tiers[-1][0])}"
+        )
+        fee_lines = "• Management Fee per month:\n" + "\n".join(tier_lines)
+    else:
+        fee_lines = f"• Management Fee: {loan_engine.format_rm(fees.management_fee)} per month"
+    
+    limit_line = ""
+    if fees.min_amount is not None or fees.max_amount is not None:
+        lowest = loan_engine.format_rm(fees.min_amount) if fees.min_amount is not None else "any amount"
+        highest = loan_engine.format_rm(fees.max_amount) if fees.max_amount is not None else "no limit"
+        limit_line = f"\n• Loan Amount: {lowest} to {highest}"
+    
+    # Worked example for RM5,000 over 6 months, kept inside the allowed ranges
+    amount = 5000
+    if fees.max_amount is not None:
+        amount = min(amount, fees.max_amount)
+    if fees.min_amount is not None:
+        amount = max(amount, fees.min_amount)
+    months = min(max(6, fees.min_months), fees.max_months)
+    fee = loan_engine.management_fee_for(amount, fees)
+    management_cost = fee * months
+    period_rate = management_cost / amount * 100
+    
+    return f"""
+Cost Structure:
+{fee_lines}
+• Stamp Duty: {loan_engine.format_percent(fees.stamp_duty_rate * 100)} of loan amount{limit_line}
+• Repayment: Salary deduction
+
+Interest Calculation:
+1. Repayment Period Interest Rate = (Total Management Cost / Loan Amount) × 100%
+2. Monthly Interest Rate = Repayment Period Interest Rate ÷ Number of Months
+
+Example ({loan_engine.format_rm(amount)} for {months} months):
+• Management: {months} × {loan_engine.format_rm(fee)} = {loan_engine.format_rm(management_cost)}
+• Repayment Period Interest Rate = ({management_cost:g} / {amount:g}) × 100% = {loan_engine.format_percent(period_rate)}
+• Monthly Interest Rate = {loan_engine.format_percent(period_rate)} ÷ {months} = {loan_engine.format_percent(period_rate / months)}
+        """
+
+
+def price_file_job(task, input_path, output_path):
+    """
+    Background job: price a CSV/Parquet file, removing the partial output if cancelled
+    """
+    import loan_bulk
+    
+    # Leave a core for the UI thread; with one core price in this thread
+    workers = max(1, (os.cpu_count() or 1) - 1)
+    try:
+        return loan_bulk.price_file(input_path, output_path, workers=workers,
+                                    progress=task.report_progress)
+    except loan_background.TaskCancelled:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+
+
+def compare_tenors_job(task, loan_amount, fees, max_installment):
+    """
+    Background job: every tenor in one vectorized pass, plus the closed-form
+    cap solver when a max installment is given
+    """
+    comparison = loan_engine.compare_tenors(loan_amount, fees)
+    max_loans = None
+    if max_installment is not None:
+        _, max_loans = loan_engine.max_loan_for_installment(max_installment, fees)
+    return loan_amount, comparison, max_loans
+
+
+def count_widgets(widget):
+    """Count a widget and all of its descendants"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def measure_recalculation(app, runs=20):
+    """
+    Recalculate `runs` times, alternating tenors so rows are shown and hidden,
+    and report the time per recalculation and the widget count before/after
+    """
+    app.update()
+    widgets_before = count_widgets(app)
+    timings = []
+    
+    for run in range(runs):
+        app.repayment_months.set(12 if run % 2 == 0 else 3)
+        app.calculate()
+        app.update_idletasks()
+        timings.append(app.render_stats["seconds"])
+    
+    timings.sort()
+    return {
+        "runs": runs,
+        "median_seconds": timings[len(timings) // 2],
+        "max_seconds": timings[-1],
+        "widgets_before": widgets_before,
+        "widgets_after": count_widgets(app)
+    }
+
+
+def write_startup_probe(app, path):
+    app.update()
+    with open(path, "w") as probe_file:
+        probe_file.write(f"{time.time():.6f}\n")
+    app.destroy()
+
+
+def main():
+    # The bulk pipeline runs a process pool; in the frozen executable each
+    # worker process starts here and must not open the GUI. freeze_support()
+    # does nothing when not frozen, so multiprocessing is only imported then
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+    
+    # Headless command-line modes
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk":
+        import loan_bulk
+        sys.exit(loan_bulk.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        import loan_server
+        sys.exit(loan_server.main(sys.argv[1:]))
+    
+    parser = argparse.ArgumentParser(description="Loan Repayment Calculator")
+    parser.add_argument("--quote-table", metavar="PATH",
+                        help="answer quotes from a precomputed table file, building it if needed "
+                             "for the product selected at start")
+    parser.add_argument("--rules", metavar="PATH",
+                        help="fee schedule file with the products to quote (see fee_schedules.json)")
+    parser.add_argument("--product", help="product to select at start (default: first in --rules)")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="append every calculated quote to this quote archive file")
+    args = parser.parse_args()
+    
+    rules = None
+    if args.rules:
+        import loan_rules
+        rules = loan_rules.RuleBook(args.rules)
+        if args.product is not None and args.product not in rules.names():
+            parser.error(f"unknown product {args.product!r}; choose from {', '.join(rules.names())}")
+    elif args.product is not None:
+        parser.error("--product requires --rules")
+    
+    archive = None
+    if args.archive:
+        import loan_archive
+        archive = loan_archive.QuoteArchive(args.archive)
+    
+    quote_table = None
+    if args.quote_table:
+        import loan_table
+        # The table answers quotes for the product selected at start
+        fees = rules.product(args.product).fees if rules else loan_engine.DEFAULT_FEES
+        quote_table = loan_table.QuoteTable.load_or_build(args.quote_table, fees=fees)
+    
+    loan_instrumentation.configure_from_env()
+    
+    app = LoanCalculator(quote_table=quote_table, rules=rules, product=args.product, archive=archive)
+    
+    # Used by startup_timing.py: record when the first window is drawn, then exit
+    probe_path = os.environ.get("LOAN_CALC_STARTUP_PROBE")
+    if probe_path:
+        app.after_idle(lambda: write_startup_probe(app, probe_path))
+    
+    app.mainloop()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,345 @@
+"""
+Loan pricing engine.
+
+Fee, stamp duty and interest rate calculations used by the desktop
+calculator. This module must not import customtkinter or tkinter so that
+quotes can be priced in headless worker processes.
+"""
+
+from collections import namedtuple
+import math
+
+# Fee schedule applied to every quote.
+# min_amount/max_amount of None mean no limit beyond a positive amount.
+# fee_tiers is an optional tuple of (up_to_amount, monthly_fee) pairs sorted by
+# amount; loans above the last tier pay management_fee.
+FeeSchedule = namedtuple(
+    "FeeSchedule",
+    ["management_fee", "stamp_duty_rate", "min_months", "max_months",
+     "min_amount", "max_amount", "fee_tiers"],
+    defaults=(None, None, None)
+)
+
+DEFAULT_FEES = FeeSchedule(
+    management_fee=15,       # RM15 per month
+    stamp_duty_rate=0.005,   # 0.5% of loan amount
+    min_months=1,
+    max_months=12
+)
+
+
+def validate_quote(loan_amount, num_months, fees=DEFAULT_FEES):
+    """
+    Raise ValueError if the loan amount or repayment period is not allowed
+    """
+    if not math.isfinite(loan_amount):
+        raise ValueError("Loan amount must be a finite number")
+
+    if loan_amount <= 0:
+        raise ValueError("Loan amount must be positive")
+
+    if fees.min_amount is not None and loan_amount < fees.min_amount:
+        raise ValueError(f"Loan amount must be at least RM{fees.min_amount:,.2f}")
+
+    if fees.max_amount is not None and loan_amount > fees.max_amount:
+        raise ValueError(f"Loan amount must not exceed RM{fees.max_amount:,.2f}")
+
+    if not float(num_months).is_integer():
+        raise ValueError("Repayment period must be a whole number of months")
+
+    if num_months < fees.min_months or num_months > fees.max_months:
+        raise ValueError(
+            f"Repayment period must be between {fees.min_months} and {fees.max_months} months"
+        )
+
+
+def management_fee_for(loan_amount, fees=DEFAULT_FEES):
+    """
+    Monthly management fee for a loan amount under a (possibly tiered) fee schedule
+    """
+    if fees.fee_tiers:
+        for up_to, fee in fees.fee_tiers:
+            if loan_amount <= up_to:
+                return fee
+    return fees.management_fee
+
+
+def calculate_loan_repayment(loan_amount, num_months, fees=DEFAULT_FEES):
+    """
+    Core function to calculate loan repayment details
+    """
+    validate_quote(loan_amount, num_months, fees)
+
+    # Calculate costs
+    management_cost = management_fee_for(loan_amount, fees) * num_months
+    stamp_duty = loan_amount * fees.stamp_duty_rate
+
+    # Calculate repayment details
+    total_repayment = loan_amount + management_cost + stamp_duty
+    monthly_installment = total_repayment / num_months
+
+    # Calculate interest rates according to the instructions
+    # 1. Interest rate for the repayment period (in percentage)
+    repayment_period_interest_rate = (management_cost / loan_amount) * 100
+
+    # 2. Monthly interest rate (in percentage)
+    monthly_interest_rate_percent = repayment_period_interest_rate / num_months
+
+    # 3. Monthly interest rate as decimal (optional)
+    monthly_interest_rate_decimal = management_cost / (loan_amount * num_months)
+
+    return {
+        'loan_amount': loan_amount,
+        'repayment_months': num_months,
+        'management_cost': management_cost,
+        'stamp_duty': stamp_duty,
+        'total_repayment': total_repayment,
+        'monthly_installment': monthly_installment,
+        'repayment_period_interest_rate': repayment_period_interest_rate,
+        'monthly_interest_rate_percent': monthly_interest_rate_percent,
+        'monthly_interest_rate_decimal': monthly_interest_rate_decimal,
+        'total_fees': management_cost + stamp_duty
+    }
+
+
+def format_interest_rate(rate):
+    """
+    Format interest rate to 3 decimal places if there are non-zero digits after 2 decimal places
+    """
+    if round(rate, 2) != rate:
+        return f"{rate:.3f}%"
+    else:
+        return f"{rate:.2f}%"
+
+
+# Result columns produced by the batch pricing functions
+BATCH_COLUMNS = (
+    'management_cost',
+    'stamp_duty',
+    'total_repayment',
+    'monthly_installment',
+    'repayment_period_interest_rate',
+    'monthly_interest_rate_percent',
+    'monthly_interest_rate_decimal',
+    'total_fees'
+)
+
+
+def batch_valid_mask(amounts, months, fees=DEFAULT_FEES):
+    """
+    Per-row version of validate_quote: True where the quote is allowed
+    """
+    import numpy as np
+
+    valid = np.isfinite(amounts) & (amounts > 0) & (months >= fees.min_months) & (months <= fees.max_months)
+    if not np.issubdtype(np.asarray(months).dtype, np.integer):
+        # Fractional tenors would be truncated by the integer sen path
+        valid &= months == np.floor(months)
+    if fees.min_amount is not None:
+        valid &= amounts >= fees.min_amount
+    if fees.max_amount is not None:
+        valid &= amounts <= fees.max_amount
+    return valid
+
+
+def batch_management_fees(amounts, fees=DEFAULT_FEES):
+    """
+    Per-row version of management_fee_for
+    """
+    import numpy as np
+
+    if not fees.fee_tiers:
+        return fees.management_fee
+    bounds = np.array([up_to for up_to, _ in fees.fee_tiers], dtype=np.float64)
+    tier_fees = np.array([fee for _, fee in fees.fee_tiers] + [fees.management_fee], dtype=np.float64)
+    return tier_fees[np.searchsorted(bounds, amounts, side="left")]
+
+
+def calculate_loan_repayment_batch(loan_amounts, num_months, fees=DEFAULT_FEES):
+    """
+    Vectorized version of calculate_loan_repayment for whole columns of loans.
+
+    Returns a dict of NumPy arrays keyed like the single-quote result plus a
+    boolean 'valid' mask. Rows that fail validation are not raised on; their
+    result columns are NaN and their 'valid' entry is False.
+    """
+    import numpy as np
+
+    amounts = np.asarray(loan_amounts, dtype=np.float64)
+    months = np.asarray(num_months, dtype=np.float64)
+    amounts, months = np.broadcast_arrays(amounts, months)
+
+    # Same rules as validate_quote, applied per row
+    valid = batch_valid_mask(amounts, months, fees)
+
+    # Substitute harmless values in invalid rows so no division warnings are raised
+    safe_amounts = np.where(valid, amounts, 1.0)
+    safe_months = np.where(valid, months, 1.0)
+
+    management_cost = batch_management_fees(safe_amounts, fees) * safe_months
+    stamp_duty = safe_amounts * fees.stamp_duty_rate
+    total_repayment = safe_amounts + management_cost + stamp_duty
+    repayment_period_interest_rate = (management_cost / safe_amounts) * 100
+
+    columns = {
+        'management_cost': management_cost,
+        'stamp_duty': stamp_duty,
+        'total_repayment': total_repayment,
+        'monthly_installment': total_repayment / safe_months,
+        'repayment_period_interest_rate': repayment_period_interest_rate,
+        'monthly_interest_rate_percent': repayment_period_interest_rate / safe_months,
+        'monthly_interest_rate_decimal': management_cost / (safe_amounts * safe_months),
+        'total_fees': management_cost + stamp_duty
+    }
+
+    result = {'loan_amount': amounts, 'repayment_months': months}
+    for name in BATCH_COLUMNS:
+        result[name] = np.where(valid, columns[name], np.nan)
+    result['valid'] = valid
+    return result
+
+
+def price_frame(frame, amount_column='loan_amount', months_column='repayment_months',
+                fees=DEFAULT_FEES):
+    """
+    Price every row of a pandas DataFrame.
+
+    Returns a copy of the frame with the batch result columns and the
+    'valid' mask appended. Other columns (e.g. application IDs) are kept.
+    Amounts or tenors that are not numbers make their row invalid.
+    """
+    import pandas as pd
+
+    result = calculate_loan_repayment_batch(
+        pd.to_numeric(frame[amount_column], errors="coerce").to_numpy(dtype="float64", na_value=float("nan")),
+        pd.to_numeric(frame[months_column], errors="coerce").to_numpy(dtype="float64", na_value=float("nan")),
+        fees
+    )
+    priced = frame.copy()
+    for name in BATCH_COLUMNS + ('valid',):
+        priced[name] = result[name]
+    return priced
+
+
+def compare_tenors(loan_amount, fees=DEFAULT_FEES):
+    """
+    Price one loan amount for every allowed tenor in a single vectorized pass.
+
+    Returns the calculate_loan_repayment_batch columns, one row per tenor.
+    """
+    import numpy as np
+
+    months = np.arange(fees.min_months, fees.max_months + 1)
+    return calculate_loan_repayment_batch(loan_amount, months, fees)
+
+
+def max_loan_for_installment(max_installment, fees=DEFAULT_FEES):
+    """
+    Largest loan amount per allowed tenor whose monthly installment does not
+    exceed max_installment (e.g. a salary-deduction cap).
+
+    The installment is (A + fee * n + A * stamp_duty_rate) / n, so for each
+    fee tier the amount is solved in closed form as
+    A = (max_installment - fee) * n / (1 + stamp_duty_rate), rounded down to
+    the sen and clipped to the tier and the schedule's amount limits.
+    Returns (months, amounts) arrays; tenors with no allowable amount get NaN.
+    """
+    import numpy as np
+
+    months = np.arange(fees.min_months, fees.max_months + 1)
+    upper_limit = np.inf if fees.max_amount is None else fees.max_amount
+    lower_limit = 0.0 if fees.min_amount is None else fees.min_amount
+
+    # (lowest amount, highest amount, monthly fee) for every tier
+    tiers = []
+    lower = 0.0
+    for up_to, fee in (fees.fee_tiers or ()):
+        tiers.append((lower, up_to, fee))
+        lower = up_to
+    tiers.append((lower, np.inf, fees.management_fee))
+
+    best = np.full(months.shape, np.nan)
+    for tier_lower, tier_upper, fee in tiers:
+        amounts = (max_installment - fee) * months / (1 + fees.stamp_duty_rate)
+
+        # Round down to the sen; the small epsilon keeps exact values like 1000.00
+        # from being floored to 999.99 by binary error
+        amounts = np.floor(amounts * 100 + 1e-6) / 100
+
+        # Step down one sen wherever rounding still leaves the installment over the cap
+        installments = (amounts + fee * months + amounts * fees.stamp_duty_rate) / months
+        amounts = np.where(installments > max_installment, np.round(amounts - 0.01, 2), amounts)
+
+        amounts = np.minimum(amounts, min(tier_upper, upper_limit))
+        allowed = (amounts > tier_lower) & (amounts > 0) & (amounts >= lower_limit)
+        best = np.where(allowed & ~(amounts <= best), amounts, best)
+
+    return months, best
+
+
+def format_money(amount):
+    """
+    Format an amount as a Ringgit display string, e.g. RM 5,115.00
+    """
+    return f"RM {amount:,.2f}"
+
+
+def format_rm(amount):
+    """Short Ringgit amount for descriptive text, e.g. RM15 or RM5,000"""
+    return f"RM{amount:,g}"
+
+
+def format_percent(rate):
+    return f"{round(rate, 3):g}%"
+
+
+def format_quote(result):
+    """
+    Pre-format the display strings shown for a calculate_loan_repayment result.
+
+    Money is shown in sen rounded as by loan_money.quote_sen, so the total
+    and installment match the repayment schedule.
+    """
+    import loan_money  # loan_money imports this module
+
+    sen = loan_money.quote_sen(result)
+    return {
+        'loan_amount': loan_money.format_sen(sen['loan_amount_sen']),
+        'management_cost': loan_money.format_sen(sen['management_cost_sen']),
+        'stamp_duty': loan_money.format_sen(sen['stamp_duty_sen']),
+        'total_repayment': loan_money.format_sen(sen['total_repayment_sen']),
+        'monthly_installment': loan_money.format_sen(sen['monthly_installment_sen']),
+        'repayment_period_interest_rate': format_interest_rate(result['repayment_period_interest_rate']),
+        'monthly_interest_rate_percent': format_interest_rate(result['monthly_interest_rate_percent'])
+    }
+
+
+def breakdown_rows(result, fees=DEFAULT_FEES, display=None):
+    """
+    (label, value) rows of the detailed cost breakdown for a result.
+
+    Returns (cost components, interest calculation) as shown by the
+    calculator and written to exported statements.
+    """
+    if display is None:
+        display = format_quote(result)
+
+    fee = format_rm(management_fee_for(result['loan_amount'], fees))
+    stamp_duty_rate = format_percent(fees.stamp_duty_rate * 100)
+
+    cost_rows = [
+        ("Loan Amount", display['loan_amount']),
+        (f"Management Cost ({result['repayment_months']} months × {fee})", display['management_cost']),
+        (f"Stamp Duty ({stamp_duty_rate})", display['stamp_duty']),
+        ("Total Repayment", display['total_repayment'])
+    ]
+
+    interest_rows = [
+        ("Total Management Cost", f"{result['repayment_months']} × {fee} = {display['management_cost']}"),
+        ("Loan Amount", display['loan_amount']),
+        ("Repayment Period Interest Rate",
+         f"({display['management_cost']} ÷ {display['loan_amount']}) × 100 = {result['repayment_period_interest_rate']:.3f}%"),
+        ("Monthly Interest Rate",
+         f"{result['repayment_period_interest_rate']:.3f}% ÷ {result['repayment_months']} = {result['monthly_interest_rate_percent']:.3f}%")
+    ]
+    return cost_rows, interest_rows
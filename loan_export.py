@@ -0,0 +1,615 @@
+"""
+Statement export.
+
+Writes a quote's cost breakdown and repayment schedule to CSV, XLSX or
+PDF straight from engine results, with no GUI involved. Each writer
+streams the schedule to the file as it is generated and uses only the
+standard library: XLSX files are SpreadsheetML parts in a zip archive and
+PDF files draw text in the built-in Helvetica fonts.
+
+export_batch() prices a file of loan applications with the batch engine
+and writes one statement per valid row, on a process pool if asked.
+
+Usage:
+    python loan_export.py statement 5000 6 statement.pdf
+    python loan_export.py batch applications.csv statements/ --formats pdf xlsx --workers 8
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import csv
+import os
+import re
+import sys
+import time
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+import loan_engine
+import loan_money
+
+FORMATS = ("csv", "xlsx", "pdf")
+DEFAULT_SHARD_SIZE = 500
+
+TITLE = "Loan Repayment Statement"
+SCHEDULE_HEADERS = ("Month", "Payment (RM)", "Remaining Balance (RM)")
+SUMMARY_ITEMS = (
+    ("monthly_installment", "Monthly Installment"),
+    ("total_repayment", "Total Repayment"),
+    ("repayment_period_interest_rate", "Repayment Period Interest Rate"),
+    ("monthly_interest_rate_percent", "Monthly Interest Rate")
+)
+
+
+def statement_sections(result, fees=loan_engine.DEFAULT_FEES):
+    """
+    [(heading, [(label, value), ...]), ...] for the summary and breakdown of a result
+    """
+    display = loan_engine.format_quote(result)
+    cost_rows, interest_rows = loan_engine.breakdown_rows(result, fees, display)
+    return [
+        ("Summary", [(heading, display[key]) for key, heading in SUMMARY_ITEMS]),
+        ("Cost Components", cost_rows),
+        ("Interest Calculation", interest_rows)
+    ]
+
+
+def write_csv(output_file, result, fees=loan_engine.DEFAULT_FEES, reference=None):
+    """
+    Write a statement to an open text file as CSV
+    """
+    writer = csv.writer(output_file)
+    writer.writerow([TITLE])
+    if reference is not None:
+        writer.writerow(["Reference", reference])
+
+    for heading, rows in statement_sections(result, fees):
+        writer.writerow([])
+        writer.writerow([heading])
+        writer.writerows(rows)
+
+    writer.writerow([])
+    writer.writerow(["Repayment Schedule"])
+    writer.writerow(SCHEDULE_HEADERS)
+    for row in loan_money.iter_repayment_schedule(result):
+        writer.writerow([row['month'], row['payment'], row['remaining']])
+
+
+# Minimal SpreadsheetML package: two worksheets and a style sheet with a
+# bold font (style 1) and a #,##0.00 number format (style 2)
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet2.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>'
+    '<sheet name="Breakdown" sheetId="1" r:id="rId1"/>'
+    '<sheet name="Schedule" sheetId="2" r:id="rId2"/>'
+    '</sheets>'
+    '</workbook>'
+)
+
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet2.xml"/>'
+    '<Relationship Id="rId3" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+    '</fonts>'
+    '<fills count="2">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '</fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+
+_XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<cols><col min="1" max="1" width="{0}" customWidth="1"/>'
+    '<col min="2" max="3" width="{1}" customWidth="1"/></cols>'
+    '<sheetData>'
+)
+
+_XLSX_SHEET_END = '</sheetData></worksheet>'
+
+_XLSX_BOLD = 1
+_XLSX_MONEY = 2
+
+
+def _xlsx_part(name):
+    # Fixed timestamps keep the workbook bytes identical for identical statements
+    part = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+    part.compress_type = zipfile.ZIP_DEFLATED
+    return part
+
+
+def _xlsx_row(number, cells):
+    """
+    One <row>; cells are (value, style) with str values written inline and
+    numbers (int or Decimal) as numeric cells
+    """
+    parts = [f'<row r="{number}">']
+    for column, (value, style) in zip("ABC", cells):
+        reference = f"{column}{number}"
+        style_attribute = f' s="{style}"' if style else ""
+        if isinstance(value, str):
+            parts.append(
+                f'<c r="{reference}" t="inlineStr"{style_attribute}><is><t>{escape(value)}</t></is></c>'
+            )
+        else:
+            parts.append(f'<c r="{reference}"{style_attribute}><v>{value}</v></c>')
+    parts.append('</row>')
+    return "".join(parts)
+
+
+def write_xlsx(output_file, result, fees=loan_engine.DEFAULT_FEES, reference=None):
+    """
+    Write a statement to a path or binary file as an XLSX workbook with a
+    Breakdown and a Schedule sheet
+    """
+    with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr(_xlsx_part("[Content_Types].xml"), _XLSX_CONTENT_TYPES)
+        workbook.writestr(_xlsx_part("_rels/.rels"), _XLSX_ROOT_RELS)
+        workbook.writestr(_xlsx_part("xl/workbook.xml"), _XLSX_WORKBOOK)
+        workbook.writestr(_xlsx_part("xl/_rels/workbook.xml.rels"), _XLSX_WORKBOOK_RELS)
+        workbook.writestr(_xlsx_part("xl/styles.xml"), _XLSX_STYLES)
+
+        rows = [_XLSX_SHEET_START.format(40, 45), _xlsx_row(1, [(TITLE, _XLSX_BOLD)])]
+        if reference is not None:
+            rows.append(_xlsx_row(2, [("Reference", 0), (str(reference), 0)]))
+        number = len(rows) + 1
+        for heading, section_rows in statement_sections(result, fees):
+            rows.append(_xlsx_row(number, [(heading, _XLSX_BOLD)]))
+            number += 1
+            for label, value in section_rows:
+                rows.append(_xlsx_row(number, [(label, 0), (value, 0)]))
+                number += 1
+            number += 1
+        rows.append(_XLSX_SHEET_END)
+        workbook.writestr(_xlsx_part("xl/worksheets/sheet1.xml"), "".join(rows))
+
+        with workbook.open(_xlsx_part("xl/worksheets/sheet2.xml"), "w") as sheet:
+            sheet.write(_XLSX_SHEET_START.format(10, 24).encode())
+            sheet.write(_xlsx_row(1, [(header, _XLSX_BOLD) for header in SCHEDULE_HEADERS]).encode())
+            for row in loan_money.iter_repayment_schedule(result):
+                cells = [(row['month'], 0), (row['payment'], _XLSX_MONEY), (row['remaining'], _XLSX_MONEY)]
+                sheet.write(_xlsx_row(row['month'] + 1, cells).encode())
+            sheet.write(_XLSX_SHEET_END.encode())
+
+
+# PDF layout on A4 in points
+PDF_PAGE_WIDTH = 595
+PDF_PAGE_HEIGHT = 842
+PDF_MARGIN = 50
+PDF_LINE_HEIGHT = 15
+PDF_FONT_SIZE = 10
+
+# Helvetica glyph widths (1/1000 em) for the characters in money values,
+# used to right-align the amount columns
+_HELVETICA_WIDTHS = {",": 278, ".": 278, " ": 278, "-": 333, "(": 333, ")": 333, "R": 722, "M": 833, "%": 889}
+
+
+def _text_width(text, size=PDF_FONT_SIZE):
+    return sum(_HELVETICA_WIDTHS.get(char, 556) for char in text) * size / 1000
+
+
+def _pdf_string(text):
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("cp1252", errors="replace")
+
+
+class _PdfWriter:
+    """
+    Streams PDF objects to a binary file, one page at a time.
+
+    Object 1 is the catalog, 2 the page tree (written last, once all
+    pages are known) and 3/4 the regular and bold Helvetica fonts.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.position = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 5
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        for object_id, font in ((3, b"Helvetica"), (4, b"Helvetica-Bold")):
+            self._object(object_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /" + font
+                         + b" /Encoding /WinAnsiEncoding >>")
+
+    def _write(self, data):
+        self.output_file.write(data)
+        self.position += len(data)
+
+    def _object(self, object_id, body):
+        self.offsets[object_id] = self.position
+        self._write(b"%d 0 obj\n" % object_id + body + b"\nendobj\n")
+
+    def add_page(self, content):
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        stream = zlib.compress(content)
+        self._object(content_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream)
+                     + stream + b"\nendstream")
+        self._object(page_id, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                     b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                     % (PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT, content_id))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        self._object(2, b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(self.page_ids))
+
+        xref_offset = self.position
+        lines = [b"xref\n0 %d\n" % self.next_id, b"0000000000 65535 f \n"]
+        for object_id in range(1, self.next_id):
+            lines.append(b"%010d 00000 n \n" % self.offsets[object_id])
+        lines.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                     % (self.next_id, xref_offset))
+        self._write(b"".join(lines))
+
+
+def _pdf_lines(result, fees, reference):
+    """
+    Yield statement lines as lists of (x, text, bold, right-aligned) cells;
+    None marks the start of the schedule table, whose header repeats on every page
+    """
+    yield [(PDF_MARGIN, TITLE, True, False)]
+    if reference is not None:
+        yield [(PDF_MARGIN, "Reference", False, False), (200, str(reference), False, False)]
+
+    right = PDF_PAGE_WIDTH - PDF_MARGIN
+    for heading, rows in statement_sections(result, fees):
+        yield []
+        yield [(PDF_MARGIN, heading, True, False)]
+        for label, value in rows:
+            yield [(PDF_MARGIN, label, False, False), (right, value, False, True)]
+
+    yield []
+    yield [(PDF_MARGIN, "Repayment Schedule", True, False)]
+    yield None
+    for row in loan_money.iter_repayment_schedule(result):
+        yield [
+            (PDF_MARGIN, str(row['month']), False, False),
+            (320, f"{row['payment']:,}", False, True),
+            (right, f"{row['remaining']:,}", False, True)
+        ]
+
+
+def write_pdf(output_file, result, fees=loan_engine.DEFAULT_FEES, reference=None):
+    """
+    Write a statement to an open binary file as PDF, starting a new page
+    whenever the schedule fills one
+    """
+    right = PDF_PAGE_WIDTH - PDF_MARGIN
+    schedule_header = [
+        (PDF_MARGIN, SCHEDULE_HEADERS[0], True, False),
+        (320, SCHEDULE_HEADERS[1], True, True),
+        (right, SCHEDULE_HEADERS[2], True, True)
+    ]
+
+    pdf = _PdfWriter(output_file)
+    content = []
+    y = PDF_PAGE_HEIGHT - PDF_MARGIN
+    in_schedule = False
+
+    def draw(cells):
+        for x, text, bold, align_right in cells:
+            if align_right:
+                x -= _text_width(text)
+            content.append(b"BT /%s %d Tf %.2f %d Td (%s) Tj ET\n"
+                           % (b"F2" if bold else b"F1", PDF_FONT_SIZE, x, y, _pdf_string(text)))
+
+    for cells in _pdf_lines(result, fees, reference):
+        if y < PDF_MARGIN:
+            pdf.add_page(b"".join(content))
+            content = []
+            y = PDF_PAGE_HEIGHT - PDF_MARGIN
+            if in_schedule:
+                draw(schedule_header)
+                y -= PDF_LINE_HEIGHT
+        if cells is None:
+            in_schedule = True
+            cells = schedule_header
+        draw(cells)
+        y -= PDF_LINE_HEIGHT
+
+    pdf.add_page(b"".join(content))
+    pdf.close()
+
+
+def export_statement(result, path, fees=loan_engine.DEFAULT_FEES, reference=None):
+    """
+    Write a statement for a calculate_loan_repayment result; the format
+    follows the file extension (.csv, .xlsx or .pdf)
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as output_file:
+            write_csv(output_file, result, fees, reference)
+    elif extension == "xlsx":
+        with open(path, "wb") as output_file:
+            write_xlsx(output_file, result, fees, reference)
+    elif extension == "pdf":
+        with open(path, "wb") as output_file:
+            write_pdf(output_file, result, fees, reference)
+    else:
+        raise ValueError(f"Unsupported statement format {extension!r}; use one of {', '.join(FORMATS)}")
+
+
+def _export_shard(statements, output_dir, formats, fees):
+    """
+    Write the statements of one shard in a worker process; returns the number of documents
+    """
+    for file_name, reference, result in statements:
+        for extension in formats:
+            export_statement(result, os.path.join(output_dir, f"{file_name}.{extension}"), fees, reference)
+    return len(statements) * len(formats)
+
+
+def _safe_reference(value):
+    return re.sub(r"[^\w.-]", "_", str(value))
+
+
+def _unique_file_name(reference, row_number, used):
+    """
+    File name for a statement that no earlier statement has used; empty or
+    colliding names get the row number appended. Returns (name, renamed)
+    """
+    # Compared case-insensitively, as on Windows and macOS file systems
+    name = _safe_reference(reference)
+    if name and name.lower() not in used:
+        used.add(name.lower())
+        return name, False
+
+    base = f"{name}_row{row_number}" if name else f"row{row_number}"
+    name = base
+    suffix = 1
+    while name.lower() in used:
+        suffix += 1
+        name = f"{base}_{suffix}"
+    used.add(name.lower())
+    return name, True
+
+
+def iter_statement_shards(input_path, shard_size=DEFAULT_SHARD_SIZE, id_column=None,
+                          amount_column="loan_amount", months_column="repayment_months",
+                          fees=loan_engine.DEFAULT_FEES):
+    """
+    Price input_path chunk by chunk and yield (statements, skipped rows,
+    renamed statements), where statements is a list of (file name,
+    reference, result) for the valid rows.
+
+    References come from id_column, or are the 1-based row number. Each
+    statement gets its own file name: references that are empty or collide
+    with an earlier one once made safe for a file name get the row number
+    appended, and are counted as renamed.
+    """
+    import pandas as pd
+
+    import loan_bulk
+
+    row_number = 0
+    used = set()
+    for chunk in loan_bulk.iter_input_chunks(input_path, shard_size):
+        priced = loan_engine.price_frame(chunk, amount_column, months_column, fees)
+        row_numbers = range(row_number + 1, row_number + len(priced) + 1)
+        if id_column is not None:
+            ids = priced[id_column]
+            references = ids.where(ids.notna(), "").astype(str).tolist()
+        else:
+            references = [str(number) for number in row_numbers]
+        row_number += len(priced)
+
+        # Coerced the way price_frame does, so text in a column only invalidates its own rows
+        amounts = pd.to_numeric(priced[amount_column], errors="coerce")
+        months = pd.to_numeric(priced[months_column], errors="coerce")
+        columns = {
+            'loan_amount': amounts.astype(float).tolist(),
+            'repayment_months': months.where(priced['valid'], 0).astype(int).tolist()
+        }
+        for name in loan_engine.BATCH_COLUMNS:
+            columns[name] = priced[name].tolist()
+
+        statements = []
+        renamed = 0
+        for index, valid in enumerate(priced['valid'].tolist()):
+            if valid:
+                file_name, was_renamed = _unique_file_name(references[index], row_numbers[index], used)
+                renamed += was_renamed
+                result = {name: values[index] for name, values in columns.items()}
+                statements.append((file_name, references[index] or None, result))
+        yield statements, len(priced) - len(statements), renamed
+
+
+def export_batch(input_path, output_dir, formats=("pdf",), id_column=None,
+                 amount_column="loan_amount", months_column="repayment_months",
+                 fees=loan_engine.DEFAULT_FEES, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                 progress=None):
+    """
+    Write one statement per valid row of input_path into output_dir.
+
+    Shards of shard_size rows are written on a process pool when workers >
+    1, with at most two shards per worker in flight. If given,
+    progress(documents) is called after each shard.
+
+    Returns a dict with the number of statements, documents written,
+    skipped invalid rows, statements renamed to avoid overwriting another
+    statement's file, elapsed seconds and documents per second.
+    """
+    for extension in formats:
+        if extension not in FORMATS:
+            raise ValueError(f"Unsupported statement format {extension!r}; use one of {', '.join(FORMATS)}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    statements = 0
+    documents = 0
+    skipped = 0
+    renamed = 0
+
+    shards = iter_statement_shards(input_path, shard_size, id_column, amount_column, months_column, fees)
+
+    def finish_shard(written):
+        nonlocal documents
+        documents += written
+        if progress is not None:
+            progress(documents)
+
+    if workers <= 1:
+        for shard, shard_skipped, shard_renamed in shards:
+            statements += len(shard)
+            skipped += shard_skipped
+            renamed += shard_renamed
+            finish_shard(_export_shard(shard, output_dir, formats, fees))
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = collections.deque()
+            for shard, shard_skipped, shard_renamed in shards:
+                statements += len(shard)
+                skipped += shard_skipped
+                renamed += shard_renamed
+                pending.append(pool.submit(_export_shard, shard, output_dir, formats, fees))
+                if len(pending) >= workers * 2:
+                    finish_shard(pending.popleft().result())
+            while pending:
+                finish_shard(pending.popleft().result())
+        except BaseException:
+            # Cancelled or failed: drop queued shards instead of waiting for them
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+    seconds = time.perf_counter() - start
+    return {
+        "statements": statements,
+        "documents": documents,
+        "skipped_rows": skipped,
+        "renamed_statements": renamed,
+        "seconds": seconds,
+        "documents_per_second": documents / seconds if seconds else 0.0
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Export loan statements as CSV, XLSX or PDF")
+    parser.add_argument("--rules", metavar="PATH",
+                        help="fee schedule file to price with (see fee_schedules.json)")
+    parser.add_argument("--product", help="product in --rules to price with (default: the first)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    statement_parser = subparsers.add_parser("statement", help="export one statement")
+    statement_parser.add_argument("loan_amount", type=float)
+    statement_parser.add_argument("repayment_months", type=int)
+    statement_parser.add_argument("output", help="statement file; .csv, .xlsx or .pdf")
+    statement_parser.add_argument("--reference", help="customer or application reference to print")
+
+    batch_parser = subparsers.add_parser("batch", help="export one statement per application in a file")
+    batch_parser.add_argument("input", help="CSV or Parquet file with loan applications")
+    batch_parser.add_argument("output_dir", help="directory to write statements to")
+    batch_parser.add_argument("--formats", nargs="+", choices=FORMATS, default=["pdf"],
+                              help="formats to write for each statement (default: pdf)")
+    batch_parser.add_argument("--id-column",
+                              help="column naming each statement file (default: the row number)")
+    batch_parser.add_argument("--amount-column", default="loan_amount",
+                              help="column holding the loan amount (default: %(default)s)")
+    batch_parser.add_argument("--months-column", default="repayment_months",
+                              help="column holding the repayment period (default: %(default)s)")
+    batch_parser.add_argument("--workers", type=int, default=1,
+                              help="worker processes; 0 uses every CPU (default: %(default)s)")
+    batch_parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                              help="statements per worker task (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    fees = loan_engine.DEFAULT_FEES
+    if args.rules:
+        import loan_rules
+        fees = loan_rules.RuleBook(args.rules).product(args.product).fees
+
+    if args.command == "statement":
+        result = loan_engine.calculate_loan_repayment(args.loan_amount, args.repayment_months, fees)
+        export_statement(result, args.output, fees, args.reference)
+        print(f"Wrote {args.output}")
+        return 0
+
+    stats = export_batch(
+        args.input, args.output_dir,
+        formats=args.formats,
+        id_column=args.id_column,
+        amount_column=args.amount_column,
+        months_column=args.months_column,
+        fees=fees,
+        workers=args.workers or os.cpu_count() or 1,
+        shard_size=args.shard_size
+    )
+    print(
+        f"Wrote {stats['documents']:,} documents for {stats['statements']:,} statements "
+        f"({stats['skipped_rows']:,} invalid rows skipped) in {stats['seconds']:.2f}s "
+        f"({stats['documents_per_second']:,.0f} documents/s)"
+    )
+    if stats['renamed_statements']:
+        print(
+            f"{stats['renamed_statements']:,} statements had an empty {args.id_column} or one that clashes "
+            f"with another file name, and were named with their row number appended"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Opt-in hot-path instrumentation.
+
+Phases of the calculate flow are wrapped in phase(name). When
+instrumentation is off, phase() returns a shared no-op context manager,
+so the cost is a function call and a flag check. When it is on, each
+phase's wall time goes into an in-process histogram, and selected phases
+can run under cProfile or a sampling profiler. The profiler, logging and
+JSON modules are only imported once they are needed, so importing this
+module stays cheap at startup.
+
+Enable from the environment before starting the calculator:
+    LOAN_CALC_INSTRUMENT=timings.json            # dump histograms on exit
+    LOAN_CALC_PROFILE=schedule_rendering,calculate
+    LOAN_CALC_PROFILER=cprofile                  # or "sampling"
+"""
+
+import atexit
+import math
+import os
+import sys
+import time
+
+# Histogram buckets are powers of two in microseconds: bucket i holds
+# timings below 2**i us, the last bucket everything slower
+HISTOGRAM_BUCKETS = 32
+
+
+class Histogram:
+    """
+    Log2-bucketed histogram of phase durations in seconds
+    """
+
+    def __init__(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds):
+        microseconds = seconds * 1e6
+        index = 0 if microseconds < 1 else min(HISTOGRAM_BUCKETS - 1, int(math.log2(microseconds)) + 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """
+        Upper bound in seconds of the bucket holding the given percentile
+        """
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.max, 2 ** index / 1e6)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'min_ms': self.min * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+            'p50_ms': self.percentile(0.50) * 1000,
+            'p99_ms': self.percentile(0.99) * 1000,
+            'buckets_us': {f"<{2 ** index}": n for index, n in enumerate(self.buckets) if n}
+        }
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread at a fixed interval while a profiled
+    phase is running, counting collapsed stacks (flame graph format)
+    """
+
+    def __init__(self, interval=0.001, thread_id=None):
+        import threading
+
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks = {}
+        self.active = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        import threading
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.active:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def dump(self, path):
+        with open(path, "w") as stacks_file:
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                stacks_file.write(f"{stack} {count}\n")
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+_enabled = False
+_histograms = {}
+_profiled_phases = frozenset()
+_profiler_kind = "cprofile"
+_cprofiles = {}
+_sampler = None
+_profiling = False
+
+
+class _Phase:
+    __slots__ = ("name", "start", "profile")
+
+    def __init__(self, name):
+        self.name = name
+        self.profile = None
+
+    def __enter__(self):
+        global _profiling
+        if self.name in _profiled_phases and not _profiling:
+            # Only the outermost profiled phase is profiled; cProfile cannot nest
+            _profiling = True
+            if _profiler_kind == "sampling":
+                self.profile = _sampler
+                _sampler.active += 1
+            else:
+                import cProfile
+                self.profile = _cprofiles.setdefault(self.name, cProfile.Profile())
+                self.profile.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _profiling
+        elapsed = time.perf_counter() - self.start
+        if self.profile is not None:
+            if self.profile is _sampler:
+                _sampler.active -= 1
+            else:
+                self.profile.disable()
+            _profiling = False
+
+        histogram = _histograms.get(self.name)
+        if histogram is None:
+            histogram = _histograms[self.name] = Histogram()
+        histogram.record(elapsed)
+        return False
+
+
+def phase(name):
+    """
+    Context manager timing one phase; a no-op unless instrumentation is enabled
+    """
+    if not _enabled:
+        return _NULL_PHASE
+    return _Phase(name)
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(profile=(), profiler="cprofile"):
+    """
+    Start recording phase timings.
+
+    Phases named in `profile` also run under cProfile or, with
+    profiler="sampling", the sampling profiler.
+    """
+    global _enabled, _profiled_phases, _profiler_kind, _sampler
+    if profiler not in ("cprofile", "sampling"):
+        raise ValueError("Profiler must be 'cprofile' or 'sampling'")
+
+    _profiled_phases = frozenset(profile)
+    _profiler_kind = profiler
+    if profile and profiler == "sampling" and _sampler is None:
+        _sampler = SamplingProfiler()
+        _sampler.start()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """Discard all recorded timings and profiles"""
+    _histograms.clear()
+    _cprofiles.clear()
+    if _sampler is not None:
+        _sampler.stacks.clear()
+
+
+def snapshot():
+    """
+    Summaries of every phase histogram, keyed by phase name
+    """
+    return {name: histogram.summary() for name, histogram in _histograms.items()}
+
+
+def dump(path):
+    """
+    Write the phase histograms to a JSON file, and any profiles next to it
+    """
+    import json
+    import pstats
+
+    with open(path, "w") as timings_file:
+        json.dump(snapshot(), timings_file, indent=2)
+
+    base, _ = os.path.splitext(path)
+    for name, profile in _cprofiles.items():
+        pstats.Stats(profile).dump_stats(f"{base}.{name}.prof")
+    if _sampler is not None and _sampler.stacks:
+        _sampler.dump(f"{base}.stacks.txt")
+
+
+def log_summary(level=None):
+    """Log each phase's summary, at INFO level unless another level is given"""
+    import logging
+
+    logger = logging.getLogger(__name__)
+    if level is None:
+        level = logging.INFO
+    for name, summary in snapshot().items():
+        logger.log(
+            level, "%s: n=%d mean=%.3fms p50<=%.3fms p99<=%.3fms max=%.3fms",
+            name, summary['count'], summary['mean_ms'], summary['p50_ms'],
+            summary['p99_ms'], summary['max_ms']
+        )
+
+
+def configure_from_env():
+    """
+    Enable instrumentation if LOAN_CALC_INSTRUMENT is set, dumping and
+    logging the histograms when the process exits
+    """
+    path = os.environ.get("LOAN_CALC_INSTRUMENT")
+    if not path:
+        return
+
+    profile = [name for name in os.environ.get("LOAN_CALC_PROFILE", "").split(",") if name]
+    enable(profile, os.environ.get("LOAN_CALC_PROFILER", "cprofile"))
+
+    def dump_at_exit():
+        dump(path)
+        log_summary()
+
+    atexit.register(dump_at_exit)
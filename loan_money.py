@@ -0,0 +1,222 @@
+"""
+Exact money engine.
+
+Prices quotes in integer sen (1/100 RM) so that amounts never drift and
+repayment schedules always sum exactly to the total repayment.
+
+Rounding rules:
+- Loan amounts are converted to sen rounding half up.
+- Stamp duty is the loan amount times the stamp duty rate, rounded half up to the sen.
+- Monthly installments are the total repayment divided by the number of
+  months, rounded half up to the sen.
+- The final installment is whatever is left, so the schedule sums to the total.
+
+calculate_loan_repayment_batch_sen applies the same rules to NumPy int64
+arrays for batch pricing.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+import math
+
+import loan_engine
+
+SEN_PER_RINGGIT = 100
+
+# Result columns produced by calculate_loan_repayment_batch_sen
+SEN_COLUMNS = (
+    'loan_amount_sen',
+    'management_cost_sen',
+    'stamp_duty_sen',
+    'total_repayment_sen',
+    'monthly_installment_sen',
+    'final_installment_sen',
+    'total_fees_sen'
+)
+
+
+def to_sen(amount):
+    """
+    Convert an amount in RM (int, float, Decimal or str) to integer sen, rounding half up
+    """
+    if isinstance(amount, int):
+        return amount * SEN_PER_RINGGIT
+    if isinstance(amount, float):
+        # Round away binary noise first so 1234.565 becomes 123456.5 sen, not 123456.49999
+        return math.floor(round(amount * SEN_PER_RINGGIT, 6) + 0.5)
+    return int((Decimal(amount) * SEN_PER_RINGGIT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_sen(sen):
+    """
+    Convert integer sen to an exact Decimal amount in RM
+    """
+    return Decimal(int(sen)).scaleb(-2)
+
+
+def format_sen(sen):
+    """
+    Format integer sen as a Ringgit display string, e.g. RM 5,115.00
+    """
+    return f"RM {from_sen(sen):,.2f}"
+
+
+def _rate_fraction(rate):
+    """
+    Exact fraction for a decimal rate such as 0.005 (= 1/200)
+    """
+    return Fraction(str(rate))
+
+
+def _divide_half_up(numerator, denominator):
+    # Floor division rounding half up, valid for non-negative numerators;
+    # works for ints and NumPy integer arrays alike
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def split_installments(total_sen, num_months):
+    """
+    Return (monthly installment, final installment) in sen for a total repayment
+    """
+    installment = _divide_half_up(total_sen, num_months)
+    final_installment = total_sen - installment * (num_months - 1)
+    return installment, final_installment
+
+
+def calculate_loan_repayment_sen(loan_amount, num_months, fees=loan_engine.DEFAULT_FEES):
+    """
+    Exact counterpart of loan_engine.calculate_loan_repayment with all money in integer sen
+    """
+    loan_engine.validate_quote(loan_amount, num_months, fees)
+
+    loan_amount_sen = to_sen(loan_amount)
+    management_cost_sen = to_sen(loan_engine.management_fee_for(loan_amount, fees)) * num_months
+
+    rate = _rate_fraction(fees.stamp_duty_rate)
+    stamp_duty_sen = _divide_half_up(loan_amount_sen * rate.numerator, rate.denominator)
+
+    total_repayment_sen = loan_amount_sen + management_cost_sen + stamp_duty_sen
+    installment_sen, final_installment_sen = split_installments(total_repayment_sen, num_months)
+
+    return {
+        'loan_amount_sen': loan_amount_sen,
+        'repayment_months': num_months,
+        'management_cost_sen': management_cost_sen,
+        'stamp_duty_sen': stamp_duty_sen,
+        'total_repayment_sen': total_repayment_sen,
+        'monthly_installment_sen': installment_sen,
+        'final_installment_sen': final_installment_sen,
+        'total_fees_sen': management_cost_sen + stamp_duty_sen
+    }
+
+
+def iter_schedule_sen(total_repayment_sen, num_months):
+    """
+    Yield (month, payment, remaining balance) in sen; payments sum exactly to the total
+    """
+    installment, final_installment = split_installments(total_repayment_sen, num_months)
+    remaining = total_repayment_sen
+
+    for month in range(1, num_months + 1):
+        payment = final_installment if month == num_months else installment
+        remaining -= payment
+        yield month, payment, remaining
+
+
+def quote_sen(result):
+    """
+    Sen amounts to display for a calculate_loan_repayment result.
+
+    The loan amount, management cost and stamp duty are each rounded half
+    up to the sen, the total is their sum and the installments split that
+    total, as in calculate_loan_repayment_sen. The summary, breakdown and
+    schedule all show these, so the schedule sums to the displayed total.
+    """
+    loan_amount_sen = to_sen(result['loan_amount'])
+    management_cost_sen = to_sen(result['management_cost'])
+    stamp_duty_sen = to_sen(result['stamp_duty'])
+    total_repayment_sen = loan_amount_sen + management_cost_sen + stamp_duty_sen
+    num_months = int(result['repayment_months'])
+    installment_sen, final_installment_sen = split_installments(total_repayment_sen, num_months)
+
+    return {
+        'loan_amount_sen': loan_amount_sen,
+        'repayment_months': num_months,
+        'management_cost_sen': management_cost_sen,
+        'stamp_duty_sen': stamp_duty_sen,
+        'total_repayment_sen': total_repayment_sen,
+        'monthly_installment_sen': installment_sen,
+        'final_installment_sen': final_installment_sen,
+        'total_fees_sen': management_cost_sen + stamp_duty_sen
+    }
+
+
+def iter_repayment_schedule(result):
+    """
+    Yield the monthly repayment schedule for a calculate_loan_repayment result.
+
+    Each row is a dict with the month, the payment and the remaining balance
+    as exact Decimal amounts. The schedule is split from the displayed total
+    repayment (see quote_sen), so the payments add up to it exactly.
+    """
+    total_repayment_sen = quote_sen(result)['total_repayment_sen']
+    num_months = int(result['repayment_months'])
+
+    for month, payment, remaining in iter_schedule_sen(total_repayment_sen, num_months):
+        yield {
+            "month": month,
+            "payment": from_sen(payment),
+            "remaining": from_sen(remaining)
+        }
+
+
+def calculate_loan_repayment_batch_sen(loan_amounts, num_months, fees=loan_engine.DEFAULT_FEES):
+    """
+    Integer fast path of calculate_loan_repayment_sen for whole columns of loans.
+
+    Returns a dict of int64 arrays keyed by SEN_COLUMNS plus 'repayment_months'
+    and a boolean 'valid' mask. Invalid rows are 0 in every money column.
+    """
+    import numpy as np
+
+    amounts = np.asarray(loan_amounts)
+    months = np.asarray(num_months)
+    amounts, months = np.broadcast_arrays(amounts, months)
+
+    valid = loan_engine.batch_valid_mask(amounts, months, fees)
+
+    if np.issubdtype(amounts.dtype, np.integer):
+        loan_amount_sen = amounts.astype(np.int64) * SEN_PER_RINGGIT
+    else:
+        scaled = np.round(amounts.astype(np.float64) * SEN_PER_RINGGIT, 6)
+        loan_amount_sen = np.floor(np.where(valid, scaled, 0) + 0.5).astype(np.int64)
+    loan_amount_sen = np.where(valid, loan_amount_sen, 0)
+    safe_months = np.where(valid, months, 1).astype(np.int64)
+
+    if fees.fee_tiers:
+        monthly_fees = loan_engine.batch_management_fees(np.where(valid, amounts, 0), fees)
+        monthly_fee_sen = np.floor(np.round(monthly_fees * SEN_PER_RINGGIT, 6) + 0.5).astype(np.int64)
+    else:
+        monthly_fee_sen = to_sen(fees.management_fee)
+    management_cost_sen = monthly_fee_sen * safe_months
+
+    rate = _rate_fraction(fees.stamp_duty_rate)
+    stamp_duty_sen = _divide_half_up(loan_amount_sen * rate.numerator, rate.denominator)
+
+    total_repayment_sen = loan_amount_sen + management_cost_sen + stamp_duty_sen
+    installment_sen, final_installment_sen = split_installments(total_repayment_sen, safe_months)
+
+    columns = {
+        'loan_amount_sen': loan_amount_sen,
+        'management_cost_sen': management_cost_sen,
+        'stamp_duty_sen': stamp_duty_sen,
+        'total_repayment_sen': total_repayment_sen,
+        'monthly_installment_sen': installment_sen,
+        'final_installment_sen': final_installment_sen,
+        'total_fees_sen': management_cost_sen + stamp_duty_sen
+    }
+
+    result = {name: np.where(valid, columns[name], 0) for name in SEN_COLUMNS}
+    result['repayment_months'] = months
+    result['valid'] = valid
+    return result
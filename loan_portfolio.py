@@ -0,0 +1,267 @@
+"""
+Portfolio aggregation.
+
+Keeps running totals over a book of priced loans: fees, stamp duty and
+expected cash-in per calendar month. Totals live in buckets keyed by
+calendar month and management fee tier, and are updated incrementally as
+loans are added or removed.
+
+Management cost and stamp duty are linear in the monthly fee of each tier
+and in the stamp duty rate, so what_if() answers "what if the fees were
+different" from the bucket sums alone, without repricing any loan.
+
+Usage:
+    python loan_portfolio.py quotes.csv --start-column disbursed_on
+    python loan_portfolio.py quotes.csv --management-fee 20 --stamp-duty-rate 0.006
+"""
+
+import argparse
+import sys
+
+import loan_engine
+
+# Running sums kept per (origination month, fee tier) bucket
+ORIGINATION_SUMS = ('loans', 'loan_amount', 'repayment_months', 'management_cost',
+                    'stamp_duty', 'total_repayment')
+
+
+def tier_fees(fees):
+    """
+    Monthly management fee of each tier, the fee above the last tier last
+    """
+    return [fee for _, fee in fees.fee_tiers or ()] + [fees.management_fee]
+
+
+def month_label(month):
+    import numpy as np
+
+    return str(np.datetime64(int(month), 'M'))
+
+
+class Portfolio:
+    """
+    Running totals for loans priced under one fee schedule.
+
+    add() and remove() take calculate_loan_repayment or
+    calculate_loan_repayment_batch results plus the date each loan starts;
+    the first installment is collected in the calendar month after it
+    starts. Removing a loan subtracts exactly what adding it added, so the
+    caller passes the same result and start date.
+    """
+
+    def __init__(self, fees=loan_engine.DEFAULT_FEES):
+        self.fees = fees
+        self.origination = {}
+        self.cash_in = {}
+
+    def add(self, result, start):
+        self._apply(result, start, 1)
+
+    def remove(self, result, start):
+        self._apply(result, start, -1)
+
+    def _apply(self, result, start, sign):
+        import numpy as np
+
+        valid = np.atleast_1d(result.get('valid', True))
+        amounts = np.atleast_1d(np.asarray(result['loan_amount'], dtype=np.float64))
+        starts = np.atleast_1d(np.asarray(start, dtype='datetime64[D]'))
+        amounts, valid, starts = np.broadcast_arrays(amounts, valid, starts)
+        rows = np.flatnonzero(valid)
+        shape = amounts.shape
+
+        def valid_rows(name):
+            values = np.broadcast_to(np.atleast_1d(result[name]), shape)
+            return values[rows].astype(np.float64)
+
+        amounts = amounts[rows]
+        months = valid_rows('repayment_months').astype(np.int64)
+        if len(rows) and months.min() < 1:
+            raise ValueError("Repayment period must be at least 1 month")
+        missing = int(np.isnat(starts[rows]).sum())
+        if missing:
+            raise ValueError(f"{missing:,} loans have no start date (NaT)")
+        start_months = starts[rows].astype('datetime64[M]').astype(np.int64)
+
+        bounds = np.array([up_to for up_to, _ in self.fees.fee_tiers or ()], dtype=np.float64)
+        tiers = np.searchsorted(bounds, amounts, side="left")
+
+        self._accumulate(self.origination, start_months, tiers, sign, {
+            'loans': np.ones(len(rows)),
+            'loan_amount': amounts,
+            'repayment_months': months.astype(np.float64),
+            'management_cost': valid_rows('management_cost'),
+            'stamp_duty': valid_rows('stamp_duty'),
+            'total_repayment': valid_rows('total_repayment')
+        })
+
+        # One entry per loan per installment, in the months after the start
+        loan_index = np.repeat(np.arange(len(rows)), months)
+        offsets = np.arange(len(loan_index)) - np.repeat(np.cumsum(months) - months, months) + 1
+        self._accumulate(self.cash_in, start_months[loan_index] + offsets, tiers[loan_index], sign, {
+            'installments': np.ones(len(loan_index)),
+            'cash_in': valid_rows('monthly_installment')[loan_index],
+            'principal': (amounts / months)[loan_index]
+        })
+
+    def _accumulate(self, buckets, months, tiers, sign, values):
+        import numpy as np
+
+        if not len(months):
+            return
+        names = list(values)
+        num_tiers = len(self.fees.fee_tiers or ()) + 1
+        keys, inverse = np.unique(months * num_tiers + tiers, return_inverse=True)
+        sums = [np.bincount(inverse, weights=values[name], minlength=len(keys)).tolist() for name in names]
+
+        for index, combined in enumerate(keys.tolist()):
+            key = divmod(combined, num_tiers)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = dict.fromkeys(names, 0.0)
+            for name, column in zip(names, sums):
+                bucket[name] += sign * column[index]
+            # The first sum is the loan or installment count
+            if bucket[names[0]] <= 0:
+                del buckets[key]
+
+    def summary(self):
+        """
+        Book totals and expected cash-in by calendar month
+        """
+        totals = dict.fromkeys(ORIGINATION_SUMS, 0.0)
+        for bucket in self.origination.values():
+            for name in ORIGINATION_SUMS:
+                totals[name] += bucket[name]
+        totals['loans'] = int(round(totals['loans']))
+        totals['total_fees'] = totals['management_cost'] + totals['stamp_duty']
+
+        cash_in = {}
+        for (month, _), bucket in self.cash_in.items():
+            cash_in[month] = cash_in.get(month, 0.0) + bucket['cash_in']
+        totals['cash_in'] = {month_label(month): cash_in[month] for month in sorted(cash_in)}
+        return totals
+
+    def by_origination_month(self):
+        """
+        Totals per calendar month in which loans started
+        """
+        months = {}
+        for (month, _), bucket in self.origination.items():
+            totals = months.setdefault(month, dict.fromkeys(ORIGINATION_SUMS, 0.0))
+            for name in ORIGINATION_SUMS:
+                totals[name] += bucket[name]
+        return {month_label(month): months[month] for month in sorted(months)}
+
+    def what_if(self, management_fee=None, stamp_duty_rate=None, fee_tier_fees=None):
+        """
+        Book totals if the fees were different, from the bucket sums alone.
+
+        management_fee replaces the flat fee (or the fee above the last
+        tier), fee_tier_fees the fee of each tier; tier boundaries stay the
+        same. Returns summary() under the new fees plus a 'change' dict of
+        differences from the current totals.
+        """
+        current_fees = tier_fees(self.fees)
+        new_fees = list(current_fees)
+        if fee_tier_fees is not None:
+            if len(fee_tier_fees) != len(new_fees) - 1:
+                raise ValueError(f"Expected {len(new_fees) - 1} tier fees, got {len(fee_tier_fees)}")
+            new_fees[:-1] = fee_tier_fees
+        if management_fee is not None:
+            new_fees[-1] = management_fee
+        fee_change = [new - old for new, old in zip(new_fees, current_fees)]
+        rate_change = 0.0
+        if stamp_duty_rate is not None:
+            rate_change = stamp_duty_rate - self.fees.stamp_duty_rate
+
+        current = self.summary()
+        management_change = 0.0
+        stamp_duty_change = 0.0
+        for (_, tier), bucket in self.origination.items():
+            management_change += fee_change[tier] * bucket['repayment_months']
+            stamp_duty_change += rate_change * bucket['loan_amount']
+
+        cash_in_change = {}
+        for (month, tier), bucket in self.cash_in.items():
+            cash_in_change[month] = (
+                cash_in_change.get(month, 0.0)
+                + fee_change[tier] * bucket['installments']
+                + rate_change * bucket['principal']
+            )
+        cash_in_change = {month_label(month): cash_in_change[month] for month in sorted(cash_in_change)}
+
+        change = {
+            'management_cost': management_change,
+            'stamp_duty': stamp_duty_change,
+            'total_fees': management_change + stamp_duty_change,
+            'total_repayment': management_change + stamp_duty_change,
+            'cash_in': cash_in_change
+        }
+
+        scenario = dict(current)
+        for name in ('management_cost', 'stamp_duty', 'total_fees', 'total_repayment'):
+            scenario[name] = current[name] + change[name]
+        scenario['cash_in'] = {
+            month: value + cash_in_change[month] for month, value in current['cash_in'].items()
+        }
+        scenario['change'] = change
+        return scenario
+
+
+def print_summary(summary):
+    print(f"{summary['loans']:,} loans, RM {summary['loan_amount']:,.2f} lent")
+    print(f"Management cost  {loan_engine.format_money(summary['management_cost'])}")
+    print(f"Stamp duty       {loan_engine.format_money(summary['stamp_duty'])}")
+    print(f"Total fees       {loan_engine.format_money(summary['total_fees'])}")
+    print("Expected cash-in:")
+    for month, value in summary['cash_in'].items():
+        print(f"  {month}  {loan_engine.format_money(value):>20}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Aggregate a priced loan book and try fee changes")
+    parser.add_argument("input", help="CSV or Parquet file of priced loans, e.g. from loan_bulk.py")
+    parser.add_argument("--start-column", default="start_date",
+                        help="column holding the date each loan starts (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=100_000,
+                        help="rows read per chunk (default: %(default)s)")
+    parser.add_argument("--rules", metavar="PATH",
+                        help="fee schedule file the loans were priced with (see fee_schedules.json)")
+    parser.add_argument("--product", help="product in --rules the loans were priced with (default: the first)")
+    parser.add_argument("--management-fee", type=float, help="what-if monthly management fee in RM")
+    parser.add_argument("--stamp-duty-rate", type=float, help="what-if stamp duty rate as a fraction")
+    return parser
+
+
+def main(argv=None):
+    import loan_bulk
+
+    args = build_parser().parse_args(argv)
+
+    fees = loan_engine.DEFAULT_FEES
+    if args.rules:
+        import loan_rules
+        fees = loan_rules.RuleBook(args.rules).product(args.product).fees
+
+    portfolio = Portfolio(fees)
+    for chunk in loan_bulk.iter_input_chunks(args.input, args.chunk_size):
+        columns = {name: chunk[name].to_numpy() for name in chunk.columns}
+        portfolio.add(columns, columns[args.start_column])
+
+    print_summary(portfolio.summary())
+
+    if args.management_fee is not None or args.stamp_duty_rate is not None:
+        scenario = portfolio.what_if(args.management_fee, args.stamp_duty_rate)
+        print("\nWhat if:")
+        print_summary(scenario)
+        change = scenario['change']
+        print(
+            f"Change: management cost {change['management_cost']:+,.2f}, "
+            f"stamp duty {change['stamp_duty']:+,.2f}, total fees {change['total_fees']:+,.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Configurable fee schedules.
+
+Loads loan products from a JSON file and compiles each one into a
+loan_engine.FeeSchedule, so the single-quote, batch and exact engines
+price them with no per-quote parsing. A RuleBook reloads the file when it
+changes on disk.
+
+File format:
+    {
+      "products": [
+        {
+          "name": "personal",
+          "effective_from": "2026-01-01",
+          "effective_to": null,
+          "min_months": 1,
+          "max_months": 12,
+          "min_amount": 100,
+          "max_amount": 100000,
+          "stamp_duty_rate": 0.005,
+          "management_fee": 15,
+          "management_fee_tiers": [{"up_to": 1000, "fee": 10}]
+        }
+      ]
+    }
+
+management_fee is the monthly fee for amounts above the last tier (or for
+every amount if there are no tiers). Several entries may share a name
+with different effective date ranges.
+"""
+
+import datetime
+import json
+import logging
+import os
+import time
+
+import loan_engine
+
+logger = logging.getLogger(__name__)
+
+
+class Product:
+    """
+    One compiled product version, effective on [effective_from, effective_to]
+    """
+
+    def __init__(self, name, fees, effective_from=None, effective_to=None):
+        self.name = name
+        self.fees = fees
+        self.effective_from = effective_from
+        self.effective_to = effective_to
+
+    def is_effective(self, on):
+        if self.effective_from is not None and on < self.effective_from:
+            return False
+        if self.effective_to is not None and on > self.effective_to:
+            return False
+        return True
+
+    def quote(self, loan_amount, num_months):
+        return loan_engine.calculate_loan_repayment(loan_amount, num_months, self.fees)
+
+    def quote_batch(self, loan_amounts, num_months):
+        return loan_engine.calculate_loan_repayment_batch(loan_amounts, num_months, self.fees)
+
+    def __repr__(self):
+        return f"Product({self.name!r}, {self.effective_from} to {self.effective_to})"
+
+
+def _parse_date(value, field, name):
+    if value is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Product {name!r}: {field} must be an ISO date (YYYY-MM-DD)")
+
+
+def compile_product(entry):
+    """
+    Validate one product entry from the config file and compile it to a Product
+    """
+    if not isinstance(entry, dict):
+        raise ValueError("Every product must be a JSON object")
+    name = entry.get("name")
+    if not name:
+        raise ValueError("Every product needs a name")
+
+    try:
+        min_months = int(entry.get("min_months", loan_engine.DEFAULT_FEES.min_months))
+        max_months = int(entry.get("max_months", loan_engine.DEFAULT_FEES.max_months))
+        stamp_duty_rate = float(entry.get("stamp_duty_rate", loan_engine.DEFAULT_FEES.stamp_duty_rate))
+        management_fee = float(entry.get("management_fee", loan_engine.DEFAULT_FEES.management_fee))
+        min_amount = entry.get("min_amount")
+        max_amount = entry.get("max_amount")
+        min_amount = None if min_amount is None else float(min_amount)
+        max_amount = None if max_amount is None else float(max_amount)
+        tiers = tuple(
+            (float(tier["up_to"]), float(tier["fee"]))
+            for tier in entry.get("management_fee_tiers", ())
+        )
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Product {name!r}: fees, limits and tiers must be numbers")
+
+    if min_months < 1 or max_months < min_months:
+        raise ValueError(f"Product {name!r}: tenor range {min_months}-{max_months} is invalid")
+    if min_amount is not None and max_amount is not None and max_amount < min_amount:
+        raise ValueError(f"Product {name!r}: max_amount is below min_amount")
+    if management_fee < 0 or stamp_duty_rate < 0 or any(fee < 0 for _, fee in tiers):
+        raise ValueError(f"Product {name!r}: fees and the stamp duty rate cannot be negative")
+    if any(later[0] <= earlier[0] for earlier, later in zip(tiers, tiers[1:])):
+        raise ValueError(f"Product {name!r}: fee tiers must be sorted by increasing up_to")
+
+    effective_from = _parse_date(entry.get("effective_from"), "effective_from", name)
+    effective_to = _parse_date(entry.get("effective_to"), "effective_to", name)
+    if effective_from and effective_to and effective_to < effective_from:
+        raise ValueError(f"Product {name!r}: effective_to is before effective_from")
+
+    fees = loan_engine.FeeSchedule(
+        management_fee=management_fee,
+        stamp_duty_rate=stamp_duty_rate,
+        min_months=min_months,
+        max_months=max_months,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        fee_tiers=tiers or None
+    )
+    return Product(name, fees, effective_from, effective_to)
+
+
+def compile_rules(config):
+    """
+    Compile a parsed config into {product name: [Product, ...]} sorted by effective date
+    """
+    if not isinstance(config, dict) or not isinstance(config.get("products", []), list):
+        raise ValueError("The fee schedule file must be a JSON object with a list of products")
+
+    products = {}
+    for entry in config.get("products", ()):
+        product = compile_product(entry)
+        products.setdefault(product.name, []).append(product)
+
+    if not products:
+        raise ValueError("The fee schedule file defines no products")
+
+    for versions in products.values():
+        versions.sort(key=lambda product: product.effective_from or datetime.date.min)
+    return products
+
+
+def load_rules(path):
+    with open(path, encoding="utf-8") as rules_file:
+        return compile_rules(json.load(rules_file))
+
+
+class RuleBook:
+    """
+    Compiled products from a fee schedule file, reloaded when the file changes.
+
+    The file's modification time (and today's date) are checked at most
+    every check_interval seconds, so looking up a product on every quote
+    stays cheap. If a changed file fails to load, the previous rules stay
+    in force.
+    """
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.version = 0
+        self._products = load_rules(path)
+        self._mtime = os.stat(path).st_mtime
+        self._next_check = time.monotonic() + check_interval
+        self._today = datetime.date.today()
+
+    def reload_if_changed(self):
+        """
+        Reload the file if it changed; returns True if new rules were loaded
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+        self._today = datetime.date.today()
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+
+        self._mtime = mtime
+        try:
+            self._products = load_rules(self.path)
+        except Exception as e:
+            logger.error("Keeping previous fee schedules; %s failed to load: %s", self.path, e)
+            return False
+
+        self.version += 1
+        return True
+
+    def names(self):
+        self.reload_if_changed()
+        return list(self._products)
+
+    def product(self, name=None, on=None):
+        """
+        The version of a product effective on a date (default today).
+
+        name defaults to the first product in the file.
+        """
+        self.reload_if_changed()
+        if name is None:
+            name = next(iter(self._products))
+        if on is None:
+            on = self._today
+
+        versions = self._products.get(name)
+        if not versions:
+            raise ValueError(f"Unknown product {name!r}")
+        for product in reversed(versions):
+            if product.is_effective(on):
+                return product
+        raise ValueError(f"Product {name!r} is not available on {on.isoformat()}")
@@ -0,0 +1,449 @@
+"""
+Local HTTP/JSON quoting service.
+
+Serves calculate_loan_repayment results and repayment schedules over
+HTTP using asyncio only. Concurrent quote requests are collected into
+micro-batches and priced with one vectorized engine call per batch.
+
+Endpoints:
+    GET  /quote?loan_amount=5000&repayment_months=6
+    POST /quote       {"loan_amount": 5000, "repayment_months": 6}
+    GET  /schedule?loan_amount=5000&repayment_months=6
+    GET  /metrics
+
+Usage:
+    python loan_calculator_v1.py serve --port 8080
+    python loan_server.py loadgen --port 8080 --connections 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import math
+import sys
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+import loan_engine
+import loan_money
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_DELAY = 0.002
+
+HTTP_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    500: "Internal Server Error"
+}
+
+logger = logging.getLogger(__name__)
+
+
+class BatchError(Exception):
+    """A whole micro-batch failed to price, e.g. the product is no longer available"""
+
+
+class QuoteBatcher:
+    """
+    Collects concurrent quote requests and prices them in micro-batches.
+
+    A batch is priced as soon as max_batch requests are waiting, or
+    max_delay seconds after the first request of the batch arrived. With a
+    loan_rules.RuleBook, each batch is priced with the product's current
+    fees, so edits to the fee schedule file apply without a restart. With a
+    loan_archive.QuoteArchive, every quote served is archived and its
+    quote_id returned.
+    """
+
+    def __init__(self, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY,
+                 fees=loan_engine.DEFAULT_FEES, rules=None, product=None, archive=None):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.fees = fees
+        self.rules = rules
+        self.product = product
+        self.archive = archive
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.batched_requests = 0
+
+    async def quote(self, loan_amount, num_months):
+        """
+        Price one quote; raises ValueError for invalid input like calculate_loan_repayment
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((loan_amount, num_months, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # A failed batch fails its own requests, never the batcher
+            try:
+                await self.price_batch(batch)
+            except Exception as e:
+                logger.exception("Pricing a batch of %d quotes failed", len(batch))
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(BatchError(str(e)))
+
+    async def price_batch(self, batch):
+        fees = self.fees
+        if self.rules is not None:
+            fees = self.rules.product(self.product).fees
+
+        amounts = [item[0] for item in batch]
+        months = [item[1] for item in batch]
+        priced = loan_engine.calculate_loan_repayment_batch(amounts, months, fees)
+
+        columns = {name: priced[name].tolist() for name in loan_engine.BATCH_COLUMNS}
+        valid = priced['valid'].tolist()
+
+        quote_ids = None
+        if self.archive is not None:
+            # One append per batch, skipping requests whose client went away
+            for index, item in enumerate(batch):
+                valid[index] = valid[index] and not item[2].cancelled()
+            priced['valid'] = valid
+            # The file write runs off the event loop; run() waits for it
+            # before the next batch, so appends stay in order
+            loop = asyncio.get_running_loop()
+            quote_ids = iter((await loop.run_in_executor(None, self.archive.append, priced, fees)).tolist())
+
+        for index, (loan_amount, num_months, future) in enumerate(batch):
+            if future.cancelled():
+                continue
+            if not valid[index]:
+                try:
+                    loan_engine.validate_quote(loan_amount, num_months, fees)
+                except ValueError as e:
+                    future.set_exception(e)
+                else:
+                    future.set_exception(ValueError("Quote is not allowed"))
+                continue
+            result = {'loan_amount': loan_amount, 'repayment_months': num_months}
+            for name in loan_engine.BATCH_COLUMNS:
+                result[name] = columns[name][index]
+            if quote_ids is not None:
+                result['quote_id'] = next(quote_ids)
+            future.set_result(result)
+
+        self.batches += 1
+        self.batched_requests += len(batch)
+
+
+class LatencyMetrics:
+    """
+    Request latencies over a sliding window of the most recent requests
+    """
+
+    def __init__(self, window=10_000):
+        self.latencies = collections.deque(maxlen=window)
+        self.completed = collections.deque(maxlen=window)
+        self.total_requests = 0
+        self.started = time.perf_counter()
+
+    def record(self, seconds):
+        self.latencies.append(seconds)
+        self.completed.append(time.perf_counter())
+        self.total_requests += 1
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+        now = time.perf_counter()
+        span = now - self.completed[0] if self.completed else 0.0
+
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+        return {
+            'total_requests': self.total_requests,
+            'uptime_seconds': now - self.started,
+            'requests_per_second': len(self.completed) / span if span > 0 else 0.0,
+            'p50_ms': percentile(0.50) * 1000,
+            'p99_ms': percentile(0.99) * 1000
+        }
+
+
+def parse_request_head(head):
+    """
+    Split an HTTP request head into (method, target, headers, content length);
+    None if it is malformed
+    """
+    request_line, *header_lines = head.decode("latin-1").split("\r\n")
+    parts = request_line.split(" ")
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        return None
+    method, target, _ = parts
+
+    headers = {}
+    for line in header_lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    content_length = headers.get("content-length", "0")
+    if not content_length.isdigit():
+        return None
+    return method, target, headers, int(content_length)
+
+
+def parse_whole_number(value):
+    """
+    int from a query string or JSON number that holds a whole number;
+    raises ValueError for booleans, fractions and anything else
+    """
+    if isinstance(value, bool):
+        raise ValueError("Booleans are not numbers")
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(number)
+
+
+class QuoteServer:
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self.metrics = LatencyMetrics()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                start = time.perf_counter()
+                request = parse_request_head(head)
+                if request is None:
+                    # The stream cannot be resynchronized after a bad head
+                    status = 400
+                    data = json.dumps({'error': "Malformed request"}).encode()
+                    keep_alive = False
+                else:
+                    method, target, headers, content_length = request
+                    body = b""
+                    if content_length:
+                        body = await reader.readexactly(content_length)
+
+                    status, data = await self.respond(method, target, body)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                self.metrics.record(time.perf_counter() - start)
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, method, target, body):
+        """
+        dispatch() a request and encode the JSON body; an unexpected error
+        is logged and answered with a 500 instead of dropping the connection
+        """
+        try:
+            status, payload = await self.dispatch(method, target, body)
+            return status, json.dumps(payload, allow_nan=False).encode()
+        except Exception:
+            logger.exception("%s %s failed", method, target)
+            return 500, json.dumps({'error': "Internal server error"}).encode()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+
+        if url.path == "/metrics":
+            metrics = self.metrics.snapshot()
+            batches = self.batcher.batches
+            metrics['batches'] = batches
+            metrics['mean_batch_size'] = self.batcher.batched_requests / batches if batches else 0.0
+            return 200, metrics
+
+        if url.path not in ("/quote", "/schedule"):
+            return 404, {'error': f"Unknown path {url.path}"}
+
+        if method == "GET":
+            params = dict(parse_qsl(url.query))
+        elif method == "POST":
+            try:
+                params = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {'error': "Request body must be JSON"}
+        else:
+            return 405, {'error': f"Method {method} not allowed"}
+
+        try:
+            if isinstance(params["loan_amount"], bool):
+                raise TypeError("Booleans are not numbers")
+            loan_amount = float(params["loan_amount"])
+            num_months = parse_whole_number(params["repayment_months"])
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return 400, {'error': "loan_amount and a whole number of repayment_months are required"}
+        if not math.isfinite(loan_amount):
+            return 400, {'error': "loan_amount must be a finite number"}
+
+        try:
+            result = await self.batcher.quote(loan_amount, num_months)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except BatchError as e:
+            return 500, {'error': f"Quote could not be priced: {e}"}
+
+        if url.path == "/schedule":
+            result['schedule'] = [
+                {'month': row['month'], 'payment': float(row['payment']), 'remaining': float(row['remaining'])}
+                for row in loan_money.iter_repayment_schedule(result)
+            ]
+        return 200, result
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch=DEFAULT_MAX_BATCH,
+                max_delay=DEFAULT_MAX_DELAY, rules=None, product=None, archive=None):
+    batcher = QuoteBatcher(max_batch, max_delay, rules=rules, product=product, archive=archive)
+    quote_server = QuoteServer(batcher)
+    batch_task = asyncio.ensure_future(batcher.run())
+
+    server = await asyncio.start_server(quote_server.handle_connection, host, port)
+    print(f"Serving quotes on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batch_task.cancel()
+
+
+async def load_generator(host=DEFAULT_HOST, port=DEFAULT_PORT, connections=64, duration=10.0):
+    """
+    Send quote requests over keep-alive connections for duration seconds.
+
+    Returns the number of requests, requests per second and client-side
+    p50/p99 latency in milliseconds.
+    """
+    latencies = []
+    stop_at = time.perf_counter() + duration
+
+    async def client(client_id):
+        reader, writer = await asyncio.open_connection(host, port)
+        request_number = 0
+        try:
+            while time.perf_counter() < stop_at:
+                request_number += 1
+                loan_amount = 1000 + (client_id * 7919 + request_number * 50) % 49000
+                num_months = 1 + request_number % 12
+                request = (
+                    f"GET /quote?loan_amount={loan_amount}&repayment_months={num_months} HTTP/1.1\r\n"
+                    f"Host: {host}\r\n\r\n"
+                ).encode()
+
+                start = time.perf_counter()
+                writer.write(request)
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n"):
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'requests': count,
+        'requests_per_second': count / elapsed if elapsed else 0.0,
+        'p50_ms': latencies[count // 2] * 1000 if count else 0.0,
+        'p99_ms': latencies[min(count - 1, int(count * 0.99))] * 1000 if count else 0.0
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Loan quoting HTTP service")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="run the quoting service")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST, help="address to bind (default: %(default)s)")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to bind (default: %(default)s)")
+    serve_parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                              help="largest micro-batch (default: %(default)s)")
+    serve_parser.add_argument("--max-delay-ms", type=float, default=DEFAULT_MAX_DELAY * 1000,
+                              help="longest wait to fill a micro-batch (default: %(default)s)")
+    serve_parser.add_argument("--rules", metavar="PATH",
+                              help="fee schedule file to quote with (see fee_schedules.json)")
+    serve_parser.add_argument("--product", help="product in --rules to quote (default: the first)")
+    serve_parser.add_argument("--archive", metavar="PATH",
+                              help="append every quote served to this quote archive file")
+
+    loadgen_parser = subparsers.add_parser("loadgen", help="send load to a running service")
+    loadgen_parser.add_argument("--host", default=DEFAULT_HOST, help="service address (default: %(default)s)")
+    loadgen_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="service port (default: %(default)s)")
+    loadgen_parser.add_argument("--connections", type=int, default=64,
+                                help="concurrent keep-alive connections (default: %(default)s)")
+    loadgen_parser.add_argument("--duration", type=float, default=10.0,
+                                help="seconds to send requests for (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        rules = None
+        if args.rules:
+            import loan_rules
+            rules = loan_rules.RuleBook(args.rules)
+            try:
+                rules.product(args.product)
+            except ValueError as e:
+                parser.error(str(e))
+        archive = None
+        if args.archive:
+            import loan_archive
+            archive = loan_archive.QuoteArchive(args.archive)
+        try:
+            asyncio.run(serve(args.host, args.port, args.max_batch, args.max_delay_ms / 1000,
+                              rules, args.product, archive))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    stats = asyncio.run(load_generator(args.host, args.port, args.connections, args.duration))
+    print(
+        f"{stats['requests']:,} requests, {stats['requests_per_second']:,.0f} req/s, "
+        f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
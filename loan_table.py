@@ -0,0 +1,197 @@
+"""
+Precomputed quote table.
+
+Loan amounts are quantized to RM50 steps and tenors are limited by the fee
+schedule, so the whole quote space is a small grid. QuoteTable prices the
+grid once with the batch engine (or loads it from a .npz file) and answers
+quotes by array index.
+
+Usage:
+    python loan_table.py quote_table.npz --max-amount 100000
+"""
+
+import argparse
+import math
+import sys
+
+import loan_engine
+
+DEFAULT_AMOUNT_STEP = 50
+DEFAULT_MAX_AMOUNT = 100_000
+
+
+class QuoteTable:
+    """
+    Grid of batch results indexed by [amount step, month].
+
+    Row i holds the amount (i + 1) * amount_step; column j holds the tenor
+    fees.min_months + j.
+    """
+
+    def __init__(self, columns, amount_step, max_amount, fees):
+        self.columns = columns
+        self.amount_step = amount_step
+        self.max_amount = max_amount
+        self.fees = fees
+
+    @classmethod
+    def build(cls, amount_step=DEFAULT_AMOUNT_STEP, max_amount=DEFAULT_MAX_AMOUNT,
+              fees=loan_engine.DEFAULT_FEES):
+        import numpy as np
+
+        if amount_step <= 0 or max_amount < amount_step:
+            raise ValueError("Maximum amount must be at least one amount step")
+
+        amounts = np.arange(1, int(max_amount // amount_step) + 1) * float(amount_step)
+        months = np.arange(fees.min_months, fees.max_months + 1)
+        result = loan_engine.calculate_loan_repayment_batch(amounts[:, None], months[None, :], fees)
+        columns = {name: result[name] for name in loan_engine.BATCH_COLUMNS}
+        return cls(columns, amount_step, max_amount, fees)
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+
+        with np.load(path) as data:
+            meta = data['meta']
+            columns = {name: data[name] for name in loan_engine.BATCH_COLUMNS}
+            fee_tiers = data['fee_tiers'] if 'fee_tiers' in data else np.empty((0, 2))
+
+        def optional_limit(index):
+            # Limits are stored as NaN when unset (and absent in older files)
+            if len(meta) <= index or np.isnan(meta[index]):
+                return None
+            return meta[index].item()
+
+        fees = loan_engine.FeeSchedule(
+            management_fee=meta[2].item(),
+            stamp_duty_rate=meta[3].item(),
+            min_months=int(meta[4]),
+            max_months=int(meta[5]),
+            min_amount=optional_limit(6),
+            max_amount=optional_limit(7),
+            fee_tiers=tuple((up_to, fee) for up_to, fee in fee_tiers.tolist()) or None
+        )
+        return cls(columns, meta[0].item(), meta[1].item(), fees)
+
+    def save(self, path):
+        import numpy as np
+
+        meta = np.array([
+            self.amount_step, self.max_amount,
+            self.fees.management_fee, self.fees.stamp_duty_rate,
+            self.fees.min_months, self.fees.max_months,
+            np.nan if self.fees.min_amount is None else self.fees.min_amount,
+            np.nan if self.fees.max_amount is None else self.fees.max_amount
+        ], dtype=np.float64)
+        fee_tiers = np.array(self.fees.fee_tiers or (), dtype=np.float64).reshape(-1, 2)
+        # Written through a file object so np.savez does not append .npz to
+        # the path that load() is later given
+        with open(path, "wb") as table_file:
+            np.savez(table_file, meta=meta, fee_tiers=fee_tiers, **self.columns)
+
+    @classmethod
+    def load_or_build(cls, path, amount_step=DEFAULT_AMOUNT_STEP, max_amount=DEFAULT_MAX_AMOUNT,
+                      fees=loan_engine.DEFAULT_FEES):
+        """
+        Load the table at path, rebuilding and saving it if the file is
+        missing, was built for other parameters or fails verification
+        """
+        try:
+            table = cls.load(path)
+        except (OSError, KeyError, ValueError):
+            table = None
+
+        if (table is None
+                or table.amount_step != amount_step
+                or table.max_amount != max_amount
+                or tuple(table.fees) != tuple(fees)
+                or table.verify(sample=1000)):
+            table = cls.build(amount_step, max_amount, fees)
+            table.save(path)
+        return table
+
+    def index(self, loan_amount, num_months):
+        """
+        Return the (row, column) grid index of a quote, or None if it is off the grid
+        """
+        steps, remainder = divmod(loan_amount, self.amount_step)
+        if remainder != 0 or loan_amount <= 0 or loan_amount > self.max_amount:
+            return None
+        if num_months < self.fees.min_months or num_months > self.fees.max_months:
+            return None
+        return int(steps) - 1, int(num_months) - self.fees.min_months
+
+    def lookup(self, loan_amount, num_months):
+        """
+        Return the calculate_loan_repayment result dict for a grid quote, or
+        None if the amount/tenor is not on the grid or not allowed
+        """
+        index = self.index(loan_amount, num_months)
+        if index is None:
+            return None
+
+        # Cells outside the fee schedule's amount limits hold NaN
+        if math.isnan(self.columns['total_repayment'][index]):
+            return None
+
+        result = {'loan_amount': loan_amount, 'repayment_months': num_months}
+        for name in loan_engine.BATCH_COLUMNS:
+            result[name] = self.columns[name][index].item()
+        return result
+
+    def verify(self, sample=None):
+        """
+        Compare table entries against the live formula.
+
+        Checks every cell, or `sample` evenly spaced cells, and returns the
+        list of (loan_amount, num_months) quotes that do not match.
+        """
+        rows, cols = self.columns['total_repayment'].shape
+        cells = rows * cols
+        step = 1 if sample is None or sample >= cells else cells // sample
+
+        mismatches = []
+        for flat in range(0, cells, step):
+            row, col = divmod(flat, cols)
+            loan_amount = float((row + 1) * self.amount_step)
+            num_months = col + self.fees.min_months
+            actual = self.lookup(loan_amount, num_months)
+            try:
+                expected = loan_engine.calculate_loan_repayment(loan_amount, num_months, self.fees)
+            except ValueError:
+                if actual is not None:
+                    mismatches.append((loan_amount, num_months))
+                continue
+            if actual is None or any(actual[name] != expected[name] for name in loan_engine.BATCH_COLUMNS):
+                mismatches.append((loan_amount, num_months))
+        return mismatches
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Build the precomputed quote table file")
+    parser.add_argument("output", help=".npz file to write the table to")
+    parser.add_argument("--amount-step", type=int, default=DEFAULT_AMOUNT_STEP,
+                        help="loan amount quantization in RM (default: %(default)s)")
+    parser.add_argument("--max-amount", type=int, default=DEFAULT_MAX_AMOUNT,
+                        help="largest loan amount in the table (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    table = QuoteTable.build(args.amount_step, args.max_amount)
+    mismatches = table.verify()
+    if mismatches:
+        print(f"Table does not match the live formula for {len(mismatches)} quotes")
+        return 1
+
+    table.save(args.output)
+    rows, cols = table.columns['total_repayment'].shape
+    print(f"Wrote {rows * cols:,} quotes to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
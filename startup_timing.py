@@ -0,0 +1,119 @@
+"""
+Startup timing harness.
+
+Reports the time from process launch to the first drawn window and the
+slowest imports of the calculator, so startup regressions show up.
+
+Usage:
+    python startup_timing.py
+    python startup_timing.py --exe dist/loan_calculator_v1.exe --runs 5
+    python startup_timing.py --budget 2.0      # exit 1 if startup is slower
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, "loan_calculator_v1.py")
+
+
+def time_to_first_window(command, timeout=60):
+    """
+    Launch the calculator and return seconds until its first window is drawn.
+
+    Raises RuntimeError if it exits without drawing a window or is still
+    running after timeout seconds.
+    """
+    fd, probe_path = tempfile.mkstemp(suffix=".probe")
+    os.close(fd)
+    os.remove(probe_path)
+
+    env = dict(os.environ, LOAN_CALC_STARTUP_PROBE=probe_path)
+    start = time.time()
+    process = subprocess.Popen(command, env=env)
+    try:
+        process.wait(timeout=timeout)
+        with open(probe_path) as probe_file:
+            first_window = float(probe_file.read())
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Calculator did not draw a window and exit within {timeout}s")
+    except FileNotFoundError:
+        raise RuntimeError(f"Calculator exited with code {process.returncode} before drawing a window")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        if os.path.exists(probe_path):
+            os.remove(probe_path)
+    return first_window - start
+
+
+def import_breakdown(module="loan_calculator_v1"):
+    """
+    Return (cumulative seconds, module name) for module and each module it
+    imports directly, slowest first, using python -X importtime
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, capture_output=True, text=True, check=True
+    )
+
+    # Imports are listed children first and indented two spaces per level
+    children = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        seconds = int(cumulative) / 1e6
+        if depth == 1:
+            children.append((seconds, name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                return [(seconds, module)] + sorted(children, reverse=True)
+            children = []
+    return []
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Measure calculator startup time")
+    parser.add_argument("--exe", help="packaged executable to time instead of the Python script")
+    parser.add_argument("--runs", type=int, default=3, help="startups to time (default: %(default)s)")
+    parser.add_argument("--top", type=int, default=10, help="imports to list (default: %(default)s)")
+    parser.add_argument("--budget", type=float,
+                        help="fail if the median time to first window exceeds this many seconds")
+    parser.add_argument("--timeout", type=float, default=60,
+                        help="seconds to wait for each startup before giving up (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    command = [args.exe] if args.exe else [sys.executable, SCRIPT]
+    try:
+        timings = sorted(time_to_first_window(command, args.timeout) for _ in range(args.runs))
+    except RuntimeError as e:
+        print(e)
+        return 1
+    median = timings[len(timings) // 2]
+
+    print(f"Time to first window: median {median:.3f}s, "
+          f"min {timings[0]:.3f}s, max {timings[-1]:.3f}s ({args.runs} runs)")
+
+    print("\nSlowest imports (cumulative):")
+    for seconds, name in import_breakdown()[:args.top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    if args.budget is not None and median > args.budget:
+        print(f"\nStartup budget exceeded: {median:.3f}s > {args.budget:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
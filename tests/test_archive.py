@@ -0,0 +1,98 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import loan_archive
+import loan_engine
+import loan_money
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    return str(tmp_path / "quotes.qarc")
+
+
+def test_round_trip(archive_path):
+    archive = loan_archive.QuoteArchive(archive_path)
+    result = loan_engine.calculate_loan_repayment(5000, 6)
+    assert archive.append(result, issued_at="2026-01-01").tolist() == [1]
+
+    batch = loan_engine.calculate_loan_repayment_batch([1000, -1, 1234.565], [3, 6, 12])
+    assert archive.append(batch, issued_at="2026-02-01").tolist() == [2, 3]
+
+    # Reopening reads the same records back from the file
+    archive = loan_archive.QuoteArchive(archive_path)
+    assert len(archive) == 3
+    quote = archive.get(1)
+    for name, value in result.items():
+        assert quote[name] == value
+    assert quote['issued_at'] == datetime.datetime(2026, 1, 1)
+    assert quote['management_fee'] == 15
+    assert quote['stamp_duty_rate'] == 0.005
+
+    quote = archive.get(3)
+    assert quote['loan_amount'] == 1234.565
+    assert quote['repayment_months'] == 12
+    assert list(archive.schedule(3)) == list(loan_money.iter_repayment_schedule(quote))
+
+    with pytest.raises(KeyError):
+        archive.get(4)
+
+
+def test_between(archive_path):
+    archive = loan_archive.QuoteArchive(archive_path)
+    result = loan_engine.calculate_loan_repayment(5000, 6)
+    for day in (1, 2, 2, 5):
+        archive.append(result, issued_at=datetime.date(2026, 1, day))
+
+    assert archive.between("2026-01-02", "2026-01-05")['quote_id'].tolist() == [2, 3]
+    assert archive.between(None, "2026-01-02")['quote_id'].tolist() == [1]
+    assert archive.between("2026-01-03")['quote_id'].tolist() == [4]
+    assert len(archive.between("2026-01-05", "2026-01-01")) == 0
+    assert len(archive.between()) == 4
+
+
+def test_issue_times_cannot_go_backwards(archive_path):
+    archive = loan_archive.QuoteArchive(archive_path)
+    result = loan_engine.calculate_loan_repayment(5000, 6)
+    archive.append(result, issued_at="2026-02-01")
+    with pytest.raises(ValueError):
+        archive.append(result, issued_at="2026-01-01")
+
+
+def test_partial_record_is_cut_off(archive_path):
+    archive = loan_archive.QuoteArchive(archive_path)
+    result = loan_engine.calculate_loan_repayment(5000, 6)
+    archive.append(result, issued_at="2026-01-01")
+    records = archive.records()
+    with open(archive_path, "ab") as archive_file:
+        archive_file.write(b"\xff" * 10)
+
+    archive = loan_archive.QuoteArchive(archive_path)
+    assert len(archive) == 1
+    archive.append(result, issued_at="2026-01-02")
+    assert archive.records()['quote_id'].tolist() == [1, 2]
+    assert np.array_equal(archive.records()[:1], records)
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a quote archive")
+    with pytest.raises(ValueError):
+        loan_archive.QuoteArchive(str(path))
+
+
+def test_readers_see_appends(archive_path):
+    writer = loan_archive.QuoteArchive(archive_path)
+    reader = loan_archive.QuoteArchive(archive_path)
+    result = loan_engine.calculate_loan_repayment(5000, 6)
+
+    writer.append(result, issued_at="2026-01-01")
+    assert len(writer.records()) == 1
+    writer.append(result, issued_at="2026-01-02")
+    assert writer.column('quote_id').tolist() == [1, 2]
+
+    assert len(reader) == 0
+    reader.refresh()
+    assert reader.column('quote_id').tolist() == [1, 2]
@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+import loan_background
+
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks run when the test calls run_pending()"""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, delay_ms, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    def run_pending(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+@pytest.fixture
+def runner(root):
+    runner = loan_background.BackgroundRunner(root)
+    yield runner
+    runner.shutdown()
+
+
+def wait_for(root, task):
+    for _ in range(500):
+        if task.done:
+            return
+        time.sleep(0.01)
+        root.run_pending()
+    raise AssertionError("background task did not finish")
+
+
+def test_result_is_delivered_on_the_polling_thread(runner, root):
+    results = []
+    task = runner.submit(lambda task, a, b: a + b, 2, 3, on_result=results.append)
+
+    assert results == []
+    wait_for(root, task)
+    assert results == [5]
+    assert root.callbacks == {}  # polling stops once nothing is pending
+
+
+def test_errors_are_delivered(runner, root):
+    errors = []
+
+    def job(task):
+        raise ValueError("bad input")
+
+    task = runner.submit(job, on_error=errors.append)
+    wait_for(root, task)
+    assert [str(error) for error in errors] == ["bad input"]
+
+
+def test_cancelled_job_stops_at_next_progress_report(runner, root):
+    started = threading.Event()
+    release = threading.Event()
+    reached = []
+    cancelled = []
+
+    def job(task):
+        started.set()
+        release.wait(5)
+        task.report_progress(1)
+        reached.append("after progress")
+        return "finished"
+
+    task = runner.submit(job, on_result=cancelled.append, on_cancel=lambda: cancelled.append("cancelled"))
+    started.wait(5)
+    task.cancel()
+    release.set()
+    wait_for(root, task)
+
+    assert reached == []
+    assert cancelled == ["cancelled"]
+
+
+def test_only_the_latest_progress_is_delivered(runner, root):
+    progress = []
+    reported = threading.Event()
+    release = threading.Event()
+
+    def job(task):
+        for rows in (10, 20, 30):
+            task.report_progress(rows)
+        reported.set()
+        release.wait(5)
+        return rows
+
+    task = runner.submit(job, on_progress=progress.append)
+    reported.wait(5)
+    root.run_pending()
+    release.set()
+    wait_for(root, task)
+
+    assert progress == [30]
+
+
+def test_shutdown_cancels_polling(runner, root):
+    release = threading.Event()
+    runner.submit(lambda task: release.wait(5))
+    runner.shutdown()
+    release.set()
+    assert root.callbacks == {}
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import loan_engine
+
+AMOUNTS = [0.01, 1, 99.99, 100, 1234.565, 5000, 10000.5, 250000, 1e7]
+
+TIERED_FEES = loan_engine.FeeSchedule(
+    management_fee=25,
+    stamp_duty_rate=0.006,
+    min_months=3,
+    max_months=24,
+    min_amount=500,
+    max_amount=50000,
+    fee_tiers=((1000, 10), (5000, 15))
+)
+
+
+def quote_grid():
+    amounts, months = np.meshgrid(AMOUNTS + [0, -5, float("nan"), float("inf")], np.arange(0, 26))
+    return amounts.ravel(), months.ravel()
+
+
+@pytest.mark.parametrize("fees", [loan_engine.DEFAULT_FEES, TIERED_FEES])
+def test_batch_matches_scalar(fees):
+    amounts, months = quote_grid()
+    batch = loan_engine.calculate_loan_repayment_batch(amounts, months, fees)
+
+    for index, (loan_amount, num_months) in enumerate(zip(amounts.tolist(), months.tolist())):
+        try:
+            expected = loan_engine.calculate_loan_repayment(loan_amount, num_months, fees)
+        except ValueError:
+            assert not batch['valid'][index]
+            for name in loan_engine.BATCH_COLUMNS:
+                assert np.isnan(batch[name][index]), name
+            continue
+
+        assert batch['valid'][index]
+        for name in loan_engine.BATCH_COLUMNS:
+            assert batch[name][index] == pytest.approx(expected[name], rel=1e-15), name
+
+
+def test_price_frame_keeps_other_columns():
+    frame = pd.DataFrame({
+        'application_id': ["A", "B", "C"],
+        'loan_amount': [5000.0, -1.0, 1000.0],
+        'repayment_months': [6, 6, 12]
+    })
+    priced = loan_engine.price_frame(frame)
+
+    assert priced['application_id'].tolist() == ["A", "B", "C"]
+    assert priced['valid'].tolist() == [True, False, True]
+    assert priced['total_repayment'][0] == loan_engine.calculate_loan_repayment(5000.0, 6)['total_repayment']
+    assert 'valid' not in frame
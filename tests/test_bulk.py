@@ -0,0 +1,110 @@
+import concurrent.futures
+
+import pandas as pd
+import pytest
+
+import loan_background
+import loan_bulk
+import loan_engine
+
+
+def write_applications(path, rows):
+    pd.DataFrame(rows, columns=["application_id", "loan_amount", "repayment_months"]).to_csv(path, index=False)
+
+
+@pytest.fixture
+def applications(tmp_path):
+    path = tmp_path / "applications.csv"
+    write_applications(path, [(f"A{index}", 500 + 250 * index, index % 14) for index in range(25)])
+    return str(path)
+
+
+def test_chunked_output_matches_whole_file(applications, tmp_path):
+    output = str(tmp_path / "quotes.csv")
+    calls = []
+    stats = loan_bulk.price_file(applications, output, chunk_size=4,
+                                 progress=lambda rows, valid: calls.append((rows, valid)))
+
+    expected = loan_engine.price_frame(pd.read_csv(applications))
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected)
+    assert stats['rows'] == 25
+    assert stats['valid_rows'] == int(expected['valid'].sum())
+    assert [rows for rows, _ in calls] == [4, 8, 12, 16, 20, 24, 25]
+
+
+def test_chunks_are_bounded(applications):
+    sizes = [len(chunk) for chunk in loan_bulk.iter_input_chunks(applications, 10)]
+    assert sizes == [10, 10, 5]
+
+
+def test_non_numeric_input_marks_rows_invalid(tmp_path):
+    path = tmp_path / "applications.csv"
+    write_applications(path, [("A", 5000, 6), ("B", "abc", 6), ("C", 1000, "six"), ("D", "", 3)])
+    output = str(tmp_path / "quotes.csv")
+
+    stats = loan_bulk.price_file(str(path), output)
+
+    quotes = pd.read_csv(output)
+    assert quotes['valid'].tolist() == [True, False, False, False]
+    assert quotes['total_repayment'][0] == 5115.0
+    assert (stats['rows'], stats['valid_rows']) == (4, 1)
+
+
+def test_progress_error_stops_the_run(applications, tmp_path):
+    def progress(rows, valid_rows):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        loan_bulk.price_file(applications, str(tmp_path / "quotes.csv"), chunk_size=4, progress=progress)
+
+
+def test_parquet_schema_is_pinned_across_chunks(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "applications.csv"
+    # The second chunk reads the amount column as text and the ID column as numbers
+    write_applications(path, [("A", 5000, 6), ("B", 1000, 3), (7, "abc", 6), (8, 2000, 12)])
+    output = str(tmp_path / "quotes.parquet")
+
+    loan_bulk.price_file(str(path), output, chunk_size=2)
+
+    quotes = pd.read_parquet(output)
+    assert quotes['application_id'].tolist() == ["A", "B", "7", "8"]
+    assert quotes['valid'].tolist() == [True, True, False, True]
+    assert quotes['loan_amount'].isna().tolist() == [False, False, True, False]
+    assert str(quotes['repayment_months'].dtype) == "int64"
+
+
+@pytest.mark.parametrize("extension", ["csv", "parquet"])
+def test_process_pool_output_matches_single_process(applications, tmp_path, extension):
+    if extension == "parquet":
+        pytest.importorskip("pyarrow")
+    single = str(tmp_path / f"single.{extension}")
+    pooled = str(tmp_path / f"pooled.{extension}")
+
+    single_stats = loan_bulk.price_file(applications, single, chunk_size=3)
+    pooled_stats = loan_bulk.price_file(applications, pooled, chunk_size=3, workers=2)
+
+    assert (pooled_stats['rows'], pooled_stats['valid_rows']) == (single_stats['rows'], single_stats['valid_rows'])
+    if extension == "csv":
+        with open(single) as single_file, open(pooled) as pooled_file:
+            assert pooled_file.read() == single_file.read()
+    else:
+        pd.testing.assert_frame_equal(pd.read_parquet(pooled), pd.read_parquet(single))
+
+
+def test_cancelled_pool_drops_queued_shards(applications, tmp_path, monkeypatch):
+    shutdowns = []
+
+    class RecordingPool(concurrent.futures.ProcessPoolExecutor):
+        def shutdown(self, wait=True, *, cancel_futures=False):
+            shutdowns.append((wait, cancel_futures))
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def progress(rows, valid_rows):
+        raise loan_background.TaskCancelled
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", RecordingPool)
+    with pytest.raises(loan_background.TaskCancelled):
+        loan_bulk.price_file(applications, str(tmp_path / "quotes.csv"), chunk_size=2,
+                             workers=2, progress=progress)
+    assert shutdowns[0] == (False, True)
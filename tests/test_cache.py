@@ -0,0 +1,75 @@
+import pytest
+
+import loan_cache
+import loan_engine
+
+OTHER_FEES = loan_engine.DEFAULT_FEES._replace(management_fee=20)
+
+
+def test_hits_return_the_cached_entry():
+    cache = loan_cache.QuoteCache(maxsize=4)
+    result, display = cache.get(5000, 6)
+    assert result == loan_engine.calculate_loan_repayment(5000, 6)
+    assert display == loan_engine.format_quote(result)
+
+    assert cache.get(5000, 6)[0] is result
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = loan_cache.QuoteCache(maxsize=2)
+    cache.get(1000, 6)
+    cache.get(2000, 6)
+    cache.get(1000, 6)
+    cache.get(3000, 6)
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    cache.get(1000, 6)
+    assert cache.hits == 2
+    cache.get(2000, 6)
+    assert cache.misses == 4
+
+
+def test_fee_change_drops_cached_quotes():
+    cache = loan_cache.QuoteCache()
+    cache.get(5000, 6)
+    result, _ = cache.get(5000, 6, OTHER_FEES)
+
+    assert result['management_cost'] == 120
+    assert len(cache) == 1
+    cache.get(5000, 6)
+    assert cache.misses == 3
+
+
+def test_invalid_quotes_are_not_cached():
+    cache = loan_cache.QuoteCache()
+    with pytest.raises(ValueError):
+        cache.get(-1, 6)
+    assert len(cache) == 0
+
+
+class FakeTable:
+    """Answers quotes on RM50 steps and records every lookup"""
+
+    fees = loan_engine.DEFAULT_FEES
+
+    def __init__(self):
+        self.lookups = []
+
+    def lookup(self, loan_amount, num_months):
+        self.lookups.append((loan_amount, num_months))
+        if loan_amount % 50:
+            return None
+        return dict(loan_engine.calculate_loan_repayment(loan_amount, num_months), from_table=True)
+
+
+def test_misses_on_the_grid_are_answered_from_the_table():
+    table = FakeTable()
+    cache = loan_cache.QuoteCache(table=table)
+
+    assert cache.get(5000, 6)[0]['from_table']
+    assert 'from_table' not in cache.get(5001, 6)[0]
+    # A table built for other fees is never used
+    assert 'from_table' not in cache.get(5000, 6, OTHER_FEES)[0]
+    assert table.lookups == [(5000, 6), (5001, 6)]
@@ -0,0 +1,41 @@
+import pytest
+
+import loan_engine
+
+AMOUNTS = [0.01, 1, 99.99, 100, 1234.565, 5000, 10000.5, 250000, 1e7]
+MONTHS = range(1, 13)
+
+
+def baseline_repayment(loan_amount, num_months):
+    """The calculator's original pricing, before the engine module existed"""
+    management_cost = 15 * num_months
+    stamp_duty = loan_amount * 0.005
+    total_repayment = loan_amount + management_cost + stamp_duty
+    repayment_period_interest_rate = (management_cost / loan_amount) * 100
+    return {
+        'loan_amount': loan_amount,
+        'repayment_months': num_months,
+        'management_cost': management_cost,
+        'stamp_duty': stamp_duty,
+        'total_repayment': total_repayment,
+        'monthly_installment': total_repayment / num_months,
+        'repayment_period_interest_rate': repayment_period_interest_rate,
+        'monthly_interest_rate_percent': repayment_period_interest_rate / num_months,
+        'monthly_interest_rate_decimal': management_cost / (loan_amount * num_months),
+        'total_fees': management_cost + stamp_duty
+    }
+
+
+@pytest.mark.parametrize("num_months", MONTHS)
+@pytest.mark.parametrize("loan_amount", AMOUNTS)
+def test_engine_matches_baseline(loan_amount, num_months):
+    assert loan_engine.calculate_loan_repayment(loan_amount, num_months) == \
+        baseline_repayment(loan_amount, num_months)
+
+
+@pytest.mark.parametrize("loan_amount, num_months", [
+    (0, 6), (-100, 6), (5000, 0), (5000, 13), (float("nan"), 6), (float("inf"), 6)
+])
+def test_invalid_quotes_are_rejected(loan_amount, num_months):
+    with pytest.raises(ValueError):
+        loan_engine.calculate_loan_repayment(loan_amount, num_months)
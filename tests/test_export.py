@@ -0,0 +1,113 @@
+import csv
+import io
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+import loan_engine
+import loan_export
+
+
+def write_applications(path, rows):
+    pd.DataFrame(rows, columns=["application_id", "loan_amount", "repayment_months"]).to_csv(path, index=False)
+
+
+@pytest.mark.parametrize("extension", loan_export.FORMATS)
+def test_statement_formats_are_readable(tmp_path, extension):
+    result = loan_engine.calculate_loan_repayment(5000, 6)
+    path = str(tmp_path / f"statement.{extension}")
+    loan_export.export_statement(result, path, reference="APP-7")
+
+    with open(path, "rb") as statement_file:
+        content = statement_file.read()
+    if extension == "csv":
+        rows = list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+        assert ["Reference", "APP-7"] in rows
+        assert ["Total Repayment", "RM 5,115.00"] in rows
+    elif extension == "xlsx":
+        with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+            assert workbook.testzip() is None
+            assert "xl/worksheets/sheet1.xml" in workbook.namelist()
+            assert "APP-7" in workbook.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    else:
+        assert content.startswith(b"%PDF-")
+        assert content.rstrip().endswith(b"%%EOF")
+        assert content.count(b"/Type /Page ") == 1
+
+
+def test_unsupported_format_is_rejected(tmp_path):
+    result = loan_engine.calculate_loan_repayment(5000, 6)
+    with pytest.raises(ValueError):
+        loan_export.export_statement(result, str(tmp_path / "statement.docx"))
+
+
+def test_every_statement_gets_its_own_file(tmp_path):
+    path = tmp_path / "applications.csv"
+    write_applications(path, [
+        ("A1", 5000, 6),
+        ("A1", 6000, 6),        # duplicate
+        ("", 7000, 6),          # empty
+        ("A/1", 8000, 6),       # becomes A_1 once made safe
+        ("a_1", 9000, 6),       # clashes with A_1 on case-insensitive file systems
+        ("B1", 9000, 60),       # invalid, skipped
+        ("row3", 1000, 3),      # clashes with the name the empty reference was given
+    ])
+    output_dir = tmp_path / "statements"
+
+    stats = loan_export.export_batch(str(path), str(output_dir), formats=("csv",), id_column="application_id")
+
+    names = sorted(os.listdir(output_dir))
+    assert len(names) == len({name.lower() for name in names}) == 6
+    assert stats['statements'] == 6
+    assert stats['documents'] == 6
+    assert stats['skipped_rows'] == 1
+    assert stats['renamed_statements'] == 4
+    assert "A1.csv" in names and "A_1.csv" in names and "row3.csv" in names
+
+    # The original reference is printed, not the file name
+    renamed = [name for name in names if name.startswith("A1_")]
+    assert len(renamed) == 1
+    text = (output_dir / renamed[0]).read_text(encoding="utf-8-sig")
+    assert "Reference,A1\n" in text and "RM 6,000.00" in text
+
+
+def test_row_numbers_name_statements_without_an_id_column(tmp_path):
+    path = tmp_path / "applications.csv"
+    write_applications(path, [("A", 5000, 6), ("B", -1, 6), ("C", 1000, 3)])
+    output_dir = tmp_path / "statements"
+
+    stats = loan_export.export_batch(str(path), str(output_dir), formats=("csv", "pdf"))
+
+    assert sorted(os.listdir(output_dir)) == ["1.csv", "1.pdf", "3.csv", "3.pdf"]
+    assert (stats['statements'], stats['documents'], stats['skipped_rows']) == (2, 4, 1)
+
+
+def test_text_in_numeric_columns_skips_only_those_rows(tmp_path):
+    path = tmp_path / "applications.csv"
+    write_applications(path, [("A", 5000, 6), ("B", "abc", "six"), ("C", 1000, "6.0")])
+    output_dir = tmp_path / "statements"
+
+    stats = loan_export.export_batch(str(path), str(output_dir), formats=("csv",), id_column="application_id")
+
+    assert sorted(os.listdir(output_dir)) == ["A.csv", "C.csv"]
+    assert stats['skipped_rows'] == 1
+    assert "1,000.00" in (output_dir / "C.csv").read_text(encoding="utf-8-sig")
+
+
+def test_process_pool_writes_the_same_statements(tmp_path):
+    path = tmp_path / "applications.csv"
+    write_applications(path, [(f"A{index % 7}", 500 + 250 * index, index % 13) for index in range(30)])
+
+    single = loan_export.export_batch(str(path), str(tmp_path / "single"), formats=("csv",),
+                                      id_column="application_id", shard_size=4)
+    pooled = loan_export.export_batch(str(path), str(tmp_path / "pooled"), formats=("csv",),
+                                      id_column="application_id", shard_size=4, workers=2)
+
+    for name in ("statements", "documents", "skipped_rows", "renamed_statements"):
+        assert pooled[name] == single[name], name
+    names = sorted(os.listdir(tmp_path / "single"))
+    assert sorted(os.listdir(tmp_path / "pooled")) == names
+    for name in names:
+        assert (tmp_path / "pooled" / name).read_bytes() == (tmp_path / "single" / name).read_bytes()
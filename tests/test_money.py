@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import loan_engine
+import loan_money
+
+AMOUNTS = [0.01, 1, 100, 101, 1234.565, 999.995, 5000, 10000.5, 33333.33]
+
+TIERED_FEES = loan_engine.FeeSchedule(
+    management_fee=25,
+    stamp_duty_rate=0.006,
+    min_months=3,
+    max_months=24,
+    min_amount=500,
+    max_amount=50000,
+    fee_tiers=((1000, 10), (5000, 15))
+)
+
+
+@pytest.mark.parametrize("num_months", range(1, 13))
+@pytest.mark.parametrize("loan_amount", AMOUNTS)
+def test_schedule_adds_up_to_displayed_total(loan_amount, num_months):
+    result = loan_engine.calculate_loan_repayment(loan_amount, num_months)
+    display = loan_engine.format_quote(result)
+    schedule = list(loan_money.iter_repayment_schedule(result))
+
+    assert [row['month'] for row in schedule] == list(range(1, num_months + 1))
+    total = sum(row['payment'] for row in schedule)
+    assert loan_money.format_sen(loan_money.to_sen(total)) == display['total_repayment']
+    assert loan_money.format_sen(loan_money.to_sen(schedule[0]['payment'])) == display['monthly_installment']
+    assert schedule[-1]['remaining'] == 0
+
+
+@pytest.mark.parametrize("num_months", range(1, 13))
+@pytest.mark.parametrize("loan_amount", AMOUNTS)
+def test_displayed_money_matches_exact_pricing(loan_amount, num_months):
+    result = loan_engine.calculate_loan_repayment(loan_amount, num_months)
+    exact = loan_money.calculate_loan_repayment_sen(loan_amount, num_months)
+    assert loan_money.quote_sen(result) == exact
+
+
+@pytest.mark.parametrize("fees", [loan_engine.DEFAULT_FEES, TIERED_FEES])
+def test_batch_sen_matches_scalar(fees):
+    amounts, months = np.meshgrid(AMOUNTS + [0, -5, float("nan")], np.arange(0, 26))
+    amounts, months = amounts.ravel(), months.ravel()
+    batch = loan_money.calculate_loan_repayment_batch_sen(amounts, months, fees)
+
+    for index, (loan_amount, num_months) in enumerate(zip(amounts.tolist(), months.tolist())):
+        try:
+            expected = loan_money.calculate_loan_repayment_sen(loan_amount, num_months, fees)
+        except ValueError:
+            assert not batch['valid'][index]
+            continue
+        assert batch['valid'][index]
+        for name in loan_money.SEN_COLUMNS:
+            assert batch[name][index] == expected[name], name
+
+
+def test_fractional_tenors_are_invalid():
+    batch = loan_money.calculate_loan_repayment_batch_sen([5000.0, 5000.0], [6.0, 6.5])
+    assert batch['valid'].tolist() == [True, False]
+    assert batch['total_repayment_sen'].tolist() == [511500, 0]
+    with pytest.raises(ValueError):
+        loan_money.calculate_loan_repayment_sen(5000, 6.5)
+
+
+def test_to_sen_rounds_half_up():
+    assert loan_money.to_sen(1234.565) == 123457
+    assert loan_money.to_sen("0.005") == 1
+    assert loan_money.to_sen(Decimal("2.994")) == 299
+    assert loan_money.to_sen(7) == 700
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+import loan_engine
+import loan_portfolio
+
+TIERED_FEES = loan_engine.FeeSchedule(
+    management_fee=25,
+    stamp_duty_rate=0.006,
+    min_months=3,
+    max_months=24,
+    min_amount=500,
+    max_amount=50000,
+    fee_tiers=((1000, 10), (5000, 15))
+)
+
+AMOUNTS = [800, 1000, 1500, 4999.99, 5000, 12000, 30000, 100]
+MONTHS = [3, 6, 12, 24, 4, 18, 9, 6]
+STARTS = ['2026-01-15', '2026-01-31', '2026-02-01', '2026-02-28',
+          '2026-03-10', '2026-01-01', '2026-03-31', '2026-01-20']
+
+
+@pytest.fixture
+def book():
+    batch = loan_engine.calculate_loan_repayment_batch(AMOUNTS, MONTHS, TIERED_FEES)
+    starts = np.array(STARTS, dtype='datetime64[D]')
+    portfolio = loan_portfolio.Portfolio(TIERED_FEES)
+    portfolio.add(batch, starts)
+    return portfolio, batch, starts
+
+
+def test_summary_matches_the_priced_loans(book):
+    portfolio, batch, _ = book
+    valid = batch['valid']
+    summary = portfolio.summary()
+
+    assert summary['loans'] == int(valid.sum()) == 7  # RM 100 is below min_amount
+    for name in ('loan_amount', 'management_cost', 'stamp_duty', 'total_repayment'):
+        assert summary[name] == pytest.approx(batch[name][valid].sum())
+    assert summary['total_fees'] == pytest.approx(summary['management_cost'] + summary['stamp_duty'])
+    assert sum(summary['cash_in'].values()) == pytest.approx(batch['total_repayment'][valid].sum())
+
+
+def test_first_installment_is_collected_the_month_after_the_start():
+    portfolio = loan_portfolio.Portfolio()
+    result = loan_engine.calculate_loan_repayment(5000, 3)
+    portfolio.add(result, '2026-01-31')
+
+    cash_in = portfolio.summary()['cash_in']
+    assert list(cash_in) == ['2026-02', '2026-03', '2026-04']
+    for value in cash_in.values():
+        assert value == pytest.approx(result['monthly_installment'])
+
+
+def test_buckets_are_keyed_by_month_and_tier(book):
+    portfolio, _, _ = book
+    labels = {(loan_portfolio.month_label(month), tier) for month, tier in portfolio.origination}
+    # Tier 0 is up to RM 1000, tier 1 up to RM 5000, tier 2 everything above
+    assert labels == {('2026-01', 0), ('2026-02', 1), ('2026-03', 1), ('2026-01', 2), ('2026-03', 2)}
+
+    by_month = portfolio.by_origination_month()
+    assert list(by_month) == ['2026-01', '2026-02', '2026-03']
+    assert [totals['loans'] for totals in by_month.values()] == [3, 2, 2]
+    assert by_month['2026-01']['loan_amount'] == pytest.approx(800 + 1000 + 12000)
+
+
+def test_remove_undoes_add(book):
+    portfolio, batch, starts = book
+    portfolio.remove(batch, starts)
+
+    assert portfolio.origination == {}
+    assert portfolio.cash_in == {}
+    assert portfolio.summary()['loans'] == 0
+
+
+def test_adding_one_loan_at_a_time_matches_a_batch(book):
+    portfolio, _, _ = book
+    single = loan_portfolio.Portfolio(TIERED_FEES)
+    for amount, num_months, start in zip(AMOUNTS, MONTHS, STARTS):
+        try:
+            single.add(loan_engine.calculate_loan_repayment(amount, num_months, TIERED_FEES), start)
+        except ValueError:
+            continue
+
+    expected = portfolio.summary()
+    actual = single.summary()
+    assert actual['loans'] == expected['loans']
+    assert actual['total_repayment'] == pytest.approx(expected['total_repayment'])
+    assert actual['cash_in'] == pytest.approx(expected['cash_in'])
+
+
+@pytest.mark.parametrize("changes", [
+    {'management_fee': 30},
+    {'stamp_duty_rate': 0.01},
+    {'fee_tier_fees': [12, 14]},
+    {'management_fee': 20, 'stamp_duty_rate': 0.004, 'fee_tier_fees': [5, 15]},
+])
+def test_what_if_matches_repricing(book, changes):
+    portfolio, _, starts = book
+    scenario = portfolio.what_if(**changes)
+
+    tiers = changes.get('fee_tier_fees', [fee for _, fee in TIERED_FEES.fee_tiers])
+    new_fees = TIERED_FEES._replace(
+        management_fee=changes.get('management_fee', TIERED_FEES.management_fee),
+        stamp_duty_rate=changes.get('stamp_duty_rate', TIERED_FEES.stamp_duty_rate),
+        fee_tiers=tuple((up_to, fee) for (up_to, _), fee in zip(TIERED_FEES.fee_tiers, tiers))
+    )
+    repriced = loan_portfolio.Portfolio(new_fees)
+    repriced.add(loan_engine.calculate_loan_repayment_batch(AMOUNTS, MONTHS, new_fees), starts)
+    expected = repriced.summary()
+
+    for name in ('management_cost', 'stamp_duty', 'total_fees', 'total_repayment'):
+        assert scenario[name] == pytest.approx(expected[name]), name
+    assert scenario['cash_in'] == pytest.approx(expected['cash_in'])
+    assert scenario['change']['total_fees'] == pytest.approx(
+        expected['total_fees'] - portfolio.summary()['total_fees']
+    )
+
+
+def test_what_if_checks_the_number_of_tier_fees(book):
+    portfolio, _, _ = book
+    with pytest.raises(ValueError):
+        portfolio.what_if(fee_tier_fees=[10])
+
+
+def test_missing_start_dates_are_rejected():
+    portfolio = loan_portfolio.Portfolio()
+    batch = loan_engine.calculate_loan_repayment_batch([5000, 6000], [6, 6])
+    with pytest.raises(ValueError, match="no start date"):
+        portfolio.add(batch, np.array(['2026-01-01', 'NaT'], dtype='datetime64[D]'))
+    assert portfolio.origination == {}
@@ -0,0 +1,135 @@
+import datetime
+import json
+import os
+
+import pytest
+
+import loan_engine
+import loan_rules
+
+PERSONAL = {
+    "name": "personal",
+    "min_months": 3,
+    "max_months": 24,
+    "min_amount": 500,
+    "max_amount": 50000,
+    "stamp_duty_rate": 0.006,
+    "management_fee": 25,
+    "management_fee_tiers": [{"up_to": 1000, "fee": 10}, {"up_to": 5000, "fee": 15}]
+}
+
+
+def write_rules(path, products, bump_mtime=0):
+    path.write_text(json.dumps({"products": products}))
+    if bump_mtime:
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + bump_mtime))
+
+
+@pytest.fixture
+def rules_path(tmp_path):
+    path = tmp_path / "fee_schedules.json"
+    write_rules(path, [{"name": "standard"}, PERSONAL])
+    return path
+
+
+def test_products_compile_to_fee_schedules(rules_path):
+    book = loan_rules.RuleBook(str(rules_path))
+
+    assert book.names() == ["standard", "personal"]
+    assert book.product().fees == loan_engine.DEFAULT_FEES
+    assert book.product("personal").fees == loan_engine.FeeSchedule(
+        management_fee=25,
+        stamp_duty_rate=0.006,
+        min_months=3,
+        max_months=24,
+        min_amount=500,
+        max_amount=50000,
+        fee_tiers=((1000, 10), (5000, 15))
+    )
+    with pytest.raises(ValueError, match="Unknown product"):
+        book.product("business")
+
+
+def test_shipped_schedule_matches_the_defaults():
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    book = loan_rules.RuleBook(os.path.join(here, "fee_schedules.json"))
+    assert book.product().quote(5000, 6) == loan_engine.calculate_loan_repayment(5000, 6)
+
+
+def test_effective_dates_pick_the_version_in_force(tmp_path):
+    path = tmp_path / "fee_schedules.json"
+    write_rules(path, [
+        {"name": "standard", "effective_to": "2025-12-31"},
+        {"name": "standard", "effective_from": "2026-01-01", "management_fee": 20},
+    ])
+    book = loan_rules.RuleBook(str(path))
+
+    assert book.product(on=datetime.date(2025, 6, 1)).fees.management_fee == 15
+    assert book.product(on=datetime.date(2026, 6, 1)).fees.management_fee == 20
+
+
+def test_no_version_in_force_is_an_error(tmp_path):
+    path = tmp_path / "fee_schedules.json"
+    write_rules(path, [{"name": "standard", "effective_from": "2030-01-01"}])
+    book = loan_rules.RuleBook(str(path))
+
+    with pytest.raises(ValueError, match="not available"):
+        book.product(on=datetime.date(2026, 1, 1))
+
+
+def test_changed_file_is_reloaded(rules_path):
+    book = loan_rules.RuleBook(str(rules_path), check_interval=0)
+    write_rules(rules_path, [{"name": "standard", "management_fee": 20}], bump_mtime=10)
+
+    assert book.product().fees.management_fee == 20
+    assert book.names() == ["standard"]
+    assert book.version == 1
+
+
+def test_unchanged_file_is_not_reloaded(rules_path):
+    book = loan_rules.RuleBook(str(rules_path), check_interval=0)
+    assert not book.reload_if_changed()
+    assert book.version == 0
+
+
+def test_changes_wait_for_the_check_interval(rules_path):
+    book = loan_rules.RuleBook(str(rules_path), check_interval=3600)
+    write_rules(rules_path, [{"name": "standard", "management_fee": 20}], bump_mtime=10)
+
+    assert book.product().fees.management_fee == 15
+    assert book.version == 0
+
+
+@pytest.mark.parametrize("config", [
+    "[]",
+    "{\"products\": {}}",
+    "{\"products\": [\"standard\"]}",
+    "{\"products\": []}",
+    "{\"products\": [{\"name\": \"standard\", \"management_fee\": -1}]}",
+    "{\"products\": [{\"name\": \"standard\", \"management_fee_tiers\": [{\"up_to\": 1000, \"fee\": -5}]}]}",
+    "{\"products\": [{\"name\": \"standard\", \"min_months\": \"six\"}]}",
+    "{\"products\": [{\"name\": \"standard\"",
+])
+def test_bad_file_keeps_the_previous_rules(rules_path, config):
+    book = loan_rules.RuleBook(str(rules_path), check_interval=0)
+    rules_path.write_text(config)
+    stat = os.stat(rules_path)
+    os.utime(rules_path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert not book.reload_if_changed()
+    assert book.names() == ["standard", "personal"]
+    assert book.version == 0
+
+
+@pytest.mark.parametrize("config", [
+    [],
+    {"products": [["standard"]]},
+    {"products": [{"name": "standard", "stamp_duty_rate": -0.005}]},
+    {"products": [{"name": "standard", "management_fee_tiers": [{"up_to": 1000, "fee": -5}]}]},
+    {"products": [{"name": "standard", "min_months": 6, "max_months": 3}]},
+    {"products": [{"name": "standard", "effective_from": "tomorrow"}]},
+])
+def test_invalid_config_raises_value_error(config):
+    with pytest.raises(ValueError):
+        loan_rules.compile_rules(config)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+import loan_archive
+import loan_engine
+import loan_server
+
+
+async def exchange(requests, batcher=None, server_class=loan_server.QuoteServer):
+    """
+    Send raw requests to a running server, one connection each; returns a
+    list of (status, JSON body)
+    """
+    batcher = batcher or loan_server.QuoteBatcher(max_delay=0.001)
+    batch_task = asyncio.ensure_future(batcher.run())
+    server = await asyncio.start_server(server_class(batcher).handle_connection, "127.0.0.1", 0)
+    try:
+        port = server.sockets[0].getsockname()[1]
+        responses = []
+        for request in requests:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ")[1])
+            length = int(head.lower().split(b"content-length: ")[1].split(b"\r\n")[0])
+            responses.append((status, json.loads(await reader.readexactly(length))))
+            writer.close()
+        return responses
+    finally:
+        server.close()
+        await server.wait_closed()
+        batch_task.cancel()
+
+
+def get_request(target):
+    return f"GET {target} HTTP/1.1\r\nHost: test\r\n\r\n".encode()
+
+
+def post_request(target, body):
+    data = body.encode()
+    return f"POST {target} HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+
+
+def get(target):
+    return asyncio.run(exchange([get_request(target)]))[0]
+
+
+def post(target, body):
+    return asyncio.run(exchange([post_request(target, body)]))[0]
+
+
+def test_quote():
+    status, body = get("/quote?loan_amount=5000&repayment_months=6")
+    assert status == 200
+    assert body['total_repayment'] == 5115.0
+
+
+def test_schedule():
+    status, body = post("/schedule", '{"loan_amount": 5000, "repayment_months": 6.0}')
+    assert status == 200
+    assert len(body['schedule']) == 6
+    assert sum(row['payment'] for row in body['schedule']) == pytest.approx(5115.0)
+
+
+@pytest.mark.parametrize("query", [
+    "loan_amount=5000",
+    "loan_amount=abc&repayment_months=6",
+    "loan_amount=nan&repayment_months=6",
+    "loan_amount=inf&repayment_months=6",
+    "loan_amount=1e400&repayment_months=6",
+    "loan_amount=-5&repayment_months=6",
+    "loan_amount=5000&repayment_months=13",
+    "loan_amount=5000&repayment_months=0",
+    "loan_amount=5000&repayment_months=6.5",
+])
+def test_invalid_quotes_get_400(query):
+    status, body = get(f"/quote?{query}")
+    assert status == 400
+    assert body['error']
+
+
+@pytest.mark.parametrize("body", [
+    "not json",
+    "[5000, 6]",
+    '{"loan_amount": NaN, "repayment_months": 6}',
+    '{"loan_amount": 5000, "repayment_months": "x"}',
+    '{"loan_amount": 5000, "repayment_months": 6.7}',
+    '{"loan_amount": 5000, "repayment_months": true}',
+    '{"loan_amount": true, "repayment_months": 6}',
+])
+def test_invalid_post_bodies_get_400(body):
+    status, _ = post("/quote", body)
+    assert status == 400
+
+
+@pytest.mark.parametrize("request_bytes", [
+    b"GARBAGE\r\n\r\n",
+    b"GET /quote\r\n\r\n",
+    b"POST /quote HTTP/1.1\r\nContent-Length: ten\r\n\r\n",
+    b"POST /quote HTTP/1.1\r\nContent-Length: -1\r\n\r\n",
+])
+def test_malformed_requests_get_400(request_bytes):
+    status, body = asyncio.run(exchange([request_bytes]))[0]
+    assert status == 400
+    assert body == {'error': "Malformed request"}
+
+
+def test_unexpected_errors_get_500():
+    class BrokenServer(loan_server.QuoteServer):
+        async def dispatch(self, method, target, body):
+            raise RuntimeError("boom")
+
+    status, body = asyncio.run(exchange([get_request("/metrics")], server_class=BrokenServer))[0]
+    assert status == 500
+    assert body == {'error': "Internal server error"}
+
+
+def test_failed_batch_does_not_stop_the_batcher():
+    class FlakyRules:
+        """Fails the first product lookup, then returns the default fees"""
+
+        def __init__(self):
+            self.calls = 0
+
+        def product(self, name=None):
+            self.calls += 1
+            if self.calls == 1:
+                raise ValueError("Product 'standard' is not available")
+            return types.SimpleNamespace(fees=loan_engine.DEFAULT_FEES)
+
+    batcher = loan_server.QuoteBatcher(max_delay=0.001, rules=FlakyRules())
+
+    request = get_request("/quote?loan_amount=5000&repayment_months=6")
+    (first_status, first), (second_status, _) = asyncio.run(exchange([request, request], batcher))
+    assert first_status == 500
+    assert "not available" in first['error']
+    assert second_status == 200
+
+
+def test_served_quotes_are_archived(tmp_path):
+    archive = loan_archive.QuoteArchive(str(tmp_path / "quotes.qarc"))
+    batcher = loan_server.QuoteBatcher(max_delay=0.001, archive=archive)
+
+    responses = asyncio.run(exchange([
+        get_request("/quote?loan_amount=5000&repayment_months=6"),
+        get_request("/quote?loan_amount=-1&repayment_months=6"),
+        get_request("/quote?loan_amount=1000&repayment_months=3"),
+    ], batcher))
+
+    assert [status for status, _ in responses] == [200, 400, 200]
+    assert [body.get('quote_id') for _, body in responses] == [1, None, 2]
+    assert archive.get(2)['loan_amount'] == 1000
+
+
+def test_parse_request_head():
+    head = b"POST /quote HTTP/1.1\r\nContent-Length: 12\r\nConnection: close\r\n\r\n"
+    method, target, headers, content_length = loan_server.parse_request_head(head)
+    assert (method, target, content_length) == ("POST", "/quote", 12)
+    assert headers['connection'] == "close"
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+import loan_engine
+import loan_table
+
+TIERED_FEES = loan_engine.FeeSchedule(
+    management_fee=25,
+    stamp_duty_rate=0.006,
+    min_months=3,
+    max_months=24,
+    min_amount=500,
+    max_amount=8000,
+    fee_tiers=((1000, 10), (5000, 15))
+)
+
+
+@pytest.mark.parametrize("fees", [loan_engine.DEFAULT_FEES, TIERED_FEES])
+def test_table_matches_the_live_formula(fees):
+    table = loan_table.QuoteTable.build(amount_step=50, max_amount=10_000, fees=fees)
+    assert table.verify() == []
+
+
+def test_lookup_off_the_grid():
+    table = loan_table.QuoteTable.build(amount_step=50, max_amount=10_000, fees=TIERED_FEES)
+    assert table.lookup(5000, 6) == loan_engine.calculate_loan_repayment(5000, 6, TIERED_FEES)
+    assert table.lookup(5025, 6) is None
+    assert table.lookup(10_050, 6) is None
+    assert table.lookup(5000, 2) is None
+    # On the grid but outside the product's amount limits
+    assert table.lookup(9000, 6) is None
+    assert table.lookup(450, 6) is None
+
+
+@pytest.mark.parametrize("file_name", ["table.npz", "table"])
+def test_save_and_load(tmp_path, file_name):
+    path = str(tmp_path / file_name)
+    table = loan_table.QuoteTable.build(amount_step=100, max_amount=5000, fees=TIERED_FEES)
+    table.save(path)
+    assert os.listdir(tmp_path) == [file_name]
+
+    loaded = loan_table.QuoteTable.load(path)
+    assert loaded.fees == TIERED_FEES
+    assert (loaded.amount_step, loaded.max_amount) == (100, 5000)
+    assert loaded.lookup(2500, 12) == table.lookup(2500, 12)
+
+
+def test_load_or_build_reuses_a_matching_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "table")
+    loan_table.QuoteTable.load_or_build(path, max_amount=5000, fees=TIERED_FEES)
+
+    built = []
+    build = loan_table.QuoteTable.build.__func__
+
+    def counting_build(cls, *args, **kwargs):
+        built.append(args)
+        return build(cls, *args, **kwargs)
+
+    monkeypatch.setattr(loan_table.QuoteTable, "build", classmethod(counting_build))
+    table = loan_table.QuoteTable.load_or_build(path, max_amount=5000, fees=TIERED_FEES)
+    assert table.fees == TIERED_FEES
+    assert built == []
+
+    # Other fees or a damaged file are rebuilt
+    table = loan_table.QuoteTable.load_or_build(path, max_amount=5000)
+    assert table.fees == loan_engine.DEFAULT_FEES
+    with open(path, "wb") as table_file:
+        table_file.write(b"not a table")
+    loan_table.QuoteTable.load_or_build(path, max_amount=5000)
+    assert len(built) == 2
+    assert loan_table.QuoteTable.load(path).fees == loan_engine.DEFAULT_FEES
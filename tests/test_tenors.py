@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import loan_engine
+
+TIERED_FEES = loan_engine.FeeSchedule(
+    management_fee=25,
+    stamp_duty_rate=0.006,
+    min_months=3,
+    max_months=24,
+    min_amount=500,
+    max_amount=50000,
+    fee_tiers=((1000, 10), (5000, 15))
+)
+
+
+@pytest.mark.parametrize("fees", [loan_engine.DEFAULT_FEES, TIERED_FEES])
+def test_compare_tenors_prices_every_allowed_tenor(fees):
+    comparison = loan_engine.compare_tenors(4000, fees)
+
+    assert comparison['repayment_months'].tolist() == list(range(fees.min_months, fees.max_months + 1))
+    assert comparison['valid'].all()
+    for index, num_months in enumerate(comparison['repayment_months'].tolist()):
+        expected = loan_engine.calculate_loan_repayment(4000, num_months, fees)
+        for name in loan_engine.BATCH_COLUMNS:
+            assert comparison[name][index] == pytest.approx(expected[name], rel=1e-15), name
+
+
+@pytest.mark.parametrize("fees", [loan_engine.DEFAULT_FEES, TIERED_FEES])
+@pytest.mark.parametrize("max_installment", [16, 100, 437.5, 1000, 2500.01])
+def test_max_loan_for_installment_is_maximal(fees, max_installment):
+    months, amounts = loan_engine.max_loan_for_installment(max_installment, fees)
+
+    for num_months, amount in zip(months.tolist(), amounts.tolist()):
+        if np.isnan(amount):
+            # Nothing from the smallest allowed amount upwards fits under the cap
+            smallest = max(fees.min_amount or 0.01, 0.01)
+            result = loan_engine.calculate_loan_repayment(smallest, num_months, fees)
+            assert result['monthly_installment'] > max_installment
+            continue
+
+        result = loan_engine.calculate_loan_repayment(amount, num_months, fees)
+        assert result['monthly_installment'] <= max_installment
+
+        # One sen more is either over the cap or not an allowed amount
+        more = round(amount + 0.01, 2)
+        try:
+            result = loan_engine.calculate_loan_repayment(more, num_months, fees)
+        except ValueError:
+            continue
+        assert result['monthly_installment'] > max_installment
+
+
+def test_cap_below_the_monthly_fee_allows_nothing():
+    _, amounts = loan_engine.max_loan_for_installment(10)
+    assert np.isnan(amounts).all()